@@ -9,6 +9,7 @@ from typing import Dict
 from app.api.v1.dependencies.database import get_db
 from app.models.area import Area
 from app.services.google_places_service import google_places_service
+from app.services.rate_limiter import batch_priority
 
 router = APIRouter()
 
@@ -55,7 +56,9 @@ async def update_all_leisure_facilities(
     
     for area in areas:
         try:
-            facilities = await google_places_service.update_leisure_facilities(area, db)
+            # バッチ処理は対話的なリクエストより後回しにする
+            with batch_priority():
+                facilities = await google_places_service.update_leisure_facilities(area, db)
             results.append({
                 "area": area.name,
                 "status": "success",
@@ -1,13 +1,14 @@
 """
 Age distribution API endpoints - MongoDB版
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter, HTTPException
 from beanie import PydanticObjectId
 
 from app.models_mongo.area import Area
 from app.models_mongo.age_distribution import AgeDistribution
 from app.schemas.age_distribution import AgeDistributionResponse
+from app.services.age_distribution_service import age_distribution_listing
 
 router = APIRouter()
 
@@ -48,31 +49,8 @@ async def get_age_distribution(area_id: int):
 
 @router.get("/", response_model=List[AgeDistributionResponse])
 async def get_all_age_distributions():
-    """全エリアの年齢層別人口分布を取得"""
-    # 全ての年齢分布データを取得
-    age_distributions = await AgeDistribution.find_all().to_list()
-    
-    results = []
-    for age_dist in age_distributions:
-        # エリア情報を取得
-        area = await Area.find_one(Area.id == age_dist.area.id)
-        if area:
-            area_id = int(area.code[2:]) if area.code.startswith("13") else 0
-            
-            results.append({
-                "area_id": area_id,
-                "area_name": area.name,
-                "age_0_14": age_dist.age_0_14,
-                "age_15_64": age_dist.age_15_64,
-                "age_65_plus": age_dist.age_65_plus,
-                "median_age": age_dist.median_age,
-                "aging_rate": age_dist.aging_rate,
-                "youth_rate": age_dist.youth_rate,
-                "total_population": age_dist.total_population,
-                "year": age_dist.year
-            })
-    
-    return results
+    """全エリアの年齢層別人口分布を取得（エリアと合わせて1回の集計で取得し、データバージョンごとにキャッシュ）"""
+    return await age_distribution_listing.get_all()
 
 @router.get("/compare/")
 async def compare_age_distributions(area_ids: str):
@@ -86,33 +64,21 @@ async def compare_age_distributions(area_ids: str):
     if len(area_id_list) > 5:
         raise HTTPException(status_code=400, detail="Maximum 5 areas for comparison")
     
-    results = []
-    
-    for area_id in area_id_list:
-        # エリアを取得
-        area_code = f"13{area_id:03d}"
-        area = await Area.find_one(Area.code == area_code)
-        
-        if not area:
-            continue
-        
-        # 年齢分布データを取得
-        age_dist = await AgeDistribution.find_one(
-            AgeDistribution.area.id == area.id
-        )
-        
-        if age_dist:
-            results.append({
-                "area_id": area_id,
-                "area_name": area.name,
-                "age_0_14": age_dist.age_0_14,
-                "age_15_64": age_dist.age_15_64,
-                "age_65_plus": age_dist.age_65_plus,
-                "median_age": age_dist.median_age,
-                "aging_rate": age_dist.aging_rate,
-                "youth_rate": age_dist.youth_rate,
-                "characteristics": _get_area_characteristics(age_dist)
-            })
+    # キャッシュ済みの一覧から取得
+    results = [
+        {
+            "area_id": age_dist["area_id"],
+            "area_name": age_dist["area_name"],
+            "age_0_14": age_dist["age_0_14"],
+            "age_15_64": age_dist["age_15_64"],
+            "age_65_plus": age_dist["age_65_plus"],
+            "median_age": age_dist["median_age"],
+            "aging_rate": age_dist["aging_rate"],
+            "youth_rate": age_dist["youth_rate"],
+            "characteristics": _get_area_characteristics(age_dist)
+        }
+        for age_dist in await age_distribution_listing.get_by_area_ids(area_id_list)
+    ]
     
     return {
         "comparison": results,
@@ -124,23 +90,23 @@ async def compare_age_distributions(area_ids: str):
         }
     }
 
-def _get_area_characteristics(age_dist: AgeDistribution) -> List[str]:
+def _get_area_characteristics(age_dist: Dict) -> List[str]:
     """年齢分布から地域の特徴を推定"""
     characteristics = []
     
-    if age_dist.youth_rate > 20:
+    if age_dist["youth_rate"] > 20:
         characteristics.append("子育て世代が多い")
-    elif age_dist.youth_rate < 10:
+    elif age_dist["youth_rate"] < 10:
         characteristics.append("子供が少ない")
     
-    if age_dist.aging_rate > 30:
+    if age_dist["aging_rate"] > 30:
         characteristics.append("高齢化が進んでいる")
-    elif age_dist.aging_rate < 15:
+    elif age_dist["aging_rate"] < 15:
         characteristics.append("若い世代が多い")
     
-    if age_dist.median_age < 40:
+    if age_dist["median_age"] < 40:
         characteristics.append("若年層中心")
-    elif age_dist.median_age > 50:
+    elif age_dist["median_age"] > 50:
         characteristics.append("高齢者中心")
     else:
         characteristics.append("バランスの取れた年齢構成")
@@ -1,6 +1,7 @@
 """
 Areas API endpoints - MongoDB版
 """
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Query
 from beanie import PydanticObjectId
@@ -94,8 +95,8 @@ async def update_area(area_id: int, area_data: dict):
     if not area:
         raise HTTPException(status_code=404, detail="Area not found")
     
-    # 更新
-    await area.set(area_data)
+    # 更新（更新日時も更新して data_version_service に変更を検知させる）
+    await area.set({**area_data, "updated_at": datetime.utcnow()})
     
     return {"message": "Area updated successfully"}
 
@@ -7,6 +7,8 @@ import math
 
 from app.models_mongo.area import Area
 from app.models_mongo.congestion import CongestionData
+from app.services.congestion_model import SERVICE_HOURS
+from app.services.tokyo_congestion_service import tokyo_congestion_service
 from app.schemas.recommendation import (
     RecommendationRequest,
     RecommendationResponse,
@@ -15,10 +17,33 @@ from app.schemas.recommendation import (
 
 router = APIRouter()
 
+async def load_average_congestion(area_codes: List[str]) -> Dict[str, float]:
+    """
+    エリアごとの平日の平均混雑度を1回のクエリでまとめて取得（area_code -> 平均混雑度）
+    DBにないエリアは事前計算済みの混雑度テーブルから補完
+    """
+    cursor = CongestionData.get_motor_collection().find(
+        {"area_code": {"$in": area_codes}},
+        {"area_code": 1, "weekday_congestion": 1}
+    )
+    averages = {}
+    async for row in cursor:
+        hourly = row.get("weekday_congestion") or {}
+        if hourly:
+            averages[row["area_code"]] = sum(hourly.values()) / len(hourly)
+    
+    table_index = {code: i for i, code in enumerate(tokyo_congestion_service.area_codes)}
+    for area_code in area_codes:
+        if area_code not in averages and area_code in table_index:
+            weekday = tokyo_congestion_service.congestion_tensor[table_index[area_code], 0]
+            averages[area_code] = float(weekday[list(SERVICE_HOURS)].mean())
+    
+    return averages
+
 def calculate_match_score(
     area: Area,
     preferences: Dict,
-    congestion_data: Optional[CongestionData] = None
+    average_congestion: Optional[float] = None
 ) -> float:
     """ユーザーの好みとエリアのマッチ度を計算"""
     score = 0
@@ -81,10 +106,9 @@ def calculate_match_score(
         weight_sum += 0.1
     
     # 混雑度の好み
-    if "prefers_quiet" in preferences and preferences["prefers_quiet"] and congestion_data:
+    if "prefers_quiet" in preferences and preferences["prefers_quiet"] and average_congestion is not None:
         # 混雑度が低いほど高スコア
-        avg_congestion = sum(congestion_data.hourly_data.values()) / 24
-        quiet_score = max(0, 100 - avg_congestion)
+        quiet_score = max(0, 100 - average_congestion)
         score += quiet_score * 0.1
         weight_sum += 0.1
     
@@ -102,6 +126,11 @@ async def get_recommendations(
     # 全エリアを取得
     areas = await Area.find_all().to_list()
     
+    # 混雑度はエリアごとに問い合わせず、事前にまとめて取得
+    congestion_averages = {}
+    if request.avoid_crowded:
+        congestion_averages = await load_average_congestion([area.code for area in areas])
+    
     recommendations = []
     
     for area in areas:
@@ -114,13 +143,6 @@ async def get_recommendations(
             if area.safety_data.safety_score and area.safety_data.safety_score < request.min_safety_score:
                 continue  # 安全性が基準を満たさない場合はスキップ
         
-        # 混雑度データを取得
-        congestion_data = None
-        if request.avoid_crowded:
-            congestion_data = await CongestionData.find_one(
-                CongestionData.area.id == area.id
-            )
-        
         # マッチ度を計算
         preferences = {
             "max_rent": request.max_rent,
@@ -131,7 +153,7 @@ async def get_recommendations(
             "prefers_quiet": request.avoid_crowded
         }
         
-        match_score = calculate_match_score(area, preferences, congestion_data)
+        match_score = calculate_match_score(area, preferences, congestion_averages.get(area.code))
         
         # 推薦理由を生成
         reasons = []
@@ -1,8 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from app.database.mongodb import db
 from app.models_mongo.area import Area, HousingData, SchoolData, ChildcareData, ParkData, MedicalData, SafetyData, CultureData
 from app.models_mongo.waste_separation import WasteSeparation
 from app.models_mongo.congestion import CongestionData
+from app.services.query_advisor import query_advisor
+from app.services.places_cache import places_cache
+from app.services.rate_limiter import rate_limiter
+from app.services.congestion_write_buffer import congestion_write_buffer
+from app.services.congestion_history_service import congestion_history_service
+from app.services.congestion_stream_service import congestion_stream_service
+from app.services.simulation_cache import simulation_cache
+from app.services.data_version_service import data_version_service
+from app.services.area_export import EXPORT_FORMATS, FILE_EXTENSIONS, MEDIA_TYPES, stream_table, table_exporter
 import asyncio
 
 router = APIRouter()
@@ -17,6 +27,7 @@ async def initialize_data(secret_key: str = None):
     try:
         # 非同期でデータ初期化を実行
         await init_mongodb_data()
+        await data_version_service.sync()
         return {"status": "success", "message": "Database initialized successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -32,6 +43,127 @@ async def initialize_data_now():
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@router.get("/query-advisor")
+async def get_query_advisor_report():
+    """検索クエリの実行計画を診断し、COLLSCANと推奨インデックスを報告"""
+    try:
+        report = await query_advisor.analyze()
+        return {
+            "shapes": report,
+            "collscan_count": sum(1 for entry in report if entry.get("collscan")),
+            "recommended_indexes": query_advisor.recommended_indexes()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/query-advisor/create-indexes")
+async def create_recommended_indexes(secret_key: str = None):
+    """推奨インデックスを作成する管理エンドポイント"""
+    # 簡易的なセキュリティチェック
+    if secret_key != "tokyo-wellbeing-2024":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    try:
+        created = await query_advisor.create_recommended_indexes()
+        return {"status": "success", "indexes": created}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/places-cache")
+async def get_places_cache_stats():
+    """Places API応答キャッシュのヒット数と推定節約額"""
+    try:
+        return await asyncio.to_thread(places_cache.get_stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/places-cache/purge")
+async def purge_places_cache(secret_key: str = None):
+    """期限切れのPlaces API応答を削除する管理エンドポイント"""
+    # 簡易的なセキュリティチェック
+    if secret_key != "tokyo-wellbeing-2024":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    try:
+        removed = await asyncio.to_thread(places_cache.purge_expired)
+        return {"status": "success", "removed": removed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/rate-limits")
+async def get_rate_limit_stats():
+    """外部APIごとのレート制限・日次上限の使用状況"""
+    return await rate_limiter.get_stats()
+
+@router.get("/congestion-write-buffer")
+async def get_congestion_write_buffer_stats():
+    """混雑度データ書き込みバッファの統計（スキップ・集約・書き込み件数）"""
+    return congestion_write_buffer.get_stats()
+
+@router.get("/congestion-stream")
+async def get_congestion_stream_stats():
+    """混雑度の更新配信（SSE）の統計（接続数・配信件数・破棄件数）"""
+    return congestion_stream_service.get_stats()
+
+@router.get("/simulation-cache")
+async def get_simulation_cache_stats():
+    """シミュレーション結果キャッシュの統計（件数・ヒット率）"""
+    try:
+        return await simulation_cache.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/simulation-cache/clear")
+async def clear_simulation_cache(secret_key: str = None):
+    """シミュレーション結果のキャッシュを削除する管理エンドポイント"""
+    # 簡易的なセキュリティチェック
+    if secret_key != "tokyo-wellbeing-2024":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    try:
+        removed = await simulation_cache.clear()
+        return {"status": "success", "removed": removed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/congestion-history/downsample")
+async def downsample_congestion_history(secret_key: str = None):
+    """混雑度の観測値を書き出し、時間・日・週の集計値を即時に更新する管理エンドポイント"""
+    # 簡易的なセキュリティチェック
+    if secret_key != "tokyo-wellbeing-2024":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    try:
+        inserted = await congestion_history_service.flush_observations()
+        updated = await congestion_history_service.downsample()
+        return {"status": "success", "inserted_observations": inserted, "updated_rollups": updated}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export/{table}")
+async def export_area_table(
+    table: str,
+    format: str = Query("csv", description=f"出力形式（{' / '.join(EXPORT_FORMATS)}）"),
+    columns: str = Query(None, description="出力する列（カンマ区切り、省略時はすべて）"),
+    secret_key: str = None
+):
+    """エリアデータの表をストリーミングでダウンロード（Parquet・Arrowは pyarrow が必要）"""
+    # 簡易的なセキュリティチェック
+    if secret_key != "tokyo-wellbeing-2024":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    selected = [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+    try:
+        exporter = table_exporter(table, format, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(
+        stream_table(exporter, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{FILE_EXTENSIONS[format]}"'}
+    )
+
 async def init_mongodb_data():
     """MongoDBにサンプルデータを初期化"""
     
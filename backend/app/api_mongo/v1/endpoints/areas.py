@@ -1,6 +1,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Query
 from app.models_mongo.area import Area
+from app.services.area_similarity_service import area_similarity_service
 
 router = APIRouter()
 
@@ -316,4 +317,22 @@ async def get_area_age_distribution(area_id_or_code: str):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{area_code}/similar", response_model=dict)
+async def get_similar_areas(
+    area_code: str,
+    k: int = Query(5, ge=1, le=22, description="返す類似エリアの数"),
+    constraints: Optional[str] = Query(
+        None,
+        description="条件（カンマ区切り、値の base は基準エリアの値）例: rent_2ldk<base,crime_rate_per_1000<=5"
+    )
+):
+    """指定エリアに似たエリアを取得（条件で絞り込み可能）"""
+    try:
+        result = await area_similarity_service.find_similar(area_code, k, constraints)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Area {area_code} not found")
+    return result
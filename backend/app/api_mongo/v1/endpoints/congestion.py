@@ -1,6 +1,9 @@
 from typing import List, Optional
+from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Query
 from app.models_mongo.congestion import CongestionData
+from app.services.congestion_history_service import congestion_history_service
+from app.utils.timezones import as_utc, utc_now
 
 router = APIRouter()
 
@@ -121,6 +124,25 @@ async def compare_congestion(area_ids: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/history/{area_code}", response_model=dict)
+async def get_congestion_history(
+    area_code: str,
+    start: Optional[datetime] = Query(None, description="開始日時（タイムゾーンなしはUTC、省略時は終了日時の7日前）"),
+    end: Optional[datetime] = Query(None, description="終了日時（タイムゾーンなしはUTC、省略時は現在）"),
+    resolution: str = Query("auto", pattern="^(auto|hour|day|week)$"),
+    source: Optional[str] = Query(None, description="データソース（tokyo_opendata / google_places_api、省略時は合算）")
+):
+    """混雑度の推移を取得（時間・日・週の集計値から返す）"""
+    end = as_utc(end) if end else utc_now()
+    start = as_utc(start) if start else end - timedelta(days=7)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    try:
+        return await congestion_history_service.get_history(area_code, start, end, resolution, source)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/", response_model=List[dict])
 async def get_all_congestion_data(
     skip: int = Query(0, ge=0),
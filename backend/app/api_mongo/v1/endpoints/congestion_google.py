@@ -2,7 +2,8 @@
 Google Places APIを使用したリアルタイム混雑度データAPI
 """
 from typing import Dict, Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta
 import logging
 
@@ -10,6 +11,15 @@ from app.models_mongo.area import Area
 from app.models_mongo.congestion import CongestionData
 from app.services.google_congestion_service import google_congestion_service
 from app.services.tokyo_congestion_service import tokyo_congestion_service
+from app.services.rate_limiter import batch_priority
+from app.services.job_scheduler import job_scheduler, format_job
+from app.services.congestion_write_buffer import congestion_write_buffer
+from app.services.congestion_history_service import congestion_history_service
+from app.services.congestion_forecast_service import congestion_forecast_service
+from app.services.congestion_heatmap_service import congestion_heatmap_service
+from app.services.congestion_model import DAY_TYPES
+from app.services.congestion_stream_service import congestion_stream_service
+from app.utils.timezones import tokyo_now
 from beanie import init_beanie
 from app.database.mongodb import db
 
@@ -20,8 +30,7 @@ router = APIRouter()
 
 @router.get("/area/{area_code}/live")
 async def get_live_congestion(
-    area_code: str,
-    background_tasks: BackgroundTasks
+    area_code: str
 ) -> Dict:
     """
     Google Places APIから実際の混雑度データを取得
@@ -32,30 +41,36 @@ async def get_live_congestion(
         raise HTTPException(status_code=404, detail="Area not found")
     
     try:
-        # 東京都オープンデータに基づく混雑度データを取得
+        # 東京都オープンデータに基づく混雑度データを取得（事前計算済みテーブルから参照）
         congestion_data = tokyo_congestion_service.calculate_area_congestion(
             area_code,
             area.name
         )
         
-        # バックグラウンドでデータベースを更新
-        background_tasks.add_task(
-            update_congestion_data_in_db,
+        # データベースの更新は書き込みバッファ経由（内容が変わらなければ書き込まない）
+        update_congestion_data_in_db(
             area_code,
             area.name,
             congestion_data
         )
         
-        # レスポンスを整形
-        current_hour = datetime.now().hour
-        is_weekend = datetime.now().weekday() >= 5
+        # 現在の曜日区分・時間帯（日本時間）の混雑度を選択
+        now = tokyo_now()
+        observed_congestion = tokyo_congestion_service.get_current_congestion(area_code, now)
         
-        current_congestion_data = (
-            congestion_data['weekend_congestion'] if is_weekend 
-            else congestion_data['weekday_congestion']
+        # 履歴として記録（エリア・データソースごとに1時間1件）
+        congestion_history_service.record(
+            area_code,
+            observed_congestion,
+            congestion_data['congestion_score'],
+            congestion_data['data_source'],
+            now
         )
         
-        current_congestion = current_congestion_data.get(str(current_hour), 50)
+        # 履歴から学習した予測値があればそれを現在値とする（観測値と同じ時刻・時間帯で選択）
+        current_congestion = congestion_forecast_service.get_current(area_code, now)
+        if current_congestion is None:
+            current_congestion = observed_congestion
         
         # 混雑レベルを判定
         congestion_level = _get_congestion_level_detail(congestion_data['congestion_score'])
@@ -94,85 +109,231 @@ async def get_live_congestion(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/area/{area_code}/forecast")
+async def get_congestion_forecast(
+    area_code: str,
+    hours: int = Query(168, ge=1, le=168, description="予測する時間数（最大7日）")
+) -> Dict:
+    """
+    今後の時間帯別の混雑度予測（メモリ上の予測表から返す）
+    """
+    forecast = congestion_forecast_service.get_forecast(area_code, hours)
+    if forecast is None:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return forecast
+
+
+@router.get("/stream")
+async def stream_congestion_updates(
+    request: Request,
+    areas: str = Query(..., description="購読するエリアコード（カンマ区切り）")
+) -> StreamingResponse:
+    """
+    混雑度の更新をServer-Sent Eventsで配信
+    （ポーリングの代わりに、プロセス内で1回だけ計算した更新を全購読者に送る）
+    """
+    area_codes = {code.strip() for code in areas.split(",") if code.strip()}
+    if not area_codes:
+        raise HTTPException(status_code=400, detail="areas is required")
+    unknown = area_codes - set(tokyo_congestion_service.area_codes)
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown area codes: {sorted(unknown)}")
+
+    async def event_stream():
+        messages = congestion_stream_service.subscribe(area_codes)
+        try:
+            async for message in messages:
+                if await request.is_disconnected():
+                    break
+                yield message
+        finally:
+            # 切断時に購読を確実に解除
+            await messages.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/heatmap/meta")
+async def get_heatmap_metadata() -> Dict:
+    """
+    混雑度ヒートマップのグリッド情報（範囲・セルの大きさ・タイル構成）
+    """
+    return congestion_heatmap_service.get_metadata()
+
+
+@router.get("/heatmap/{day_type}/{hour}")
+async def get_heatmap_layer(
+    day_type: str,
+    hour: int = Path(..., ge=0, le=23)
+) -> Dict:
+    """
+    1時間分のヒートマップレイヤー（uint8配列をbase64で返す）
+    """
+    if day_type not in DAY_TYPES:
+        raise HTTPException(status_code=400, detail=f"day_type must be one of {list(DAY_TYPES)}")
+    return congestion_heatmap_service.get_layer(day_type, hour)
+
+
+@router.get("/heatmap/{day_type}/{hour}/{ty}/{tx}")
+async def get_heatmap_tile(
+    day_type: str,
+    hour: int = Path(..., ge=0, le=23),
+    ty: int = Path(..., ge=0),
+    tx: int = Path(..., ge=0)
+) -> Response:
+    """
+    ヒートマップのタイル1枚（uint8のバイナリ）
+    """
+    if day_type not in DAY_TYPES:
+        raise HTTPException(status_code=400, detail=f"day_type must be one of {list(DAY_TYPES)}")
+    tile = congestion_heatmap_service.get_tile(day_type, hour, ty, tx)
+    if tile is None:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    # 入力データは静的なため、ブラウザ側でキャッシュさせる
+    return Response(
+        content=tile,
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
+
 @router.get("/refresh-all")
-async def refresh_all_congestion_data(background_tasks: BackgroundTasks) -> Dict:
+async def refresh_all_congestion_data() -> Dict:
     """
-    全エリアの混雑度データを更新
+    全エリアの混雑度データを更新（ジョブスケジューラのワーカーで順次実行）
     """
     areas = await Area.find_all().to_list()
     
-    for area in areas:
-        background_tasks.add_task(
-            refresh_area_congestion,
-            area
+    try:
+        job, created = await job_scheduler.submit(
+            CONGESTION_REFRESH_JOB,
+            [area.code for area in areas],
+            key=f"{CONGESTION_REFRESH_JOB}:all"
         )
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    if created:
+        message = f"Started refreshing congestion data for {len(areas)} areas"
+    else:
+        message = "Refresh is already in progress"
     
     return {
-        "message": f"Started refreshing congestion data for {len(areas)} areas",
-        "areas_count": len(areas)
+        "message": message,
+        "areas_count": len(areas),
+        "job": format_job(job)
     }
 
 
-async def update_congestion_data_in_db(
+@router.post("/area/{area_code}/refresh")
+async def refresh_single_area_congestion(area_code: str) -> Dict:
+    """
+    個別エリアの混雑度データを更新
+    """
+    area = await Area.find_one(Area.code == area_code)
+    if not area:
+        raise HTTPException(status_code=404, detail="Area not found")
+    
+    try:
+        job, created = await job_scheduler.submit(
+            CONGESTION_REFRESH_JOB,
+            [area_code],
+            key=f"{CONGESTION_REFRESH_JOB}:{area_code}"
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return format_job(job)
+
+
+@router.get("/jobs")
+async def list_refresh_jobs(limit: int = 20) -> Dict:
+    """
+    更新ジョブの一覧（新しい順）
+    """
+    jobs = await job_scheduler.list_jobs(limit)
+    return {"jobs": [format_job(job) for job in jobs]}
+
+
+@router.get("/jobs/{job_id}")
+async def get_refresh_job(job_id: str) -> Dict:
+    """
+    更新ジョブの状態と進捗
+    """
+    job = await job_scheduler.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return format_job(job)
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_refresh_job(job_id: str) -> Dict:
+    """
+    更新ジョブをキャンセル
+    """
+    job = await job_scheduler.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return format_job(job)
+
+
+def update_congestion_data_in_db(
     area_code: str,
     area_name: str,
     congestion_data: Dict
 ):
     """
     データベースの混雑度データを更新
+    area_codeごとに書き込みバッファでまとめ、一定間隔でbulk_writeする
     """
-    try:
-        # 既存のデータを検索
-        existing = await CongestionData.find_one(CongestionData.area_code == area_code)
-        
-        if existing:
-            # 更新
-            existing.weekday_congestion = congestion_data['weekday_congestion']
-            existing.weekend_congestion = congestion_data['weekend_congestion']
-            existing.congestion_factors = congestion_data['congestion_factors']
-            existing.congestion_score = congestion_data['congestion_score']
-            existing.facility_congestion = congestion_data.get('facility_congestion', {})
-            existing.updated_at = datetime.now()
-            await existing.save()
-        else:
-            # 新規作成
-            new_congestion = CongestionData(
-                area_code=area_code,
-                area_name=area_name,
-                weekday_congestion=congestion_data['weekday_congestion'],
-                weekend_congestion=congestion_data['weekend_congestion'],
-                congestion_factors=congestion_data['congestion_factors'],
-                congestion_score=congestion_data['congestion_score'],
-                facility_congestion=congestion_data.get('facility_congestion', {}),
-                peak_times=["平日 8:00-9:00", "平日 18:00-19:00"],
-                quiet_times=["週末早朝", "平日 10:00-16:00"]
-            )
-            await new_congestion.insert()
-            
-        logger.info(f"Updated congestion data for {area_name}")
-        
-    except Exception as e:
-        logger.error(f"Error updating congestion data in DB: {e}")
+    if congestion_write_buffer.submit(area_code, area_name, congestion_data):
+        logger.debug(f"Queued congestion data update for {area_name}")
 
 
-async def refresh_area_congestion(area: Area):
+async def refresh_area_congestion(area_code: str):
     """
-    個別エリアの混雑度データを更新
+    個別エリアの混雑度データを更新（ジョブスケジューラのハンドラ）
+    失敗時は例外を送出し、スケジューラに再試行させる
     """
-    try:
+    area = await Area.find_one(Area.code == area_code)
+    if not area:
+        raise ValueError(f"Area not found: {area_code}")
+    
+    # 一括更新は対話的なリクエストより後回しにする
+    with batch_priority():
         congestion_data = await google_congestion_service.get_area_real_congestion(
             area.name,
             area.center_lat,
             area.center_lng
         )
-        
-        await update_congestion_data_in_db(
-            area.code,
-            area.name,
-            congestion_data
-        )
-    except Exception as e:
-        logger.error(f"Error refreshing congestion for {area.name}: {e}")
+    
+    # APIが設定されているのに取得できなかった場合は、既存データをデフォルト値で上書きしない
+    if congestion_data['data_source'] == 'default' and google_congestion_service.places:
+        raise RuntimeError(f"Failed to fetch congestion data for {area.name}")
+    
+    update_congestion_data_in_db(
+        area.code,
+        area.name,
+        congestion_data
+    )
+    
+    # 取得時点（日本時間の曜日・時間帯）の混雑度を履歴として記録
+    now = tokyo_now()
+    hourly = congestion_data['weekend_congestion'] if now.weekday() >= 5 else congestion_data['weekday_congestion']
+    congestion_history_service.record(
+        area.code,
+        hourly.get(str(now.hour), congestion_data['congestion_score']),
+        congestion_data['congestion_score'],
+        congestion_data['data_source']
+    )
+
+
+CONGESTION_REFRESH_JOB = "congestion_refresh"
+job_scheduler.register(CONGESTION_REFRESH_JOB, refresh_area_congestion)
 
 
 def _get_congestion_level_detail(score: float) -> Dict:
@@ -1,16 +1,42 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from datetime import datetime
+import asyncio
+import logging
+from pydantic import BaseModel, Field, ValidationError
+from bson.errors import InvalidId
 from beanie import Document
 from beanie.odm.operators.find.comparison import GTE, LTE, In
 from beanie.odm.operators.find.logical import And, Or
 
 from app.models_mongo.area import Area
+from app.models_mongo.saved_search import SavedSearch, SavedSearchResult
 from app.services.wellbeing_calculator_mongo import WellbeingCalculator, WellbeingWeights
+from app.services.text_search_service import text_search_service
+from app.services.query_advisor import query_advisor
+from app.services.data_version_service import data_version_service, AREA_FIELD_GROUPS
+from app.utils.mongo_filter import matches_filter, iter_field_paths
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 wellbeing_calculator = WellbeingCalculator()
 
+# ウェルビーイングスコアの計算に使われるフィールドグループ
+SCORE_FIELD_GROUPS = [
+    "basic", "housing_data", "safety_data", "school_data",
+    "childcare_data", "park_data", "medical_data", "culture_data"
+]
+
+# ウェルビーイングスコア以外のソート項目が参照するフィールドグループ
+SORT_FIELD_GROUPS = {
+    "rent": ["housing_data"],
+    "name": ["basic"]
+}
+
+# 保存済み検索の一括再計算を直列化するためのロック
+_refresh_lock = asyncio.Lock()
+
 
 class SearchRequest(BaseModel):
     """検索リクエスト"""
@@ -54,81 +80,26 @@ class SearchResult(BaseModel):
     facets: Dict[str, Dict[str, int]]
 
 
+class SavedSearchCreateRequest(BaseModel):
+    """検索条件保存リクエスト"""
+    user_id: str = Field(..., description="ユーザーID")
+    name: str = Field(..., description="保存名")
+    conditions: SearchRequest = Field(..., description="検索条件")
+
+
+class TextSearchResult(BaseModel):
+    """全文検索結果"""
+    query: str
+    total_count: int
+    results: List[Dict]
+
+
 @router.post("/", response_model=SearchResult)
 async def search_areas(request: SearchRequest):
     """
     条件に基づいてエリアを検索
     """
-    # フィルタ条件を構築
-    filters = []
-    
-    # 家賃条件でフィルタ
-    if request.max_rent or request.min_rent:
-        if request.room_type:
-            # 指定された間取りの家賃でフィルタ
-            room_field_map = {
-                "1R": "housing_data.rent_1r",
-                "1K": "housing_data.rent_1k",
-                "1DK": "housing_data.rent_1dk",
-                "1LDK": "housing_data.rent_1ldk",
-                "2LDK": "housing_data.rent_2ldk",
-                "3LDK": "housing_data.rent_3ldk"
-            }
-            
-            if request.room_type in room_field_map:
-                rent_field = room_field_map[request.room_type]
-                if request.max_rent:
-                    filters.append({rent_field: {"$lte": request.max_rent}})
-                if request.min_rent:
-                    filters.append({rent_field: {"$gte": request.min_rent}})
-        else:
-            # 2LDKをデフォルトとして使用
-            if request.max_rent:
-                filters.append({"housing_data.rent_2ldk": {"$lte": request.max_rent}})
-            if request.min_rent:
-                filters.append({"housing_data.rent_2ldk": {"$gte": request.min_rent}})
-    
-    # エリア名でフィルタ
-    if request.area_names:
-        filters.append({"name": {"$in": request.area_names}})
-    
-    # 教育条件でフィルタ
-    if request.min_elementary_schools is not None:
-        filters.append({"school_data.elementary_schools": {"$gte": request.min_elementary_schools}})
-    
-    if request.min_schools is not None:
-        filters.append({
-            "$expr": {
-                "$gte": [
-                    {"$add": ["$school_data.elementary_schools", "$school_data.junior_high_schools"]},
-                    request.min_schools
-                ]
-            }
-        })
-    
-    if request.max_waiting_children is not None:
-        filters.append({"childcare_data.waiting_children": {"$lte": request.max_waiting_children}})
-    
-    # 公園条件でフィルタ
-    if request.min_parks is not None:
-        filters.append({"park_data.total_parks": {"$gte": request.min_parks}})
-    
-    if request.min_park_area_per_capita is not None:
-        filters.append({"park_data.park_area_per_capita": {"$gte": request.min_park_area_per_capita}})
-    
-    # 治安条件でフィルタ
-    if request.max_crime_rate is not None:
-        filters.append({"safety_data.crime_rate": {"$lte": request.max_crime_rate}})
-    
-    # 医療条件でフィルタ
-    if request.min_hospitals is not None:
-        filters.append({"medical_data.total_hospitals": {"$gte": request.min_hospitals}})
-    
-    if request.has_pediatric_clinic:
-        filters.append({"medical_data.has_pediatric_clinic": True})
-    
-    # クエリを構築
-    query_filter = {"$and": filters} if filters else {}
+    query_filter = _build_search_filter(request)
     
     # 総件数を取得
     total_count = await Area.find(query_filter).count()
@@ -140,6 +111,12 @@ async def search_areas(request: SearchRequest):
     elif request.sort_by == "name":
         sort_field = "name"
     
+    # クエリ形状を記録（インデックス診断用）
+    query_advisor.record(
+        query_filter,
+        None if not sort_field else (sort_field if request.sort_order == "asc" else f"-{sort_field}")
+    )
+    
     # ページング付きでエリアを取得
     query = Area.find(query_filter)
     
@@ -246,28 +223,308 @@ async def get_search_suggestions(q: str = Query(..., min_length=1)):
     return {"suggestions": suggestions}
 
 
+@router.get("/text", response_model=TextSearchResult)
+async def search_text(
+    q: str = Query(..., min_length=2, description="検索語（2文字以上）"),
+    kind: Optional[str] = Query(None, description="対象種別（town, childcare_support）"),
+    area_code: Optional[str] = Query(None, description="エリアコードで絞り込み"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    町名・子育て支援制度を全文検索（bigram索引 + BM25）
+    """
+    if kind and kind not in ("town", "childcare_support"):
+        raise HTTPException(status_code=400, detail=f"Invalid kind: {kind}")
+
+    total_count, results = await text_search_service.search(
+        q,
+        limit=limit,
+        kind=kind,
+        area_code=area_code
+    )
+
+    return TextSearchResult(
+        query=q,
+        total_count=total_count,
+        results=results
+    )
+
+
+@router.post("/saved", response_model=Dict)
+async def create_saved_search(request: SavedSearchCreateRequest):
+    """
+    検索条件を保存し、結果を計算して保持
+    """
+    areas = await Area.find_all().to_list()
+    saved_search = SavedSearch(
+        user_id=request.user_id,
+        name=request.name,
+        conditions=request.conditions.model_dump()
+    )
+    _materialize_saved_search(saved_search, areas, await data_version_service.get_versions())
+    await saved_search.insert()
+    
+    return _format_saved_search(saved_search)
+
+
 @router.get("/saved")
 async def get_saved_searches(user_id: str = Query(..., description="ユーザーID")):
     """
     保存された検索条件を取得
     """
-    # TODO: ユーザーの保存済み検索を実装
+    saved_searches = await SavedSearch.find(
+        SavedSearch.user_id == user_id
+    ).sort("-created_at").to_list()
+    
     return {
-        "saved_searches": [
-            {
-                "id": 1,
-                "name": "子育て重視エリア",
-                "conditions": {
-                    "max_rent": 20,
-                    "max_waiting_children": 0,
-                    "min_parks": 5
-                },
-                "created_at": "2024-01-15T10:00:00Z"
-            }
-        ]
+        "saved_searches": [_format_saved_search(saved_search) for saved_search in saved_searches]
+    }
+
+
+@router.post("/saved/refresh")
+async def refresh_saved_searches_endpoint(
+    background_tasks: BackgroundTasks,
+    force: bool = Query(False, description="変更の有無にかかわらず全件再計算")
+):
+    """
+    データ更新後に結果が古くなった保存済み検索をバックグラウンドで一括再計算
+    """
+    background_tasks.add_task(refresh_saved_searches, force)
+    return {"message": "Started refreshing saved searches"}
+
+
+@router.get("/saved/{search_id}")
+async def get_saved_search_results(
+    search_id: str,
+    background_tasks: BackgroundTasks,
+    skip: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100)
+):
+    """
+    保存済み検索の計算済み結果を取得
+    データが更新されていた場合は保存済みの結果を返しつつ、再計算をバックグラウンドで実行
+    """
+    saved_search = await _get_saved_search(search_id)
+    
+    versions = await data_version_service.get_versions()
+    stale = _is_saved_search_stale(saved_search, versions)
+    if stale:
+        background_tasks.add_task(refresh_saved_searches)
+    
+    skip = skip if skip is not None else saved_search.conditions.get("skip", 0)
+    limit = limit if limit is not None else saved_search.conditions.get("limit", 20)
+    
+    response = _format_saved_search(saved_search)
+    response["results"] = [
+        result.model_dump() for result in saved_search.results[skip:skip + limit]
+    ]
+    response["stale"] = stale
+    return response
+
+
+@router.delete("/saved/{search_id}")
+async def delete_saved_search(search_id: str):
+    """
+    保存済み検索を削除
+    """
+    saved_search = await _get_saved_search(search_id)
+    await saved_search.delete()
+    return {"message": "Saved search deleted", "id": search_id}
+
+
+async def refresh_saved_searches(force: bool = False) -> int:
+    """
+    古くなった保存済み検索を一括で再計算
+    エリアデータは一度だけ読み込み、依存フィールドが変化した検索のみ再計算する
+    """
+    async with _refresh_lock:
+        areas = await Area.find_all().to_list()
+        await data_version_service.sync(areas)
+        versions = await data_version_service.get_versions()
+        
+        refreshed = 0
+        for saved_search in await SavedSearch.find_all().to_list():
+            if not force and not _is_saved_search_stale(saved_search, versions):
+                continue
+            
+            _materialize_saved_search(saved_search, areas, versions)
+            await saved_search.save()
+            refreshed += 1
+        
+        if refreshed:
+            logger.info(f"Refreshed {refreshed} saved searches")
+        
+        return refreshed
+
+
+async def _get_saved_search(search_id: str) -> SavedSearch:
+    """IDから保存済み検索を取得"""
+    saved_search = None
+    if len(search_id) == 24:
+        try:
+            saved_search = await SavedSearch.get(search_id)
+        except (InvalidId, ValidationError):
+            pass
+    
+    if not saved_search:
+        raise HTTPException(status_code=404, detail=f"Saved search not found: {search_id}")
+    
+    return saved_search
+
+
+def _materialize_saved_search(saved_search: SavedSearch, areas: List[Area], versions: Dict):
+    """保存済み検索の結果を計算して設定"""
+    request = SearchRequest(**saved_search.conditions)
+    query_filter = _build_search_filter(request)
+    
+    matched = [area for area in areas if matches_filter(area.model_dump(mode="json"), query_filter)]
+    
+    # スコアはスコア順に並べる検索だけ計算する（家賃・名前順の検索はスコアのデータに依存しない）
+    sorts_by_score = _sorts_by_score(request)
+    scored = []
+    for area in matched:
+        score = None
+        if sorts_by_score:
+            score = wellbeing_calculator.calculate_score(area, WellbeingWeights())['total_score']
+        scored.append((area, score))
+    
+    # 検索APIと同じソート項目で並べ替え
+    reverse = request.sort_order != "asc"
+    if request.sort_by == "rent":
+        scored.sort(
+            key=lambda item: (item[0].housing_data.rent_2ldk or 0) if item[0].housing_data else 0,
+            reverse=reverse
+        )
+    elif request.sort_by == "name":
+        scored.sort(key=lambda item: item[0].name, reverse=reverse)
+    else:
+        scored.sort(key=lambda item: item[1], reverse=reverse)
+    
+    dependency_groups = _get_dependency_groups(query_filter, request)
+    
+    saved_search.results = [
+        SavedSearchResult(area_code=area.code, area_name=area.name, score=score)
+        for area, score in scored
+    ]
+    saved_search.total_count = len(scored)
+    saved_search.dependency_groups = dependency_groups
+    saved_search.data_fingerprint = {
+        group: versions.get(group, {}).get("fingerprint", "")
+        for group in dependency_groups
+    }
+    saved_search.computed_at = datetime.utcnow()
+    saved_search.updated_at = datetime.utcnow()
+
+
+def _sorts_by_score(request: SearchRequest) -> bool:
+    """ウェルビーイングスコア順に並べる検索か"""
+    return request.sort_by not in SORT_FIELD_GROUPS
+
+
+def _get_dependency_groups(query_filter: Dict, request: SearchRequest) -> List[str]:
+    """フィルタとソートが参照するフィールドグループを取得（スコア順の場合はスコア計算のグループも含む）"""
+    groups = set(SCORE_FIELD_GROUPS if _sorts_by_score(request) else SORT_FIELD_GROUPS[request.sort_by])
+    for path in iter_field_paths(query_filter):
+        field_name = path.split(".")[0]
+        for group, fields in AREA_FIELD_GROUPS.items():
+            if field_name in fields:
+                groups.add(group)
+    return sorted(groups)
+
+
+def _is_saved_search_stale(saved_search: SavedSearch, versions: Dict) -> bool:
+    """依存フィールドグループのデータが計算時から変化しているか判定"""
+    return any(
+        saved_search.data_fingerprint.get(group) != versions.get(group, {}).get("fingerprint")
+        for group in saved_search.dependency_groups
+    )
+
+
+def _format_saved_search(saved_search: SavedSearch) -> Dict:
+    """保存済み検索をレスポンス形式に整形"""
+    return {
+        "id": str(saved_search.id),
+        "name": saved_search.name,
+        "conditions": saved_search.conditions,
+        "total_count": saved_search.total_count,
+        "computed_at": saved_search.computed_at.isoformat(),
+        "created_at": saved_search.created_at.isoformat()
     }
 
 
+def _build_search_filter(request: SearchRequest) -> Dict:
+    """検索条件からMongoDBのフィルタを構築"""
+    # フィルタ条件を構築
+    filters = []
+    
+    # 家賃条件でフィルタ
+    if request.max_rent or request.min_rent:
+        if request.room_type:
+            # 指定された間取りの家賃でフィルタ
+            room_field_map = {
+                "1R": "housing_data.rent_1r",
+                "1K": "housing_data.rent_1k",
+                "1DK": "housing_data.rent_1dk",
+                "1LDK": "housing_data.rent_1ldk",
+                "2LDK": "housing_data.rent_2ldk",
+                "3LDK": "housing_data.rent_3ldk"
+            }
+            
+            if request.room_type in room_field_map:
+                rent_field = room_field_map[request.room_type]
+                if request.max_rent:
+                    filters.append({rent_field: {"$lte": request.max_rent}})
+                if request.min_rent:
+                    filters.append({rent_field: {"$gte": request.min_rent}})
+        else:
+            # 2LDKをデフォルトとして使用
+            if request.max_rent:
+                filters.append({"housing_data.rent_2ldk": {"$lte": request.max_rent}})
+            if request.min_rent:
+                filters.append({"housing_data.rent_2ldk": {"$gte": request.min_rent}})
+    
+    # エリア名でフィルタ
+    if request.area_names:
+        filters.append({"name": {"$in": request.area_names}})
+    
+    # 教育条件でフィルタ
+    if request.min_elementary_schools is not None:
+        filters.append({"school_data.elementary_schools": {"$gte": request.min_elementary_schools}})
+    
+    if request.min_schools is not None:
+        filters.append({
+            "$expr": {
+                "$gte": [
+                    {"$add": ["$school_data.elementary_schools", "$school_data.junior_high_schools"]},
+                    request.min_schools
+                ]
+            }
+        })
+    
+    if request.max_waiting_children is not None:
+        filters.append({"childcare_data.waiting_children": {"$lte": request.max_waiting_children}})
+    
+    # 公園条件でフィルタ
+    if request.min_parks is not None:
+        filters.append({"park_data.total_parks": {"$gte": request.min_parks}})
+    
+    if request.min_park_area_per_capita is not None:
+        filters.append({"park_data.park_area_per_capita": {"$gte": request.min_park_area_per_capita}})
+    
+    # 治安条件でフィルタ
+    if request.max_crime_rate is not None:
+        filters.append({"safety_data.crime_rate": {"$lte": request.max_crime_rate}})
+    
+    # 医療条件でフィルタ
+    if request.min_hospitals is not None:
+        filters.append({"medical_data.total_hospitals": {"$gte": request.min_hospitals}})
+    
+    if request.has_pediatric_clinic:
+        filters.append({"medical_data.has_pediatric_clinic": True})
+    
+    return {"$and": filters} if filters else {}
+
+
 async def _generate_facets() -> Dict[str, Dict[str, int]]:
     """検索結果のファセット情報を生成"""
     facets = {}
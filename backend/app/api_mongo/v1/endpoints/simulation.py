@@ -1,18 +1,42 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from beanie import Document
+
 import math
+import numpy as np
 
 from app.models_mongo.area import Area
+from app.services.household_budget import (
+    BUDGET_GROUPS,
+    ROOM_TYPES,
+    DEFAULT_RENT,
+    RENT_FIELDS,
+    household_budget_model,
+    monthly_income_yen,
+    fixed_monthly_expenses,
+    education_cost,
+    affordability_score,
+)
+from app.services.rail_network import rail_network
+from app.services.commute_matrix import MAX_COMMUTE_DESTINATIONS, commute_matrix_service
+from app.services.isochrone_service import MAX_ISOCHRONE_MINUTES, isochrone_service
+from app.services.lifestyle_matrix import (
+    LIFESTYLE_GROUPS,
+    lifestyle_matrix,
+    facility_count,
+    park_score,
+    school_score,
+    medical_score,
+    improvement_score,
+)
+from app.services.simulation_cache import simulation_cache
 
 router = APIRouter()
 
 
-class HouseholdSimulationRequest(BaseModel):
-    """家計シミュレーションリクエスト"""
-    area_id: str = Field(..., description="対象エリアID")
-    
+class HouseholdParameters(BaseModel):
+    """家計シミュレーションの世帯条件"""
     # 家族構成
     adults: int = Field(2, ge=1, le=10, description="大人の人数")
     children: int = Field(2, ge=0, le=10, description="子供の人数")
@@ -20,9 +44,6 @@ class HouseholdSimulationRequest(BaseModel):
     # 収入
     annual_income: float = Field(..., description="世帯年収（万円）")
     
-    # 住居
-    room_type: str = Field("2LDK", description="間取り")
-    
     # 通勤
     commute_destinations: List[Dict] = Field(
         default=[],
@@ -34,6 +55,14 @@ class HouseholdSimulationRequest(BaseModel):
     childcare_needed: bool = Field(False, description="保育園利用")
 
 
+class HouseholdSimulationRequest(HouseholdParameters):
+    """家計シミュレーションリクエスト"""
+    area_id: str = Field(..., description="対象エリアID")
+    
+    # 住居
+    room_type: str = Field("2LDK", description="間取り")
+
+
 class HouseholdSimulationResponse(BaseModel):
     """家計シミュレーション結果"""
     area_name: str
@@ -45,10 +74,46 @@ class HouseholdSimulationResponse(BaseModel):
     recommendations: List[str]
 
 
-class LifestyleSimulationRequest(BaseModel):
-    """生活利便性シミュレーションリクエスト"""
+class HouseholdSweepRequest(BaseModel):
+    """家計シミュレーションのパラメータスイープ（年収 × 子供の人数 × 間取り × エリア）"""
+    # 年収の範囲（万円、min から max まで step 刻み）
+    annual_income_min: float = Field(300, gt=0, description="世帯年収の下限（万円）")
+    annual_income_max: float = Field(1500, gt=0, description="世帯年収の上限（万円）")
+    annual_income_step: float = Field(50, ge=1, description="世帯年収の刻み（万円）")
+    
+    # 子供の人数の範囲
+    children_min: int = Field(0, ge=0, le=10, description="子供の人数の下限")
+    children_max: int = Field(3, ge=0, le=10, description="子供の人数の上限")
+    
+    # 間取りとエリア（省略時はすべて）
+    room_types: Optional[List[str]] = Field(None, description="間取りのリスト")
+    area_codes: Optional[List[str]] = Field(None, description="エリアコードのリスト")
+    
+    # 固定の世帯条件
+    adults: int = Field(2, ge=1, le=10, description="大人の人数")
+    commute_count: int = Field(0, ge=0, le=10, description="通勤者の人数")
+    car_ownership: bool = Field(False, description="車の所有")
+    childcare_needed: bool = Field(False, description="保育園利用")
+
+
+class CommuteDestination(BaseModel):
+    """通勤先"""
+    station: str = Field(..., description="駅名")
+    days_per_week: int = Field(5, ge=1, le=7, description="通勤日数/週")
+
+
+class CommuteMatrixRequest(BaseModel):
+    """複数の通勤先に対する通勤時間・通勤費の一括計算リクエスト"""
+    destinations: List[CommuteDestination] = Field(
+        ..., min_length=1, max_length=MAX_COMMUTE_DESTINATIONS, description="通勤先リスト"
+    )
+    include_towns: bool = Field(True, description="町単位の結果も含める")
+    limit: Optional[int] = Field(None, ge=1, description="表示件数（省略時はすべて）")
+
+
+class LifestyleParameters(BaseModel):
+    """生活利便性シミュレーションの条件"""
     current_area_id: str = Field(..., description="現在のエリアID")
-    target_area_id: str = Field(..., description="検討中のエリアID")
     
     # ライフスタイル設定
     work_from_home_days: int = Field(0, ge=0, le=5, description="在宅勤務日数/週")
@@ -61,6 +126,16 @@ class LifestyleSimulationRequest(BaseModel):
     )
 
 
+class LifestyleSimulationRequest(LifestyleParameters):
+    """生活利便性シミュレーションリクエスト"""
+    target_area_id: str = Field(..., description="検討中のエリアID")
+
+
+class LifestyleBatchRequest(LifestyleParameters):
+    """生活利便性シミュレーション（現在のエリア × 全候補エリア）リクエスト"""
+    limit: Optional[int] = Field(None, ge=1, description="表示件数（省略時はすべて）")
+
+
 class LifestyleSimulationResponse(BaseModel):
     """生活利便性シミュレーション結果"""
     current_area: Dict
@@ -73,77 +148,58 @@ class LifestyleSimulationResponse(BaseModel):
 @router.post("/household", response_model=HouseholdSimulationResponse)
 async def simulate_household_budget(request: HouseholdSimulationRequest):
     """
-    家計シミュレーションを実行
+    家計シミュレーションを実行（同じ条件の結果はキャッシュから返す）
     """
+    return await simulation_cache.get_or_compute(
+        "household", request.model_dump(), BUDGET_GROUPS,
+        lambda: _simulate_household_budget(request)
+    )
+
+
+async def _simulate_household_budget(request: HouseholdSimulationRequest) -> HouseholdSimulationResponse:
     area = await Area.get(request.area_id)
     
     if not area:
         raise HTTPException(status_code=404, detail="Area not found")
     
     # 月収を計算
-    monthly_income = request.annual_income / 12 * 10000  # 円に変換
-    
-    # 支出内訳を計算
-    monthly_breakdown = {}
-    
-    # 1. 家賃
-    if area.housing_data:
-        room_rent_map = {
-            "1R": area.housing_data.rent_1r,
-            "1K": area.housing_data.rent_1k,
-            "1DK": area.housing_data.rent_1dk,
-            "1LDK": area.housing_data.rent_1ldk,
-            "2LDK": area.housing_data.rent_2ldk,
-            "3LDK": area.housing_data.rent_3ldk
-        }
-        rent = room_rent_map.get(request.room_type, 15) * 10000  # 円に変換
-    else:
-        rent = 150000  # デフォルト15万円
-    
-    monthly_breakdown["家賃"] = rent
-    
-    # 2. 光熱費（家族人数に応じて）
-    base_utility = 15000
-    utility_per_person = 3000
-    total_people = request.adults + request.children
-    monthly_breakdown["光熱費"] = base_utility + (utility_per_person * total_people)
-    
-    # 3. 食費
-    food_per_adult = 40000
-    food_per_child = 25000
-    monthly_breakdown["食費"] = (
-        food_per_adult * request.adults + 
-        food_per_child * request.children
+    monthly_income = monthly_income_yen(request.annual_income)
+    
+    # 1. 家賃（データがない間取りは既定値）
+    rent_field = RENT_FIELDS.get(request.room_type)
+    rent = None
+    if area.housing_data and rent_field:
+        rent = getattr(area.housing_data, rent_field)
+    rent = (rent if rent is not None else DEFAULT_RENT) * 10000  # 円に変換
+    
+    # 2〜5, 7. 光熱費・食費・通信費・交通費・その他（エリアに依存しない支出）
+    commute_cost = _estimate_commute_cost(request.commute_destinations, area.center_lat, area.center_lng)
+    fixed = fixed_monthly_expenses(
+        request.adults,
+        request.children,
+        len(request.commute_destinations),
+        request.car_ownership,
+        None if commute_cost is None else float(commute_cost[0])
     )
     
-    # 4. 通信費
-    monthly_breakdown["通信費"] = 5000 * request.adults + 2000 * request.children
-    
-    # 5. 交通費
-    transport_cost = 0
-    for commute in request.commute_destinations:
-        # 簡易的な交通費計算（実際はより詳細な計算が必要）
-        monthly_commute = 15000  # 平均的な定期代
-        transport_cost += monthly_commute
-    
-    if request.car_ownership:
-        transport_cost += 30000  # 駐車場代、ガソリン代等
-    
-    monthly_breakdown["交通費"] = transport_cost
-    
-    # 6. 教育費
-    education_cost = 0
-    if request.childcare_needed and area.childcare_data:
-        # 保育料（所得に応じた簡易計算）
-        childcare_rate = min(0.1, max(0.03, (request.annual_income - 400) * 0.0001))
-        education_cost = monthly_income * childcare_rate
-    
-    # 習い事等
-    education_cost += request.children * 15000
-    monthly_breakdown["教育費"] = education_cost
-    
-    # 7. その他（日用品、被服費等）
-    monthly_breakdown["その他"] = total_people * 10000
+    # 6. 教育費（保育料 + 習い事等）
+    education = float(education_cost(
+        monthly_income,
+        request.annual_income,
+        request.children,
+        request.childcare_needed,
+        area.childcare_data is not None
+    ))
+    
+    monthly_breakdown = {
+        "家賃": rent,
+        "光熱費": fixed["光熱費"],
+        "食費": fixed["食費"],
+        "通信費": fixed["通信費"],
+        "交通費": fixed["交通費"],
+        "教育費": education,
+        "その他": fixed["その他"]
+    }
     
     # 合計支出
     total_expense = sum(monthly_breakdown.values())
@@ -156,7 +212,7 @@ async def simulate_household_budget(request: HouseholdSimulationRequest):
     
     # 手取りに対する家賃の割合から affordability score を計算
     rent_ratio = rent / monthly_income
-    affordability_score = max(0, min(100, (1 - rent_ratio * 3) * 100))
+    score = float(affordability_score(rent, monthly_income))
     
     # アドバイス生成
     recommendations = _generate_budget_recommendations(
@@ -169,16 +225,159 @@ async def simulate_household_budget(request: HouseholdSimulationRequest):
         annual_total=total_expense * 12,
         disposable_income=disposable_income,
         savings_rate=round(savings_rate, 1),
-        affordability_score=round(affordability_score, 1),
+        affordability_score=round(score, 1),
         recommendations=recommendations
     )
 
 
+@router.post("/household/map")
+async def simulate_household_budget_map(request: HouseholdParameters):
+    """
+    同じ世帯条件で全エリア × 全間取りの家計をまとめて計算
+    （「どこなら住めるか」の地図表示用に、行列で返す）
+    """
+    return await simulation_cache.get_or_compute(
+        "household_map", request.model_dump(), BUDGET_GROUPS,
+        lambda: _simulate_household_budget_map(request)
+    )
+
+
+async def _simulate_household_budget_map(request: HouseholdParameters) -> Dict:
+    await household_budget_model.ensure_fresh()
+    if not household_budget_model.area_codes:
+        raise HTTPException(status_code=404, detail="No areas found")
+    
+    result = household_budget_model.simulate(
+        request.adults,
+        request.children,
+        request.annual_income,
+        len(request.commute_destinations),
+        request.car_ownership,
+        request.childcare_needed,
+        _estimate_commute_cost(
+            request.commute_destinations, household_budget_model.area_lat, household_budget_model.area_lng
+        )
+    )
+    
+    # エリアごとに、家賃負担率が目安以内で最も広い間取り
+    affordable = result["affordable"]
+    largest_affordable = np.where(
+        affordable.any(axis=1),
+        len(ROOM_TYPES) - 1 - np.argmax(affordable[:, ::-1], axis=1),
+        -1
+    )
+    
+    return {
+        "room_types": list(ROOM_TYPES),
+        "areas": [
+            {"code": code, "name": name}
+            for code, name in zip(household_budget_model.area_codes, household_budget_model.area_names)
+        ],
+        "monthly_income": monthly_income_yen(request.annual_income),
+        "rent": np.rint(result["rent"]).astype(int).tolist(),
+        "has_rent_data": household_budget_model.has_rent_data.tolist(),
+        "disposable_income": np.rint(result["disposable_income"]).astype(int).tolist(),
+        "savings_rate": np.round(result["savings_rate"], 1).tolist(),
+        "affordability_score": np.round(result["affordability_score"], 1).tolist(),
+        "affordable": affordable.tolist(),
+        "largest_affordable_room_type": {
+            code: ROOM_TYPES[index] if index >= 0 else None
+            for code, index in zip(household_budget_model.area_codes, largest_affordable.tolist())
+        },
+        "affordable_area_counts": dict(zip(ROOM_TYPES, affordable.sum(axis=0).astype(int).tolist()))
+    }
+
+
+@router.post("/household/sweep")
+async def sweep_household_budget(request: HouseholdSweepRequest):
+    """
+    年収 × 子供の人数 × エリア × 間取り の全組み合わせで affordability score と貯蓄率を計算
+    （同じ条件の結果はキャッシュから返す）
+    """
+    if request.annual_income_min > request.annual_income_max:
+        raise HTTPException(status_code=400, detail="annual_income_min must not exceed annual_income_max")
+    if request.children_min > request.children_max:
+        raise HTTPException(status_code=400, detail="children_min must not exceed children_max")
+    
+    await household_budget_model.ensure_fresh()
+    
+    # 年収の軸の要素数からセル数を先に確認（巨大な配列を作らない）
+    income_count = math.floor(
+        (request.annual_income_max - request.annual_income_min) / request.annual_income_step + 0.5
+    ) + 1
+    try:
+        household_budget_model.check_sweep_size(
+            income_count,
+            request.children_max - request.children_min + 1,
+            request.room_types,
+            request.area_codes
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    incomes = np.arange(
+        request.annual_income_min,
+        request.annual_income_max + request.annual_income_step / 2,
+        request.annual_income_step
+    )
+    try:
+        return await household_budget_model.sweep(
+            incomes.tolist(),
+            range(request.children_min, request.children_max + 1),
+            request.room_types,
+            request.area_codes,
+            request.adults,
+            request.commute_count,
+            request.car_ownership,
+            request.childcare_needed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/commute-matrix")
+async def calculate_commute_matrix(request: CommuteMatrixRequest):
+    """
+    複数の通勤先（週の通勤日数つき）に対する全区・全町の通勤時間と通勤費を計算し、
+    重み付き通勤時間の短い順に返す
+    """
+    try:
+        return await commute_matrix_service.rank(
+            [destination.model_dump() for destination in request.destinations],
+            request.include_towns,
+            request.limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/isochrone")
+async def get_isochrone(
+    station: str,
+    minutes: float = Query(30, gt=0, le=MAX_ISOCHRONE_MINUTES, description="所要時間（分、5分単位に切り上げ）"),
+    polygon: bool = Query(False, description="圏内の区の境界を結合したポリゴンを含める")
+):
+    """
+    駅から指定時間内に行ける区・町・駅（等時間圏）
+    """
+    result = await isochrone_service.get_isochrone(station, minutes, polygon)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Station not found: {station}")
+    return result
+
+
 @router.post("/lifestyle", response_model=LifestyleSimulationResponse)
 async def simulate_lifestyle_change(request: LifestyleSimulationRequest):
     """
-    転居による生活の変化をシミュレーション
+    転居による生活の変化をシミュレーション（同じ条件の結果はキャッシュから返す）
     """
+    return await simulation_cache.get_or_compute(
+        "lifestyle", request.model_dump(), LIFESTYLE_GROUPS + ("childcare_data",),
+        lambda: _simulate_lifestyle_change(request)
+    )
+
+
+async def _simulate_lifestyle_change(request: LifestyleSimulationRequest) -> LifestyleSimulationResponse:
     current_area = await Area.get(request.current_area_id)
     target_area = await Area.get(request.target_area_id)
     
@@ -207,8 +406,7 @@ async def simulate_lifestyle_change(request: LifestyleSimulationRequest):
     improvements = sum(1 for c in comparison.values() if c["change"] > 0)
     deteriorations = sum(1 for c in comparison.values() if c["change"] < 0)
     
-    overall_score = 50 + (improvements - deteriorations) * 10
-    overall_score = max(0, min(100, overall_score))
+    overall_score = float(improvement_score(improvements, deteriorations))
     
     return LifestyleSimulationResponse(
         current_area={
@@ -225,47 +423,108 @@ async def simulate_lifestyle_change(request: LifestyleSimulationRequest):
     )
 
 
+@router.post("/lifestyle/batch")
+async def simulate_lifestyle_change_batch(request: LifestyleBatchRequest):
+    """
+    現在のエリアと他の全エリアを比較し、総合改善スコアの高い順に返す
+    （「どこに引っ越すべきか」を1回のリクエストで評価）
+    """
+    return await simulation_cache.get_or_compute(
+        "lifestyle_batch", request.model_dump(), LIFESTYLE_GROUPS,
+        lambda: _simulate_lifestyle_change_batch(request)
+    )
+
+
+async def _simulate_lifestyle_change_batch(request: LifestyleBatchRequest) -> Dict:
+    await lifestyle_matrix.ensure_fresh()
+    current_index = lifestyle_matrix.index_of(request.current_area_id)
+    if current_index is None:
+        raise HTTPException(status_code=404, detail="Area not found")
+    
+    result = lifestyle_matrix.compare(current_index, request.children_ages, request.important_facilities)
+    scores = result["overall_improvement_score"]
+    
+    # 総合改善スコアの高い順（同点なら改善した項目の多い順）、現在のエリアは除く
+    order = [
+        index for index in np.lexsort((-result["improvements"], -scores)).tolist()
+        if index != current_index
+    ]
+    if request.limit is not None:
+        order = order[:request.limit]
+    
+    return {
+        "current_area": {
+            "id": lifestyle_matrix.area_ids[current_index],
+            "code": lifestyle_matrix.area_codes[current_index],
+            "name": lifestyle_matrix.area_names[current_index],
+            "evaluation": _matrix_evaluation(result["evaluation"], current_index)
+        },
+        "candidates": [
+            {
+                "rank": rank,
+                "id": lifestyle_matrix.area_ids[index],
+                "code": lifestyle_matrix.area_codes[index],
+                "name": lifestyle_matrix.area_names[index],
+                "evaluation": _matrix_evaluation(result["evaluation"], index),
+                "comparison": {
+                    facility: {
+                        "current": float(result["values"][i, current_index]),
+                        "target": float(result["values"][i, index]),
+                        "change": float(result["change"][i, index])
+                    }
+                    for i, facility in enumerate(request.important_facilities)
+                },
+                "overall_improvement_score": round(float(scores[index]), 1)
+            }
+            for rank, index in enumerate(order, 1)
+        ],
+        "total_candidates": len(lifestyle_matrix.area_codes) - 1
+    }
+
+
 @router.get("/commute-time")
 async def estimate_commute_time(from_area_id: str, to_station: str):
     """
-    通勤時間を推定
+    通勤時間を推定（エリアの中心 → 最寄り駅 → 鉄道ネットワークの最短経路）
     """
     area = await Area.get(from_area_id)
     
     if not area:
         raise HTTPException(status_code=404, detail="Area not found")
     
-    # 簡易的な通勤時間推定（実際は経路検索APIを使用）
-    # エリアの中心から主要駅までの推定時間
-    major_stations = {
-        "東京": {"lat": 35.6812, "lng": 139.7671},
-        "新宿": {"lat": 35.6896, "lng": 139.7006},
-        "渋谷": {"lat": 35.6580, "lng": 139.7016},
-        "品川": {"lat": 35.6284, "lng": 139.7387},
-        "池袋": {"lat": 35.7295, "lng": 139.7109}
-    }
+    route = rail_network.point_to_station(area.center_lat, area.center_lng, to_station)
     
-    if to_station not in major_stations:
-        # デフォルトの推定時間
-        estimated_time = 45
-    else:
-        # 距離に基づく簡易計算
-        station = major_stations[to_station]
-        distance = math.sqrt(
-            (area.center_lat - station["lat"]) ** 2 +
-            (area.center_lng - station["lng"]) ** 2
-        )
-        # 1度あたり約90km、平均速度30km/hと仮定
-        estimated_time = int(distance * 90 / 30 * 60)
+    if route is None:
+        # 路線データにない駅はデフォルトの推定時間
+        return {
+            "from_area": area.name,
+            "to_station": to_station,
+            "estimated_minutes": 45,
+            "note": "駅が見つからないため既定値です。"
+        }
     
     return {
         "from_area": area.name,
         "to_station": to_station,
-        "estimated_minutes": estimated_time,
-        "note": "簡易推定値です。実際の所要時間は経路により異なります。"
+        "estimated_minutes": int(round(route["total_minutes"])),
+        "route": route,
+        "note": "駅の位置と路線データからの推定値です。実際の所要時間は経路・時間帯により異なります。"
     }
 
 
+def _estimate_commute_cost(destinations: List[Dict], lat, lng) -> Optional[np.ndarray]:
+    """
+    通勤先の駅から地点ごとの月々の通勤費を推定
+    通勤先がない、または路線データにない駅を含む場合はNone（一律の定期代で計算）
+    """
+    if not destinations:
+        return None
+    try:
+        return commute_matrix_service.evaluate_points(lat, lng, destinations)["monthly_cost"]
+    except ValueError:
+        return None
+
+
 def _generate_budget_recommendations(
     monthly_income: float,
     breakdown: Dict[str, float],
@@ -304,45 +563,52 @@ def _generate_budget_recommendations(
     return recommendations
 
 
-def _evaluate_lifestyle(area: Area, request: LifestyleSimulationRequest) -> Dict[str, float]:
+def _evaluate_lifestyle(area: Area, request: LifestyleParameters) -> Dict[str, float]:
     """エリアの生活利便性を評価"""
     evaluation = {}
     
     # 公園評価
     if area.park_data:
-        park_score = min(100, area.park_data.total_parks * 2)
-        if area.park_data.children_parks:
-            park_score += min(20, area.park_data.children_parks * 5)
-        evaluation["parks"] = park_score
+        evaluation["parks"] = float(park_score(
+            facility_count(area, "park_data", "total_parks"),
+            facility_count(area, "park_data", "children_parks")
+        ))
     
     # 学校評価
     if area.school_data:
-        school_score = 0
-        if any(age < 13 for age in request.children_ages):
-            school_score = min(100, area.school_data.elementary_schools * 10)
-        if any(13 <= age < 16 for age in request.children_ages):
-            school_score += min(50, area.school_data.junior_high_schools * 10)
-        evaluation["schools"] = school_score
+        evaluation["schools"] = float(school_score(
+            facility_count(area, "school_data", "elementary_schools"),
+            facility_count(area, "school_data", "junior_high_schools"),
+            request.children_ages
+        ))
     
     # 医療評価
     if area.medical_data:
-        medical_score = min(100, 
-            area.medical_data.hospitals * 20 +
-            area.medical_data.clinics * 2
-        )
-        if request.children_ages:  # 子供がいる場合
-            medical_score += min(30, area.medical_data.pediatric_clinics * 10)
-        evaluation["hospitals"] = medical_score
+        evaluation["hospitals"] = float(medical_score(
+            facility_count(area, "medical_data", "hospitals"),
+            facility_count(area, "medical_data", "clinics"),
+            facility_count(area, "medical_data", "pediatric_clinics"),
+            bool(request.children_ages)  # 子供がいる場合
+        ))
     
     return evaluation
 
 
+def _matrix_evaluation(evaluation: Dict[str, np.ndarray], index: int) -> Dict[str, float]:
+    """行列の評価から1エリア分を取り出す（データのない項目は含めない）"""
+    return {
+        facility: float(values[index])
+        for facility, values in evaluation.items()
+        if not np.isnan(values[index])
+    }
+
+
 def _analyze_lifestyle_changes(
     current: Area,
     target: Area,
     current_eval: Dict,
     target_eval: Dict,
-    request: LifestyleSimulationRequest
+    request: LifestyleParameters
 ) -> List[str]:
     """生活の変化を分析"""
     changes = []
@@ -357,8 +623,9 @@ def _analyze_lifestyle_changes(
     # 子育て環境の変化
     if request.children_ages:
         if target.childcare_data and current.childcare_data:
-            target_waiting = target.childcare_data.waiting_children
-            current_waiting = current.childcare_data.waiting_children
+            # 待機児童数がない場合は0として比較
+            target_waiting = target.childcare_data.waiting_children or 0
+            current_waiting = current.childcare_data.waiting_children or 0
             
             if target_waiting < current_waiting:
                 changes.append("保育園の入りやすさが改善される可能性があります。")
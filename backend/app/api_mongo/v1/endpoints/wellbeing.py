@@ -5,6 +5,7 @@ from beanie import Document
 
 from app.models_mongo.area import Area
 from app.services.wellbeing_calculator_mongo import WellbeingCalculator, WellbeingWeights
+from app.services.commute_matrix import commute_matrix_service
 
 router = APIRouter()
 wellbeing_calculator = WellbeingCalculator()
@@ -51,6 +52,10 @@ class RankingRequest(BaseModel):
         description="カテゴリ別重み"
     )
     target_rent: Optional[float] = Field(None, description="希望家賃（万円）")
+    commute_destinations: List[Dict] = Field(
+        default=[],
+        description="通勤先リスト [{station: str, days_per_week: int}]（指定時は commute カテゴリを評価）"
+    )
     limit: int = Field(10, ge=1, le=50, description="表示件数")
 
 
@@ -121,11 +126,20 @@ async def get_area_ranking(request: RankingRequest):
     # 重みオブジェクトを作成
     weights = WellbeingWeights(**request.weights)
     
+    # 通勤先が指定されていれば区ごとの通勤時間を計算
+    commute_minutes = None
+    if request.commute_destinations:
+        try:
+            commute_minutes = await commute_matrix_service.ward_minutes(request.commute_destinations)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     # ランキング計算
     ranked_areas = wellbeing_calculator.rank_areas(
         areas,
         weights,
-        request.target_rent
+        request.target_rent,
+        commute_minutes
     )
     
     # 結果を整形
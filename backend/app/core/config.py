@@ -14,12 +14,24 @@ class Settings(BaseSettings):
     # 東京都オープンデータAPI設定
     TOKYO_OPENDATA_API_URL: str = "https://catalog.data.metro.tokyo.lg.jp/api/3"
     TOKYO_OPENDATA_API_KEY: str = ""
+    # 東京都オープンデータAPIのレート制限（1秒あたりのリクエスト数）
+    TOKYO_OPENDATA_RATE_PER_SECOND: float = 2.0
     
     # 地図API設定
     MAPBOX_ACCESS_TOKEN: str = ""
     
     # Google Places API設定
     GOOGLE_PLACES_API_KEY: str = ""
+    # Places APIのベースURL（ローカルのスタブサーバーで動作確認する場合に変更）
+    GOOGLE_PLACES_API_URL: str = "https://maps.googleapis.com"
+    # Places APIへの同時リクエスト数の上限
+    GOOGLE_PLACES_MAX_CONCURRENCY: int = 8
+    # Places APIのレート制限（1秒あたりのリクエスト数）と1日あたりの上限（課金予算）
+    GOOGLE_PLACES_RATE_PER_SECOND: float = 10.0
+    GOOGLE_PLACES_DAILY_QUOTA: int = 1000
+    # Places API応答の永続キャッシュ（SQLite）
+    PLACES_CACHE_ENABLED: bool = True
+    PLACES_CACHE_PATH: str = "./places_cache.db"
     
     # Google Maps API設定（スクリプト用）
     GOOGLE_MAPS_API_KEY: str = ""
@@ -42,6 +54,31 @@ class Settings(BaseSettings):
     # データ更新設定
     DATA_UPDATE_INTERVAL_HOURS: int = 24
     
+    # 混雑度データ一括更新のワーカー数
+    CONGESTION_REFRESH_WORKERS: int = 4
+    # 一括更新ジョブの担当の有効期限（秒）。実行中のプロセスが定期的に延長し、切れたジョブは他のプロセスが引き継ぐ
+    REFRESH_JOB_LEASE_SECONDS: float = 60.0
+    # 混雑度データの書き込みバッファを書き出す間隔（秒）
+    CONGESTION_WRITE_FLUSH_SECONDS: float = 5.0
+    # 混雑度の観測値を時系列コレクションに書き出す間隔（秒）と集計値を更新する間隔（分）
+    CONGESTION_HISTORY_FLUSH_SECONDS: float = 60.0
+    CONGESTION_ROLLUP_INTERVAL_MINUTES: int = 15
+    # 書き出せずにバッファに残す観測値の上限（超えた分は古いものから破棄）
+    CONGESTION_HISTORY_MAX_BUFFER: int = 10000
+    # 混雑度予測の再学習の間隔（分）
+    CONGESTION_FORECAST_REFRESH_MINUTES: int = 60
+    # 混雑度の更新配信（SSE）の計算間隔とハートビートの間隔（秒）
+    CONGESTION_STREAM_INTERVAL_SECONDS: float = 30.0
+    CONGESTION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    
+    # シミュレーション結果のキャッシュ（mongo: 全ワーカーで共有 / memory: プロセス内 / none: 無効）
+    SIMULATION_CACHE_BACKEND: str = "mongo"
+    SIMULATION_CACHE_TTL_SECONDS: float = 6 * 60 * 60
+    SIMULATION_CACHE_MAX_ENTRIES: int = 5000
+    
+    # 起動時（init_beanie後）に検索用の推奨インデックスを作成する
+    CREATE_RECOMMENDED_INDEXES: bool = False
+    
     # スコア計算設定
     DEFAULT_WEIGHTS: dict = {
         "rent": 0.25,
@@ -0,0 +1,390 @@
+"""
+東京23区の鉄道駅データ（駅の座標と乗り入れ路線）
+路線は scripts/enhance_stations_batch.py の STATION_LINES と
+scripts/map_towns_to_stations_simple.py の STATION_LINE_MAPPING を統合したもの
+（「JR山手線（大塚）」のような括弧書きは路線名に統一）
+同名の別駅と混同している路線（霞ヶ関の東武東上線など）は23区内の駅の路線に修正
+座標は駅の代表地点（概略値）
+"""
+
+# 駅名 -> (緯度, 経度, 路線リスト)
+RAIL_STATIONS = {
+    # 千代田区
+    "東京": (35.6812, 139.7671, ["JR山手線", "JR京浜東北線", "JR東海道線", "JR中央線", "東京メトロ丸ノ内線"]),
+    "有楽町": (35.6751, 139.7630, ["JR山手線", "JR京浜東北線", "東京メトロ有楽町線"]),
+    "秋葉原": (35.6984, 139.7731, ["JR山手線", "JR京浜東北線", "JR総武線", "東京メトロ日比谷線", "つくばエクスプレス"]),
+    "神田": (35.6918, 139.7709, ["JR山手線", "JR京浜東北線", "JR中央線", "東京メトロ銀座線"]),
+    "御茶ノ水": (35.6996, 139.7650, ["JR中央線", "JR総武線", "東京メトロ丸ノ内線", "東京メトロ千代田線"]),
+    "大手町": (35.6859, 139.7662, ["東京メトロ丸ノ内線", "東京メトロ東西線", "東京メトロ千代田線", "東京メトロ半蔵門線", "都営三田線"]),
+    "日比谷": (35.6745, 139.7600, ["東京メトロ千代田線", "東京メトロ日比谷線", "都営三田線"]),
+    "霞ヶ関": (35.6734, 139.7506, ["東京メトロ丸ノ内線", "東京メトロ日比谷線", "東京メトロ千代田線"]),
+    "永田町": (35.6786, 139.7403, ["東京メトロ有楽町線", "東京メトロ半蔵門線", "東京メトロ南北線"]),
+    "麹町": (35.6839, 139.7373, ["東京メトロ有楽町線"]),
+    "九段下": (35.6955, 139.7514, ["東京メトロ東西線", "東京メトロ半蔵門線", "都営新宿線"]),
+    "神保町": (35.6959, 139.7576, ["東京メトロ半蔵門線", "都営三田線", "都営新宿線"]),
+    "飯田橋": (35.7020, 139.7450, ["JR中央線", "JR総武線", "東京メトロ東西線", "東京メトロ有楽町線", "東京メトロ南北線", "都営大江戸線"]),
+    "市ヶ谷": (35.6911, 139.7357, ["JR中央線", "東京メトロ有楽町線", "東京メトロ南北線", "都営新宿線"]),
+    "竹橋": (35.6907, 139.7578, ["東京メトロ東西線"]),
+    "岩本町": (35.6956, 139.7757, ["都営新宿線"]),
+    "小川町": (35.6952, 139.7667, ["都営新宿線"]),
+    "桜田門": (35.6776, 139.7514, ["東京メトロ有楽町線"]),
+    "末広町": (35.7028, 139.7716, ["東京メトロ銀座線"]),
+    # 中央区
+    "銀座": (35.6717, 139.7650, ["東京メトロ銀座線", "東京メトロ丸ノ内線", "東京メトロ日比谷線"]),
+    "銀座一丁目": (35.6744, 139.7671, ["東京メトロ有楽町線"]),
+    "東銀座": (35.6695, 139.7672, ["東京メトロ日比谷線", "都営浅草線"]),
+    "日本橋": (35.6822, 139.7740, ["東京メトロ銀座線", "東京メトロ東西線", "都営浅草線"]),
+    "三越前": (35.6870, 139.7734, ["東京メトロ銀座線", "東京メトロ半蔵門線"]),
+    "京橋": (35.6766, 139.7703, ["東京メトロ銀座線"]),
+    "宝町": (35.6755, 139.7719, ["都営浅草線"]),
+    "築地": (35.6675, 139.7720, ["東京メトロ日比谷線"]),
+    "築地市場": (35.6648, 139.7668, ["都営大江戸線"]),
+    "新富町": (35.6707, 139.7733, ["東京メトロ有楽町線"]),
+    "月島": (35.6640, 139.7843, ["東京メトロ有楽町線", "都営大江戸線"]),
+    "勝どき": (35.6585, 139.7768, ["都営大江戸線"]),
+    "人形町": (35.6862, 139.7823, ["東京メトロ日比谷線", "都営浅草線"]),
+    "茅場町": (35.6797, 139.7800, ["東京メトロ東西線", "東京メトロ日比谷線"]),
+    "浜町": (35.6882, 139.7880, ["都営新宿線"]),
+    "馬喰横山": (35.6927, 139.7827, ["都営新宿線"]),
+    "東日本橋": (35.6922, 139.7850, ["都営浅草線"]),
+    # 港区
+    "品川": (35.6285, 139.7388, ["JR山手線", "JR京浜東北線", "JR東海道線", "京急本線"]),
+    "浜松町": (35.6555, 139.7570, ["JR山手線", "JR京浜東北線", "東京モノレール"]),
+    "大門": (35.6566, 139.7546, ["都営浅草線", "都営大江戸線"]),
+    "新橋": (35.6663, 139.7583, ["JR山手線", "JR京浜東北線", "JR東海道線", "東京メトロ銀座線", "都営浅草線"]),
+    "汐留": (35.6630, 139.7600, ["都営大江戸線", "ゆりかもめ"]),
+    "内幸町": (35.6697, 139.7556, ["都営三田線"]),
+    "御成門": (35.6613, 139.7514, ["都営三田線"]),
+    "芝公園": (35.6541, 139.7495, ["都営三田線"]),
+    "竹芝": (35.6534, 139.7617, ["ゆりかもめ"]),
+    "田町": (35.6457, 139.7476, ["JR山手線", "JR京浜東北線"]),
+    "三田": (35.6484, 139.7487, ["都営浅草線", "都営三田線"]),
+    "泉岳寺": (35.6386, 139.7401, ["都営浅草線", "京急本線"]),
+    "高輪台": (35.6318, 139.7301, ["都営浅草線"]),
+    "白金高輪": (35.6429, 139.7343, ["東京メトロ南北線", "都営三田線"]),
+    "白金台": (35.6380, 139.7262, ["東京メトロ南北線", "都営三田線"]),
+    "六本木": (35.6628, 139.7314, ["東京メトロ日比谷線", "都営大江戸線"]),
+    "六本木一丁目": (35.6652, 139.7391, ["東京メトロ南北線"]),
+    "麻布十番": (35.6545, 139.7370, ["東京メトロ南北線", "都営大江戸線"]),
+    "赤坂見附": (35.6770, 139.7370, ["東京メトロ銀座線", "東京メトロ丸ノ内線"]),
+    "溜池山王": (35.6737, 139.7413, ["東京メトロ銀座線", "東京メトロ南北線"]),
+    "青山一丁目": (35.6727, 139.7240, ["東京メトロ銀座線", "東京メトロ半蔵門線", "都営大江戸線"]),
+    "外苑前": (35.6703, 139.7179, ["東京メトロ銀座線"]),
+    "台場": (35.6259, 139.7714, ["ゆりかもめ"]),
+    "お台場海浜公園": (35.6292, 139.7786, ["ゆりかもめ"]),
+    "芝浦ふ頭": (35.6424, 139.7582, ["ゆりかもめ"]),
+    # 新宿区
+    "新宿": (35.6896, 139.7006, ["JR山手線", "JR中央線", "JR埼京線", "JR湘南新宿ライン", "小田急線", "京王線", "東京メトロ丸ノ内線", "東京メトロ副都心線", "都営新宿線", "都営大江戸線"]),
+    "西武新宿": (35.6947, 139.7000, ["西武新宿線"]),
+    "新宿三丁目": (35.6906, 139.7048, ["東京メトロ丸ノ内線", "東京メトロ副都心線", "都営新宿線"]),
+    "南新宿": (35.6832, 139.6985, ["小田急線"]),
+    "新大久保": (35.7012, 139.7000, ["JR山手線"]),
+    "高田馬場": (35.7126, 139.7038, ["JR山手線", "東京メトロ東西線", "西武新宿線"]),
+    "四ツ谷": (35.6860, 139.7303, ["JR中央線", "東京メトロ丸ノ内線", "東京メトロ南北線"]),
+    "曙橋": (35.6924, 139.7226, ["都営新宿線"]),
+    "早稲田": (35.7058, 139.7214, ["都電荒川線", "東京メトロ東西線"]),
+    "神楽坂": (35.7037, 139.7344, ["東京メトロ東西線"]),
+    "落合": (35.7107, 139.6871, ["東京メトロ東西線"]),
+    "下落合": (35.7166, 139.6955, ["西武新宿線"]),
+    "中井": (35.7144, 139.6862, ["西武新宿線", "都営大江戸線"]),
+    "面影橋": (35.7131, 139.7135, ["都電荒川線"]),
+    "学習院下": (35.7176, 139.7137, ["都電荒川線"]),
+    # 文京区
+    "後楽園": (35.7077, 139.7519, ["東京メトロ丸ノ内線", "東京メトロ南北線"]),
+    "春日": (35.7090, 139.7530, ["東京メトロ丸ノ内線", "東京メトロ南北線", "都営三田線", "都営大江戸線"]),
+    "水道橋": (35.7021, 139.7533, ["JR中央線", "JR総武線", "都営三田線"]),
+    "本郷三丁目": (35.7070, 139.7600, ["東京メトロ丸ノ内線", "都営大江戸線"]),
+    "東大前": (35.7176, 139.7580, ["東京メトロ南北線"]),
+    "根津": (35.7175, 139.7656, ["東京メトロ千代田線"]),
+    "千駄木": (35.7255, 139.7631, ["東京メトロ千代田線"]),
+    "白山": (35.7210, 139.7520, ["都営三田線"]),
+    "千石": (35.7277, 139.7443, ["都営三田線"]),
+    "護国寺": (35.7195, 139.7273, ["東京メトロ有楽町線"]),
+    "江戸川橋": (35.7098, 139.7335, ["東京メトロ有楽町線"]),
+    # 台東区
+    "上野": (35.7138, 139.7773, ["JR山手線", "JR京浜東北線", "JR常磐線", "JR宇都宮線", "JR高崎線", "東京メトロ銀座線", "東京メトロ日比谷線"]),
+    "京成上野": (35.7113, 139.7737, ["京成本線"]),
+    "上野広小路": (35.7078, 139.7726, ["東京メトロ銀座線"]),
+    "御徒町": (35.7075, 139.7748, ["JR山手線", "JR京浜東北線"]),
+    "新御徒町": (35.7069, 139.7815, ["つくばエクスプレス", "都営大江戸線"]),
+    "鶯谷": (35.7207, 139.7788, ["JR山手線", "JR京浜東北線"]),
+    "稲荷町": (35.7114, 139.7827, ["東京メトロ銀座線"]),
+    "田原町": (35.7097, 139.7909, ["東京メトロ銀座線"]),
+    "浅草": (35.7106, 139.7976, ["東京メトロ銀座線", "都営浅草線", "東武伊勢崎線", "つくばエクスプレス"]),
+    "浅草橋": (35.6975, 139.7861, ["JR総武線", "都営浅草線"]),
+    "蔵前": (35.7035, 139.7908, ["都営浅草線", "都営大江戸線"]),
+    # 墨田区
+    "錦糸町": (35.6969, 139.8140, ["JR総武線", "東京メトロ半蔵門線"]),
+    "両国": (35.6962, 139.7935, ["JR総武線", "都営大江戸線"]),
+    "押上": (35.7104, 139.8134, ["東京メトロ半蔵門線", "都営浅草線", "京成押上線", "東武伊勢崎線"]),
+    "とうきょうスカイツリー": (35.7100, 139.8090, ["東武伊勢崎線"]),
+    "本所吾妻橋": (35.7086, 139.8044, ["都営浅草線"]),
+    "曳舟": (35.7187, 139.8166, ["東武伊勢崎線", "東武亀戸線"]),
+    "東向島": (35.7243, 139.8195, ["東武伊勢崎線"]),
+    "鐘ヶ淵": (35.7336, 139.8200, ["東武伊勢崎線"]),
+    "菊川": (35.6884, 139.8060, ["都営新宿線"]),
+    "森下": (35.6879, 139.7970, ["東京メトロ半蔵門線", "都営新宿線"]),
+    # 江東区
+    "住吉": (35.6893, 139.8158, ["東京メトロ半蔵門線", "都営新宿線"]),
+    "亀戸": (35.6975, 139.8265, ["JR総武線", "東武亀戸線"]),
+    "清澄白河": (35.6820, 139.7990, ["東京メトロ半蔵門線", "都営大江戸線"]),
+    "門前仲町": (35.6717, 139.7960, ["東京メトロ東西線", "都営大江戸線"]),
+    "木場": (35.6693, 139.8066, ["東京メトロ東西線"]),
+    "東陽町": (35.6697, 139.8175, ["東京メトロ東西線"]),
+    "南砂町": (35.6684, 139.8309, ["東京メトロ東西線"]),
+    "大島": (35.6898, 139.8352, ["都営新宿線"]),
+    "西大島": (35.6893, 139.8260, ["都営新宿線"]),
+    "東大島": (35.6898, 139.8462, ["都営新宿線"]),
+    "豊洲": (35.6549, 139.7963, ["東京メトロ有楽町線", "ゆりかもめ"]),
+    "新豊洲": (35.6485, 139.7895, ["ゆりかもめ"]),
+    "市場前": (35.6453, 139.7860, ["ゆりかもめ"]),
+    "辰巳": (35.6450, 139.8103, ["東京メトロ有楽町線"]),
+    "新木場": (35.6460, 139.8270, ["JR京葉線", "東京メトロ有楽町線", "りんかい線"]),
+    "東雲": (35.6415, 139.8040, ["りんかい線"]),
+    "国際展示場": (35.6341, 139.7907, ["りんかい線"]),
+    "有明": (35.6344, 139.7930, ["ゆりかもめ", "りんかい線"]),
+    "有明テニスの森": (35.6400, 139.7886, ["ゆりかもめ"]),
+    "東京ビッグサイト": (35.6300, 139.7940, ["ゆりかもめ"]),
+    "東京テレポート": (35.6275, 139.7790, ["りんかい線"]),
+    "青海": (35.6243, 139.7811, ["ゆりかもめ"]),
+    "テレコムセンター": (35.6177, 139.7795, ["ゆりかもめ"]),
+    "東京国際クルーズターミナル": (35.6203, 139.7750, ["ゆりかもめ"]),
+    # 品川区
+    "大崎": (35.6197, 139.7286, ["JR山手線", "JR埼京線", "JR湘南新宿ライン", "りんかい線"]),
+    "五反田": (35.6262, 139.7236, ["JR山手線", "都営浅草線", "東急池上線"]),
+    "目黒": (35.6339, 139.7158, ["JR山手線", "東京メトロ南北線", "都営三田線", "東急目黒線"]),
+    "不動前": (35.6256, 139.7134, ["東急目黒線"]),
+    "武蔵小山": (35.6204, 139.7043, ["東急目黒線"]),
+    "西小山": (35.6158, 139.6989, ["東急目黒線"]),
+    "戸越": (35.6147, 139.7160, ["都営浅草線"]),
+    "中延": (35.6058, 139.7125, ["都営浅草線", "東急大井町線"]),
+    "大井町": (35.6074, 139.7349, ["JR京浜東北線", "東急大井町線", "りんかい線"]),
+    "北品川": (35.6224, 139.7393, ["京急本線"]),
+    "新馬場": (35.6178, 139.7420, ["京急本線"]),
+    "青物横丁": (35.6094, 139.7425, ["京急本線"]),
+    "鮫洲": (35.6050, 139.7422, ["京急本線"]),
+    "立会川": (35.5985, 139.7387, ["京急本線"]),
+    "大井競馬場前": (35.5950, 139.7470, ["東京モノレール"]),
+    "天王洲アイル": (35.6220, 139.7500, ["りんかい線", "東京モノレール"]),
+    "品川シーサイド": (35.6086, 139.7497, ["りんかい線"]),
+    # 目黒区
+    "中目黒": (35.6441, 139.6990, ["東京メトロ日比谷線", "東急東横線"]),
+    "祐天寺": (35.6374, 139.6912, ["東急東横線"]),
+    "学芸大学": (35.6287, 139.6854, ["東急東横線"]),
+    "都立大学": (35.6177, 139.6764, ["東急東横線"]),
+    "自由が丘": (35.6074, 139.6686, ["東急東横線", "東急大井町線"]),
+    "池尻大橋": (35.6506, 139.6848, ["東急田園都市線"]),
+    "洗足": (35.6107, 139.6937, ["東急目黒線"]),
+    "大岡山": (35.6076, 139.6856, ["東急目黒線", "東急大井町線"]),
+    # 大田区
+    "蒲田": (35.5625, 139.7160, ["JR京浜東北線", "東急池上線", "東急多摩川線"]),
+    "京急蒲田": (35.5609, 139.7237, ["京急本線", "京急空港線"]),
+    "大森": (35.5885, 139.7281, ["JR京浜東北線"]),
+    "大森海岸": (35.5877, 139.7356, ["京急本線"]),
+    "大森町": (35.5723, 139.7324, ["京急本線"]),
+    "平和島": (35.5787, 139.7349, ["京急本線"]),
+    "梅屋敷": (35.5670, 139.7284, ["京急本線"]),
+    "雑色": (35.5550, 139.7150, ["京急本線"]),
+    "六郷土手": (35.5405, 139.7075, ["京急本線"]),
+    "馬込": (35.5960, 139.7117, ["都営浅草線"]),
+    "西馬込": (35.5867, 139.7057, ["都営浅草線"]),
+    "田園調布": (35.5969, 139.6675, ["東急東横線", "東急目黒線"]),
+    "多摩川": (35.5897, 139.6686, ["東急東横線", "東急目黒線", "東急多摩川線"]),
+    "天空橋": (35.5487, 139.7538, ["東京モノレール", "京急空港線"]),
+    "昭和島": (35.5775, 139.7498, ["東京モノレール"]),
+    "流通センター": (35.5818, 139.7490, ["東京モノレール"]),
+    "整備場": (35.5590, 139.7560, ["東京モノレール"]),
+    "羽田空港": (35.5494, 139.7798, ["京急空港線", "東京モノレール"]),
+    "羽田空港第１・第２ターミナル": (35.5494, 139.7798, ["京急空港線", "東京モノレール"]),
+    "羽田空港第1ターミナル": (35.5494, 139.7846, ["東京モノレール", "京急空港線"]),
+    "羽田空港第2ターミナル": (35.5509, 139.7880, ["東京モノレール", "京急空港線"]),
+    "羽田空港第3ターミナル": (35.5440, 139.7683, ["東京モノレール", "京急空港線"]),
+    # 世田谷区
+    "下北沢": (35.6613, 139.6680, ["小田急線", "京王井の頭線"]),
+    "世田谷代田": (35.6581, 139.6616, ["小田急線"]),
+    "梅ヶ丘": (35.6560, 139.6534, ["小田急線"]),
+    "豪徳寺": (35.6536, 139.6473, ["小田急線"]),
+    "経堂": (35.6513, 139.6364, ["小田急線"]),
+    "千歳船橋": (35.6474, 139.6245, ["小田急線"]),
+    "祖師ヶ谷大蔵": (35.6434, 139.6087, ["小田急線"]),
+    "成城学園前": (35.6400, 139.5990, ["小田急線"]),
+    "喜多見": (35.6368, 139.5873, ["小田急線"]),
+    "三軒茶屋": (35.6437, 139.6701, ["東急田園都市線", "東急世田谷線"]),
+    "駒沢大学": (35.6335, 139.6611, ["東急田園都市線"]),
+    "桜新町": (35.6317, 139.6453, ["東急田園都市線"]),
+    "用賀": (35.6262, 139.6339, ["東急田園都市線"]),
+    "二子玉川": (35.6118, 139.6268, ["東急田園都市線", "東急大井町線"]),
+    "明大前": (35.6684, 139.6501, ["京王線", "京王井の頭線"]),
+    "下高井戸": (35.6663, 139.6413, ["京王線", "東急世田谷線"]),
+    "桜上水": (35.6674, 139.6314, ["京王線"]),
+    "上北沢": (35.6690, 139.6236, ["京王線"]),
+    "八幡山": (35.6697, 139.6148, ["京王線"]),
+    "芦花公園": (35.6700, 139.6080, ["京王線"]),
+    "千歳烏山": (35.6678, 139.6007, ["京王線"]),
+    # 渋谷区
+    "渋谷": (35.6580, 139.7016, ["JR山手線", "JR埼京線", "JR湘南新宿ライン", "東京メトロ銀座線", "東京メトロ半蔵門線", "東京メトロ副都心線", "東急東横線", "東急田園都市線", "京王井の頭線"]),
+    "原宿": (35.6702, 139.7027, ["JR山手線", "東京メトロ千代田線", "東京メトロ副都心線"]),
+    "表参道": (35.6652, 139.7123, ["東京メトロ銀座線", "東京メトロ千代田線", "東京メトロ半蔵門線"]),
+    "代々木": (35.6831, 139.7020, ["JR山手線", "JR中央線", "JR総武線", "都営大江戸線"]),
+    "恵比寿": (35.6467, 139.7101, ["JR山手線", "JR埼京線", "JR湘南新宿ライン", "東京メトロ日比谷線"]),
+    "代官山": (35.6482, 139.7033, ["東急東横線"]),
+    "代々木上原": (35.6690, 139.6797, ["小田急線", "東京メトロ千代田線"]),
+    "代々木八幡": (35.6695, 139.6855, ["小田急線"]),
+    "参宮橋": (35.6785, 139.6938, ["小田急線"]),
+    "初台": (35.6810, 139.6862, ["京王新線"]),
+    "幡ヶ谷": (35.6771, 139.6762, ["京王新線"]),
+    "笹塚": (35.6740, 139.6674, ["京王線", "京王新線"]),
+    # 中野区
+    "中野": (35.7056, 139.6657, ["JR中央線", "東京メトロ東西線"]),
+    "東中野": (35.7067, 139.6826, ["JR中央線", "都営大江戸線"]),
+    "新中野": (35.6975, 139.6690, ["東京メトロ丸ノ内線"]),
+    "新井薬師前": (35.7158, 139.6702, ["西武新宿線"]),
+    "沼袋": (35.7177, 139.6617, ["西武新宿線"]),
+    "野方": (35.7197, 139.6526, ["西武新宿線"]),
+    "都立家政": (35.7223, 139.6460, ["西武新宿線"]),
+    "鷺ノ宮": (35.7225, 139.6393, ["西武新宿線"]),
+    # 杉並区
+    "高円寺": (35.7054, 139.6496, ["JR中央線"]),
+    "阿佐ヶ谷": (35.7048, 139.6358, ["JR中央線"]),
+    "荻窪": (35.7046, 139.6200, ["JR中央線", "東京メトロ丸ノ内線"]),
+    "西荻窪": (35.7033, 139.5993, ["JR中央線"]),
+    "下井草": (35.7240, 139.6240, ["西武新宿線"]),
+    "井荻": (35.7266, 139.6140, ["西武新宿線"]),
+    "上井草": (35.7290, 139.6017, ["西武新宿線"]),
+    "代田橋": (35.6712, 139.6595, ["京王線"]),
+    # 豊島区
+    "池袋": (35.7295, 139.7109, ["JR山手線", "JR埼京線", "JR湘南新宿ライン", "東武東上線", "西武池袋線", "東京メトロ丸ノ内線", "東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "目白": (35.7212, 139.7066, ["JR山手線"]),
+    "大塚": (35.7317, 139.7286, ["JR山手線", "東京メトロ丸ノ内線"]),
+    "大塚駅前": (35.7320, 139.7290, ["都電荒川線", "JR山手線"]),
+    "巣鴨": (35.7334, 139.7393, ["JR山手線", "都営三田線"]),
+    "北池袋": (35.7410, 139.7168, ["東武東上線"]),
+    "東池袋": (35.7257, 139.7196, ["東京メトロ有楽町線"]),
+    "東池袋四丁目": (35.7247, 139.7214, ["都電荒川線"]),
+    "要町": (35.7330, 139.6986, ["東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "千川": (35.7383, 139.6899, ["東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "椎名町": (35.7265, 139.6947, ["西武池袋線"]),
+    "西巣鴨": (35.7439, 139.7283, ["都営三田線"]),
+    "都電雑司ヶ谷": (35.7203, 139.7155, ["都電荒川線", "東京メトロ副都心線"]),
+    "鬼子母神前": (35.7193, 139.7145, ["都電荒川線"]),
+    "向原": (35.7295, 139.7230, ["都電荒川線"]),
+    "庚申塚": (35.7393, 139.7329, ["都電荒川線"]),
+    "新庚申塚": (35.7408, 139.7312, ["都電荒川線"]),
+    "巣鴨新田": (35.7372, 139.7274, ["都電荒川線"]),
+    # 北区
+    "赤羽": (35.7776, 139.7209, ["JR京浜東北線", "JR埼京線", "JR宇都宮線", "JR高崎線", "JR湘南新宿ライン"]),
+    "十条": (35.7603, 139.7220, ["JR埼京線"]),
+    "王子": (35.7527, 139.7381, ["JR京浜東北線", "東京メトロ南北線", "都電荒川線"]),
+    "王子駅前": (35.7530, 139.7375, ["都電荒川線", "JR京浜東北線", "東京メトロ南北線"]),
+    "飛鳥山": (35.7506, 139.7385, ["都電荒川線"]),
+    "滝野川一丁目": (35.7495, 139.7300, ["都電荒川線"]),
+    "西ヶ原四丁目": (35.7463, 139.7325, ["都電荒川線"]),
+    "田端": (35.7381, 139.7608, ["JR山手線", "JR京浜東北線"]),
+    "駒込": (35.7366, 139.7470, ["JR山手線", "東京メトロ南北線"]),
+    "板橋": (35.7457, 139.7193, ["JR埼京線"]),
+    "栄町": (35.7545, 139.7413, ["都電荒川線"]),
+    "梶原": (35.7568, 139.7487, ["都電荒川線"]),
+    "荒川車庫前": (35.7568, 139.7555, ["都電荒川線"]),
+    # 荒川区
+    "日暮里": (35.7278, 139.7710, ["JR山手線", "JR京浜東北線", "JR常磐線", "京成本線", "日暮里・舎人ライナー"]),
+    "西日暮里": (35.7322, 139.7668, ["JR山手線", "JR京浜東北線", "東京メトロ千代田線", "日暮里・舎人ライナー"]),
+    "南千住": (35.7332, 139.7992, ["JR常磐線", "東京メトロ日比谷線", "つくばエクスプレス"]),
+    "町屋": (35.7424, 139.7807, ["東京メトロ千代田線", "京成本線", "都電荒川線"]),
+    "町屋駅前": (35.7422, 139.7800, ["都電荒川線", "東京メトロ千代田線", "京成本線"]),
+    "町屋二丁目": (35.7440, 139.7750, ["都電荒川線"]),
+    "三ノ輪橋": (35.7322, 139.7912, ["都電荒川線"]),
+    "新三河島": (35.7393, 139.7740, ["京成本線"]),
+    "熊野前": (35.7491, 139.7697, ["日暮里・舎人ライナー", "都電荒川線"]),
+    "荒川区役所前": (35.7371, 139.7833, ["都電荒川線"]),
+    "荒川二丁目": (35.7391, 139.7850, ["都電荒川線"]),
+    "荒川七丁目": (35.7408, 139.7822, ["都電荒川線"]),
+    "荒川一中前": (35.7346, 139.7880, ["都電荒川線"]),
+    "東尾久三丁目": (35.7457, 139.7745, ["都電荒川線"]),
+    "宮ノ前": (35.7479, 139.7682, ["都電荒川線"]),
+    "小台": (35.7505, 139.7643, ["都電荒川線"]),
+    "荒川遊園地前": (35.7513, 139.7625, ["都電荒川線"]),
+    "赤土小学校前": (35.7564, 139.7694, ["日暮里・舎人ライナー"]),
+    # 板橋区
+    "大山": (35.7484, 139.7024, ["東武東上線"]),
+    "中板橋": (35.7565, 139.6938, ["東武東上線"]),
+    "ときわ台": (35.7587, 139.6884, ["東武東上線"]),
+    "上板橋": (35.7636, 139.6766, ["東武東上線"]),
+    "東武練馬": (35.7678, 139.6622, ["東武東上線"]),
+    "下赤塚": (35.7700, 139.6446, ["東武東上線"]),
+    "成増": (35.7776, 139.6316, ["東武東上線", "東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "地下鉄成増": (35.7764, 139.6307, ["東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "地下鉄赤塚": (35.7694, 139.6442, ["東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "下板橋": (35.7453, 139.7149, ["東武東上線"]),
+    "新板橋": (35.7467, 139.7175, ["都営三田線"]),
+    "板橋区役所前": (35.7510, 139.7093, ["都営三田線"]),
+    "板橋本町": (35.7618, 139.7059, ["都営三田線"]),
+    "本蓮沼": (35.7684, 139.7025, ["都営三田線"]),
+    "志村坂上": (35.7762, 139.6953, ["都営三田線"]),
+    "志村三丁目": (35.7777, 139.6861, ["都営三田線"]),
+    "蓮根": (35.7839, 139.6804, ["都営三田線"]),
+    "西台": (35.7870, 139.6737, ["都営三田線"]),
+    "高島平": (35.7893, 139.6615, ["都営三田線"]),
+    "新高島平": (35.7905, 139.6545, ["都営三田線"]),
+    "西高島平": (35.7918, 139.6462, ["都営三田線"]),
+    "小竹向原": (35.7432, 139.6795, ["東京メトロ有楽町線", "東京メトロ副都心線", "西武有楽町線"]),
+    # 練馬区
+    "練馬": (35.7376, 139.6540, ["西武池袋線", "西武豊島線", "都営大江戸線"]),
+    "桜台": (35.7388, 139.6625, ["西武池袋線"]),
+    "江古田": (35.7376, 139.6725, ["西武池袋線"]),
+    "東長崎": (35.7300, 139.6836, ["西武池袋線"]),
+    "中村橋": (35.7367, 139.6372, ["西武池袋線"]),
+    "富士見台": (35.7356, 139.6293, ["西武池袋線"]),
+    "練馬高野台": (35.7405, 139.6166, ["西武池袋線"]),
+    "石神井公園": (35.7436, 139.6062, ["西武池袋線"]),
+    "大泉学園": (35.7538, 139.5863, ["西武池袋線"]),
+    "上石神井": (35.7282, 139.5933, ["西武新宿線"]),
+    "武蔵関": (35.7276, 139.5763, ["西武新宿線"]),
+    "氷川台": (35.7502, 139.6657, ["東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "平和台": (35.7577, 139.6537, ["東京メトロ有楽町線", "東京メトロ副都心線"]),
+    "光が丘": (35.7582, 139.6282, ["都営大江戸線"]),
+    # 足立区
+    "北千住": (35.7497, 139.8049, ["JR常磐線", "東京メトロ千代田線", "東京メトロ日比谷線", "東武伊勢崎線", "つくばエクスプレス"]),
+    "牛田": (35.7446, 139.8117, ["東武伊勢崎線"]),
+    "堀切": (35.7476, 139.8176, ["東武伊勢崎線"]),
+    "小菅": (35.7572, 139.8133, ["東武伊勢崎線"]),
+    "五反野": (35.7663, 139.8100, ["東武伊勢崎線"]),
+    "梅島": (35.7726, 139.7979, ["東武伊勢崎線"]),
+    "西新井": (35.7773, 139.7905, ["東武伊勢崎線", "東武大師線"]),
+    "竹ノ塚": (35.7943, 139.7907, ["東武伊勢崎線"]),
+    "綾瀬": (35.7622, 139.8250, ["JR常磐線", "東京メトロ千代田線"]),
+    "青井": (35.7718, 139.8193, ["つくばエクスプレス"]),
+    "六町": (35.7851, 139.8220, ["つくばエクスプレス"]),
+    "千住大橋": (35.7425, 139.7975, ["京成本線"]),
+    "足立小台": (35.7545, 139.7705, ["日暮里・舎人ライナー"]),
+    "扇大橋": (35.7697, 139.7706, ["日暮里・舎人ライナー"]),
+    "江北": (35.7760, 139.7710, ["日暮里・舎人ライナー"]),
+    "西新井大師西": (35.7782, 139.7721, ["日暮里・舎人ライナー"]),
+    "谷在家": (35.7831, 139.7704, ["日暮里・舎人ライナー"]),
+    "舎人公園": (35.7990, 139.7705, ["日暮里・舎人ライナー"]),
+    "舎人": (35.8052, 139.7702, ["日暮里・舎人ライナー"]),
+    "見沼代親水公園": (35.8146, 139.7707, ["日暮里・舎人ライナー"]),
+    # 葛飾区
+    "亀有": (35.7662, 139.8478, ["JR常磐線"]),
+    "金町": (35.7688, 139.8706, ["JR常磐線", "京成金町線"]),
+    "新小岩": (35.7165, 139.8589, ["JR総武線"]),
+    "青砥": (35.7459, 139.8564, ["京成本線", "京成押上線"]),
+    "京成高砂": (35.7502, 139.8663, ["京成本線", "京成金町線", "北総線"]),
+    "京成立石": (35.7383, 139.8485, ["京成本線"]),
+    "四ツ木": (35.7330, 139.8315, ["京成本線"]),
+    "堀切菖蒲園": (35.7478, 139.8275, ["京成本線"]),
+    "京成関屋": (35.7351, 139.8117, ["京成本線"]),
+    "京成小岩": (35.7432, 139.8815, ["京成本線"]),
+    # 江戸川区
+    "小岩": (35.7331, 139.8821, ["JR総武線"]),
+    "平井": (35.7060, 139.8429, ["JR総武線"]),
+    "葛西": (35.6636, 139.8728, ["東京メトロ東西線"]),
+    "西葛西": (35.6644, 139.8594, ["東京メトロ東西線"]),
+    "船堀": (35.6837, 139.8641, ["都営新宿線"]),
+    "一之江": (35.6859, 139.8828, ["都営新宿線"]),
+    "瑞江": (35.6933, 139.8977, ["都営新宿線"]),
+    "篠崎": (35.7060, 139.9036, ["都営新宿線"]),
+    "江戸川": (35.7355, 139.8957, ["京成本線"]),
+}
+
+# 環状運転の路線（端の駅どうしを接続する）
+LOOP_LINES = ("JR山手線",)
@@ -0,0 +1,114 @@
+"""
+東京都23区の位置データ（区の中心座標・主要駅・主要観光施設の座標）
+区の中心座標と面積は database/init_db.py の TOKYO_WARDS と同じ値
+駅・施設の座標は地図上の代表地点（概略値）
+"""
+
+# 区の中心座標と面積（緯度, 経度, 面積km²）
+WARD_CENTERS = {
+    "13101": (35.6940, 139.7534, 11.66),  # 千代田区
+    "13102": (35.6706, 139.7720, 10.21),  # 中央区
+    "13103": (35.6581, 139.7515, 20.36),  # 港区
+    "13104": (35.6938, 139.7036, 18.22),  # 新宿区
+    "13105": (35.7081, 139.7524, 11.29),  # 文京区
+    "13106": (35.7121, 139.7799, 10.11),  # 台東区
+    "13107": (35.7107, 139.8013, 13.77),  # 墨田区
+    "13108": (35.6731, 139.8171, 42.99),  # 江東区
+    "13109": (35.6090, 139.7302, 22.85),  # 品川区
+    "13110": (35.6414, 139.6982, 14.67),  # 目黒区
+    "13111": (35.5614, 139.7161, 61.86),  # 大田区
+    "13112": (35.6464, 139.6530, 58.05),  # 世田谷区
+    "13113": (35.6639, 139.6982, 15.11),  # 渋谷区
+    "13114": (35.7074, 139.6637, 15.59),  # 中野区
+    "13115": (35.6994, 139.6364, 34.06),  # 杉並区
+    "13116": (35.7260, 139.7166, 13.01),  # 豊島区
+    "13117": (35.7528, 139.7337, 20.61),  # 北区
+    "13118": (35.7362, 139.7830, 10.16),  # 荒川区
+    "13119": (35.7512, 139.7095, 32.22),  # 板橋区
+    "13120": (35.7357, 139.6516, 48.08),  # 練馬区
+    "13121": (35.7751, 139.8046, 53.25),  # 足立区
+    "13122": (35.7435, 139.8473, 34.80),  # 葛飾区
+    "13123": (35.7068, 139.8687, 49.90),  # 江戸川区
+}
+
+# 主要駅の座標（緯度, 経度）
+STATION_COORDINATES = {
+    "新宿駅": (35.6896, 139.7006),
+    "高田馬場駅": (35.7126, 139.7038),
+    "新大久保駅": (35.7012, 139.7000),
+    "四ツ谷駅": (35.6860, 139.7303),
+    "渋谷駅": (35.6580, 139.7016),
+    "原宿駅": (35.6702, 139.7027),
+    "恵比寿駅": (35.6467, 139.7101),
+    "代々木駅": (35.6831, 139.7020),
+    "池袋駅": (35.7295, 139.7109),
+    "目白駅": (35.7212, 139.7066),
+    "大塚駅": (35.7317, 139.7286),
+    "東京駅": (35.6812, 139.7671),
+    "有楽町駅": (35.6751, 139.7630),
+    "秋葉原駅": (35.6984, 139.7731),
+    "神田駅": (35.6918, 139.7709),
+    "品川駅": (35.6285, 139.7388),
+    "新橋駅": (35.6663, 139.7583),
+    "浜松町駅": (35.6555, 139.7570),
+    "六本木駅": (35.6628, 139.7314),
+    "上野駅": (35.7138, 139.7773),
+    "浅草駅": (35.7106, 139.7976),
+    "日暮里駅": (35.7278, 139.7710),
+    "鶯谷駅": (35.7207, 139.7788),
+    "錦糸町駅": (35.6969, 139.8140),
+    "押上駅": (35.7104, 139.8134),
+    "両国駅": (35.6962, 139.7935),
+    "北千住駅": (35.7497, 139.8049),
+    "綾瀬駅": (35.7622, 139.8250),
+    "西新井駅": (35.7773, 139.7905),
+    "目黒駅": (35.6339, 139.7158),
+    "五反田駅": (35.6262, 139.7236),
+    "大崎駅": (35.6197, 139.7286),
+    "大井町駅": (35.6074, 139.7349),
+    "武蔵小山駅": (35.6204, 139.7043),
+    "豊洲駅": (35.6549, 139.7963),
+    "門前仲町駅": (35.6717, 139.7960),
+    "新木場駅": (35.6460, 139.8270),
+    "後楽園駅": (35.7077, 139.7519),
+    "本郷三丁目駅": (35.7070, 139.7600),
+    "茗荷谷駅": (35.7172, 139.7375),
+    "水道橋駅": (35.7021, 139.7533),
+    "春日駅": (35.7090, 139.7530),
+}
+
+# 主要観光施設・商業施設の座標（緯度, 経度）
+ATTRACTION_COORDINATES = {
+    "浅草寺": (35.7148, 139.7967),
+    "上野動物園": (35.7165, 139.7713),
+    "アメ横": (35.7100, 139.7745),
+    "上野公園": (35.7148, 139.7733),
+    "東京スカイツリー": (35.7101, 139.8107),
+    "すみだ水族館": (35.7097, 139.8096),
+    "両国国技館": (35.6970, 139.7932),
+    "明治神宮": (35.6764, 139.6993),
+    "渋谷スクランブル交差点": (35.6595, 139.7005),
+    "原宿竹下通り": (35.6715, 139.7035),
+    "新宿御苑": (35.6852, 139.7100),
+    "歌舞伎町": (35.6950, 139.7020),
+    "東京都庁展望室": (35.6896, 139.6917),
+    "皇居東御苑": (35.6870, 139.7580),
+    "秋葉原電気街": (35.6998, 139.7713),
+    "東京駅": (35.6812, 139.7671),
+    "北千住マルイ": (35.7490, 139.8040),
+    "ルミネ北千住": (35.7495, 139.8050),
+    "足立区生物園": (35.7770, 139.8060),
+    "池袋サンシャインシティ": (35.7290, 139.7196),
+    "東武百貨店池袋店": (35.7290, 139.7100),
+    "西武池袋本店": (35.7298, 139.7118),
+    "池袋パルコ": (35.7305, 139.7115),
+    "東京ドーム": (35.7056, 139.7519),
+    "東京ドームシティ": (35.7060, 139.7530),
+    "ラクーア": (35.7070, 139.7530),
+    "文京シビックセンター展望ラウンジ": (35.7080, 139.7527),
+    "アクアパーク品川": (35.6270, 139.7360),
+    "品川プリンスホテル": (35.6275, 139.7365),
+    "天王洲アイル": (35.6220, 139.7500),
+    "しながわ水族館": (35.5880, 139.7340),
+    "品川インターシティ": (35.6290, 139.7410),
+}
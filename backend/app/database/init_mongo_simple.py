@@ -8,7 +8,9 @@ from app.database.mongodb import connect_to_mongo, close_mongo_connection, db
 from app.models_mongo.area import Area, HousingData, ParkData, SchoolData, SafetyData, MedicalData, CultureData, ChildcareData
 from app.models_mongo.waste_separation import WasteSeparation
 from app.models_mongo.congestion import CongestionData
+from app.models_mongo.data_version import DataVersion
 from app.services.tokyo_congestion_service import tokyo_congestion_service
+from app.services.data_version_service import data_version_service
 from beanie import init_beanie
 
 async def init_mongodb():
@@ -19,7 +21,8 @@ async def init_mongodb():
         document_models=[
             Area,
             WasteSeparation,
-            CongestionData
+            CongestionData,
+            DataVersion
         ]
     )
 
@@ -377,6 +380,9 @@ async def init_all_areas():
     
     print(f"Created {len(areas_data)} areas")
     
+    # データバージョンを更新
+    await data_version_service.sync()
+    
     # ゴミ分別データを追加
     from app.data.waste_separation_rules import WASTE_SEPARATION_RULES
     
@@ -7,6 +7,7 @@ from pathlib import Path
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.database.database import engine, Base
+from app.services.google_places_service import google_places_service
 
 
 @asynccontextmanager
@@ -39,6 +40,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print("Shutting down...")
+    await google_places_service.close()
 
 
 app = FastAPI(
@@ -8,7 +8,21 @@ from app.database.mongodb import connect_to_mongo, close_mongo_connection, db
 from app.models_mongo.area import Area
 from app.models_mongo.waste_separation import WasteSeparation  
 from app.models_mongo.congestion import CongestionData
+from app.models_mongo.data_version import DataVersion
+from app.models_mongo.saved_search import SavedSearch
+from app.models_mongo.refresh_job import RefreshJob
+from app.models_mongo.congestion_history import CongestionObservation, CongestionRollup
+from app.models_mongo.simulation_cache import SimulationCacheEntry
+from app.models_mongo.api_quota_usage import ApiQuotaUsage
 from app.api_mongo.v1.api import api_router
+from app.core.config import settings
+from app.services.query_advisor import query_advisor
+from app.services.google_congestion_service import google_congestion_service
+from app.services.job_scheduler import job_scheduler
+from app.services.congestion_write_buffer import congestion_write_buffer
+from app.services.congestion_history_service import congestion_history_service
+from app.services.congestion_forecast_service import congestion_forecast_service
+from app.services.congestion_stream_service import congestion_stream_service
 from beanie import init_beanie
 
 # Load environment variables
@@ -27,14 +41,49 @@ async def lifespan(app: FastAPI):
         document_models=[
             Area,
             WasteSeparation,
-            CongestionData
+            CongestionData,
+            DataVersion,
+            SavedSearch,
+            RefreshJob,
+            CongestionObservation,
+            CongestionRollup,
+            SimulationCacheEntry,
+            ApiQuotaUsage
         ]
     )
     
+    # 検索用の推奨インデックスを作成（オプション）
+    if settings.CREATE_RECOMMENDED_INDEXES:
+        try:
+            await query_advisor.create_recommended_indexes()
+        except Exception as e:
+            print(f"Error creating recommended indexes: {e}")
+    
+    # 混雑度データの書き込みバッファを起動
+    await congestion_write_buffer.start()
+    
+    # 混雑度履歴の書き出しと集計（時間 → 日 → 週）を起動
+    await congestion_history_service.start()
+    
+    # 混雑度予測の定期的な再学習を起動
+    await congestion_forecast_service.start()
+    
+    # 混雑度の更新配信（SSE）のプロデューサーを起動
+    await congestion_stream_service.start()
+    
+    # バックグラウンドジョブのワーカーを起動（未完了のジョブを再開）
+    await job_scheduler.start()
+    
     yield
     
     # Shutdown
     print("Shutting down...")
+    await job_scheduler.stop()
+    await congestion_stream_service.stop()
+    await congestion_write_buffer.stop()
+    await congestion_history_service.stop()
+    await congestion_forecast_service.stop()
+    await google_congestion_service.close()
     await close_mongo_connection()
 
 # Create FastAPI app
@@ -3,7 +3,7 @@ Age distribution model for MongoDB
 """
 from typing import Optional
 from datetime import datetime
-from beanie import Document, Link
+from beanie import Document, Link, Replace, Save, SaveChanges, before_event
 from pydantic import Field
 
 from app.models_mongo.area import Area
@@ -23,6 +23,11 @@ class AgeDistribution(Document):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     
+    @before_event(Replace, Save, SaveChanges)
+    def touch_updated_at(self):
+        """保存時に更新日時を更新（年齢分布の一覧のキャッシュが変更の検知に使う）"""
+        self.updated_at = datetime.now()
+    
     class Settings:
         collection = "age_distributions"
         indexes = [
@@ -0,0 +1,25 @@
+"""
+MongoDB ApiQuotaUsage model
+"""
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+import pymongo
+
+class ApiQuotaUsage(Document):
+    """外部APIの日次使用量（gunicornの全ワーカー・再起動をまたいで共有する課金上限のカウンタ）"""
+    # 上流名（google_places など）と日付（日本時間、YYYY-MM-DD）
+    upstream: str
+    day: str
+
+    # 確保済みのリクエスト数と、上限により拒否した回数
+    used: int = 0
+    rejected: int = 0
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        collection = "api_quota_usage"
+        indexes = [
+            pymongo.IndexModel([("upstream", pymongo.ASCENDING), ("day", pymongo.ASCENDING)], unique=True)
+        ]
@@ -3,7 +3,7 @@ MongoDB Area model using Beanie ODM
 """
 from typing import Optional, Dict, List, Any
 from datetime import datetime
-from beanie import Document, Indexed
+from beanie import Document, Indexed, Replace, Save, SaveChanges, before_event
 from pydantic import Field, BaseModel
 
 class HousingData(BaseModel):
@@ -140,6 +140,11 @@ class Area(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
+    @before_event(Replace, Save, SaveChanges)
+    def touch_updated_at(self):
+        """保存時に更新日時を更新（data_version_service が変更の検知に使う）"""
+        self.updated_at = datetime.utcnow()
+    
     class Settings:
         collection = "areas"
         indexes = [
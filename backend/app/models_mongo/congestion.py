@@ -33,6 +33,9 @@ class CongestionData(Document):
     # 施設別混雑度
     facility_congestion: Dict[str, FacilityCongestion] = Field(default_factory=dict)
     
+    # 保存内容のハッシュ（書き込みバッファが変更の有無の判定に使用）
+    payload_hash: Optional[str] = None
+    
     # タイムスタンプ
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
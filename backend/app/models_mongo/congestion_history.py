@@ -0,0 +1,62 @@
+"""
+MongoDB CongestionObservation / CongestionRollup models
+"""
+from typing import Optional
+from datetime import datetime
+from beanie import Document, TimeSeriesConfig, Granularity
+from pydantic import Field, BaseModel
+import pymongo
+
+class ObservationMeta(BaseModel):
+    """観測値のメタデータ（時系列コレクションのバケット単位）"""
+    area_code: str
+    source: str
+
+class CongestionObservation(Document):
+    """混雑度の観測値（時系列コレクション、生データ）"""
+    timestamp: datetime
+    meta: ObservationMeta
+
+    # 観測時点の混雑度（0-100）と総合スコア
+    congestion: float
+    congestion_score: float
+
+    class Settings:
+        collection = "congestion_observations"
+        timeseries = TimeSeriesConfig(
+            time_field="timestamp",
+            meta_field="meta",
+            granularity=Granularity.hours,
+            expire_after_seconds=90 * 24 * 60 * 60  # 生データは90日で削除（集計値は残る）
+        )
+
+class CongestionRollup(Document):
+    """混雑度の集計値（hour / day / week、データソースごと）"""
+    area_code: str
+    source: Optional[str] = None
+    resolution: str
+    bucket_start: datetime
+
+    # 集計値
+    samples: int = 0
+    total: float = 0.0
+    minimum: float = 0.0
+    maximum: float = 0.0
+    mean: float = 0.0
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        collection = "congestion_rollups"
+        indexes = [
+            pymongo.IndexModel(
+                [
+                    ("area_code", pymongo.ASCENDING),
+                    ("source", pymongo.ASCENDING),
+                    ("resolution", pymongo.ASCENDING),
+                    ("bucket_start", pymongo.ASCENDING)
+                ],
+                unique=True
+            ),
+            pymongo.IndexModel([("resolution", pymongo.ASCENDING), ("bucket_start", pymongo.ASCENDING)])
+        ]
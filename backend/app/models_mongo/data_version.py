@@ -0,0 +1,24 @@
+"""
+MongoDB DataVersion model
+"""
+from typing import Dict
+from datetime import datetime
+from beanie import Document, Indexed
+from pydantic import Field
+
+class DataVersion(Document):
+    """エリアデータのバージョン（フィールドグループ単位のフィンガープリント）"""
+    # フィールドグループ名（例：housing_data, town_list）
+    group: Indexed(str, unique=True)
+
+    # グループ全体のフィンガープリント
+    fingerprint: str
+
+    # エリアコード別のフィンガープリント
+    area_fingerprints: Dict[str, str] = Field(default_factory=dict)
+
+    # タイムスタンプ
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        collection = "data_versions"
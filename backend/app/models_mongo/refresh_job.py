@@ -0,0 +1,47 @@
+"""
+MongoDB RefreshJob model
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+from beanie import Document, Indexed
+from pydantic import Field
+import pymongo
+
+class RefreshJob(Document):
+    """バックグラウンド更新ジョブ（ワーカー再起動時に未完了分を再開するため永続化）"""
+    # ジョブの種類（登録済みハンドラ名）と重複排除キー
+    kind: str
+    key: Indexed(str)
+
+    # queued / running / succeeded / failed / cancelled
+    status: str = "queued"
+
+    # 未完了の間だけ key を設定（一意インデックスで同じキーの未完了ジョブを1つに限る）
+    active_key: Optional[str] = None
+
+    # 実行中のプロセスと、その担当の有効期限（期限切れのジョブは他のプロセスが引き継ぐ）
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+
+    # 処理対象（エリアコードなど）と進捗
+    items: List[str] = Field(default_factory=list)
+    completed_items: List[str] = Field(default_factory=list)
+    failed_items: Dict[str, str] = Field(default_factory=dict)
+    attempts: Dict[str, int] = Field(default_factory=dict)
+
+    # タイムスタンプ
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        collection = "refresh_jobs"
+        indexes = [
+            "key",
+            "status",
+            pymongo.IndexModel(
+                [("active_key", pymongo.ASCENDING)],
+                unique=True,
+                partialFilterExpression={"active_key": {"$type": "string"}}
+            )
+        ]
@@ -0,0 +1,42 @@
+"""
+MongoDB SavedSearch model
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from beanie import Document, Indexed
+from pydantic import Field, BaseModel
+
+class SavedSearchResult(BaseModel):
+    """保存済み検索の結果（1エリア分）"""
+    area_code: str
+    area_name: str
+    # ウェルビーイングスコア（スコア順の検索のみ）
+    score: Optional[float] = None
+
+class SavedSearch(Document):
+    """保存済み検索条件と計算済みの結果"""
+    # ユーザー情報
+    user_id: Indexed(str)
+    name: str
+
+    # 検索条件（SearchRequest）
+    conditions: Dict[str, Any] = Field(default_factory=dict)
+
+    # 計算済みの結果（並び順どおりのエリアコードとスコア）
+    results: List[SavedSearchResult] = Field(default_factory=list)
+    total_count: int = 0
+
+    # 結果が依存するフィールドグループと計算時のフィンガープリント
+    dependency_groups: List[str] = Field(default_factory=list)
+    data_fingerprint: Dict[str, str] = Field(default_factory=dict)
+
+    # タイムスタンプ
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        collection = "saved_searches"
+        indexes = [
+            "user_id"
+        ]
@@ -0,0 +1,30 @@
+"""
+MongoDB SimulationCacheEntry model
+"""
+from typing import Any, Dict
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+import pymongo
+
+class SimulationCacheEntry(Document):
+    """シミュレーション結果のキャッシュ（gunicornの全ワーカーで共有）"""
+    # 正規化したリクエストとデータバージョンから計算したキー
+    key: str
+    namespace: str
+
+    # シミュレーション結果（JSON）
+    value: Dict[str, Any]
+
+    # 有効期限（TTLインデックスで自動削除）と最終アクセス日時（件数の上限を超えたら古い順に削除）
+    expires_at: datetime
+    accessed_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        collection = "simulation_cache"
+        indexes = [
+            pymongo.IndexModel([("key", pymongo.ASCENDING)], unique=True),
+            pymongo.IndexModel([("expires_at", pymongo.ASCENDING)], expireAfterSeconds=0),
+            pymongo.IndexModel([("accessed_at", pymongo.ASCENDING)])
+        ]
@@ -1,112 +1,64 @@
 #!/usr/bin/env python3
 """
-家計シミュレーションで使用しているデータをCSVファイルにエクスポートする
+家計シミュレーションで使用しているデータをエクスポートする
+エリアデータはカーソルを1回だけ読み、基本情報・住宅・保育園などの表に振り分けて書き出す
+
+使い方:
+    python export_simulation_data.py [--format csv|parquet|arrow] [--tables housing_data,...] [--columns rent_2ldk,...]
 """
+import argparse
 import asyncio
 import csv
-import os
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Optional
 
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
-from models_mongo.area import Area
-from core.config import settings
+from app.models_mongo.area import Area
+from app.core.config import settings
+from app.services.area_export import (
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    FILE_EXTENSIONS,
+    AreaExporter,
+    create_writer,
+    require_pyarrow,
+)
 
 # CSVファイルの保存先
 OUTPUT_DIR = Path("exported_data")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-async def export_area_data():
-    """エリアマスターデータをCSVにエクスポート"""
-    areas = await Area.find_all().to_list()
+async def export_area_tables(
+    export_format: str = "csv",
+    tables: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None
+):
+    """エリアデータの各表を1回の読み出しでエクスポート"""
+    require_pyarrow(export_format)
+    exporter = AreaExporter(tables, columns)
+    
+    files = {}
+    writers = {}
+    try:
+        for name, (_, selected_columns) in exporter.selected.items():
+            files[name] = open(OUTPUT_DIR / f"{name}.{FILE_EXTENSIONS[export_format]}", "wb")
+            writers[name] = create_writer(files[name], selected_columns, export_format)
+        
+        row_counts = await exporter.export(writers)
+    finally:
+        for f in files.values():
+            f.close()
     
-    if not areas:
+    if not any(row_counts.values()):
         print("エリアデータが見つかりません")
         return
     
-    # 基本情報のCSV
-    basic_fields = [
-        "code", "name", "name_kana", "name_en",
-        "center_lat", "center_lng", "area_km2",
-        "population", "households", "population_density"
-    ]
-    
-    with open(OUTPUT_DIR / "area_basic_info.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=basic_fields)
-        writer.writeheader()
-        
-        for area in areas:
-            row = {field: getattr(area, field, "") for field in basic_fields}
-            writer.writerow(row)
-    
-    print(f"✓ エリア基本情報をエクスポートしました: {len(areas)}件")
-
-async def export_housing_data():
-    """住宅データをCSVにエクスポート"""
-    areas = await Area.find_all().to_list()
-    
-    housing_fields = [
-        "area_code", "area_name",
-        "rent_1r", "rent_1k", "rent_1dk", "rent_1ldk", "rent_2ldk", "rent_3ldk",
-        "vacant_rate", "data_source"
-    ]
-    
-    with open(OUTPUT_DIR / "housing_data.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=housing_fields)
-        writer.writeheader()
-        
-        for area in areas:
-            if area.housing_data:
-                row = {
-                    "area_code": area.code,
-                    "area_name": area.name,
-                    "rent_1r": area.housing_data.rent_1r,
-                    "rent_1k": area.housing_data.rent_1k,
-                    "rent_1dk": area.housing_data.rent_1dk,
-                    "rent_1ldk": area.housing_data.rent_1ldk,
-                    "rent_2ldk": area.housing_data.rent_2ldk,
-                    "rent_3ldk": area.housing_data.rent_3ldk,
-                    "vacant_rate": area.housing_data.vacant_rate,
-                    "data_source": area.housing_data.data_source
-                }
-                writer.writerow(row)
-    
-    print(f"✓ 住宅データをエクスポートしました")
-
-async def export_childcare_data():
-    """保育園データをCSVにエクスポート"""
-    areas = await Area.find_all().to_list()
-    
-    childcare_fields = [
-        "area_code", "area_name",
-        "nursery_schools", "kindergartens", "total_capacity",
-        "waiting_children", "acceptance_rate", "data_source"
-    ]
-    
-    with open(OUTPUT_DIR / "childcare_data.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=childcare_fields)
-        writer.writeheader()
-        
-        for area in areas:
-            if area.childcare_data:
-                row = {
-                    "area_code": area.code,
-                    "area_name": area.name,
-                    "nursery_schools": area.childcare_data.nursery_schools,
-                    "kindergartens": area.childcare_data.kindergartens,
-                    "total_capacity": area.childcare_data.total_capacity,
-                    "waiting_children": area.childcare_data.waiting_children,
-                    "acceptance_rate": area.childcare_data.acceptance_rate,
-                    "data_source": area.childcare_data.data_source
-                }
-                writer.writerow(row)
-    
-    print(f"✓ 保育園データをエクスポートしました")
+    for name, rows in row_counts.items():
+        print(f"✓ {name} をエクスポートしました: {rows}件")
 
 async def export_simulation_parameters():
     """シミュレーションで使用するパラメータをCSVにエクスポート"""
@@ -119,7 +71,7 @@ async def export_simulation_parameters():
         {"category": "食費", "parameter": "子供1人", "value": 25000, "unit": "円/月", "description": "子供1人あたりの月間食費"},
         {"category": "通信費", "parameter": "大人1人", "value": 5000, "unit": "円/月", "description": "大人1人あたりの通信費"},
         {"category": "通信費", "parameter": "子供1人", "value": 2000, "unit": "円/月", "description": "子供1人あたりの通信費"},
-        {"category": "交通費", "parameter": "定期代（平均）", "value": 15000, "unit": "円/月", "description": "平均的な定期代"},
+        {"category": "交通費", "parameter": "定期代（平均）", "value": 15000, "unit": "円/月/通勤者", "description": "通勤先の指定がない、または路線データにない駅を含む場合の一律の定期代（通勤先を指定した場合は乗車時間から1か月定期と普通運賃の安い方を推定）"},
         {"category": "交通費", "parameter": "車維持費", "value": 30000, "unit": "円/月", "description": "駐車場代、ガソリン代等"},
         {"category": "教育費", "parameter": "習い事", "value": 15000, "unit": "円/月/子供", "description": "子供1人あたりの習い事費用"},
         {"category": "その他", "parameter": "日用品等", "value": 10000, "unit": "円/月/人", "description": "1人あたりの日用品・被服費等"},
@@ -153,7 +105,7 @@ async def export_room_types():
     
     print(f"✓ 間取りタイプをエクスポートしました")
 
-async def main():
+async def main(export_format: str = "csv", tables: Optional[List[str]] = None, columns: Optional[List[str]] = None):
     """メイン処理"""
     print("家計シミュレーションデータのエクスポートを開始します...")
     print(f"出力先: {OUTPUT_DIR.absolute()}")
@@ -172,9 +124,7 @@ async def main():
     
     try:
         # 各種データのエクスポート
-        await export_area_data()
-        await export_housing_data()
-        await export_childcare_data()
+        await export_area_tables(export_format, tables, columns)
         await export_simulation_parameters()
         await export_room_types()
         
@@ -183,9 +133,9 @@ async def main():
         
         # エクスポートしたファイル一覧
         print("\n📄 エクスポートしたファイル:")
-        for csv_file in OUTPUT_DIR.glob("*.csv"):
-            size = csv_file.stat().st_size
-            print(f"  - {csv_file.name} ({size:,} bytes)")
+        for exported_file in sorted(OUTPUT_DIR.iterdir()):
+            size = exported_file.stat().st_size
+            print(f"  - {exported_file.name} ({size:,} bytes)")
             
     except Exception as e:
         print(f"❌ エラーが発生しました: {e}")
@@ -193,5 +143,13 @@ async def main():
     finally:
         client.close()
 
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="家計シミュレーションデータのエクスポート")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="エリアデータの出力形式")
+    parser.add_argument("--tables", help=f"出力する表（カンマ区切り、省略時はすべて: {', '.join(EXPORT_TABLES)}）")
+    parser.add_argument("--columns", help="出力する列（カンマ区切り、省略時はすべて）")
+    args = parser.parse_args()
+    asyncio.run(main(args.format, _split(args.tables), _split(args.columns)))
\ No newline at end of file
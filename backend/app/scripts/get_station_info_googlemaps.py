@@ -15,6 +15,8 @@ from datetime import datetime
 # プロジェクトルートを追加
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from app.services.places_cache import CachedGoogleMapsClient, places_cache
+
 def get_nearby_stations(gmaps, location: str, radius: int = 1000) -> List[Dict]:
     """
     指定された場所の近くの駅を検索
@@ -114,7 +116,8 @@ def process_town_list(input_csv: str, output_csv: str, api_key: str):
     """
     町名リストを処理して駅情報を追加
     """
-    gmaps = googlemaps.Client(key=api_key)
+    # 同じ検索の再実行でAPIを呼ばないよう永続キャッシュを経由する
+    gmaps = CachedGoogleMapsClient(googlemaps.Client(key=api_key))
     
     # 入力CSVを読み込み
     with open(input_csv, 'r', encoding='utf-8-sig') as f:
@@ -177,6 +180,7 @@ def process_town_list(input_csv: str, output_csv: str, api_key: str):
     # 最終保存
     save_output(output_csv, output_data)
     print(f"\n完了: {output_csv} に保存しました")
+    print(f"APIキャッシュによる節約額（推定）: {places_cache.get_stats()['total_saved_yen']}円")
 
 def save_output(output_csv: str, data: List[Dict]):
     """出力を保存"""
@@ -16,6 +16,8 @@ from datetime import datetime
 # プロジェクトルートを追加
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from app.services.places_cache import CachedGoogleMapsClient, places_cache
+
 # 路線名の正規化パターン
 LINE_PATTERNS = {
     # JR線
@@ -165,7 +167,8 @@ def get_station_info_for_location(gmaps, location: str) -> Optional[Dict]:
 def process_townlist_batch(input_csv: str, output_csv: str, api_key: str, start_row: int = 0, batch_size: int = 50):
     """町名リストをバッチ処理して駅情報を追加"""
     
-    gmaps = googlemaps.Client(key=api_key)
+    # 同じ検索の再実行でAPIを呼ばないよう永続キャッシュを経由する
+    gmaps = CachedGoogleMapsClient(googlemaps.Client(key=api_key))
     
     # 入力CSVを読み込み
     with open(input_csv, 'r', encoding='utf-8-sig') as f:
@@ -231,6 +234,7 @@ def process_townlist_batch(input_csv: str, output_csv: str, api_key: str, start_
     # 最終保存
     save_output(output_csv, output_data)
     print(f"\nバッチ処理完了: {output_csv} に保存しました（合計 {len(output_data)} 件）")
+    print(f"APIキャッシュによる節約額（推定）: {places_cache.get_stats()['total_saved_yen']}円")
     
     return end_row < len(all_towns)  # まだ処理が必要な場合はTrue
 
@@ -16,6 +16,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.models_mongo.area import Area
+from app.models_mongo.data_version import DataVersion
+from app.services.data_version_service import data_version_service
 from dotenv import load_dotenv
 
 # 環境変数を読み込み
@@ -66,7 +68,7 @@ async def import_station_data():
     # Beanie初期化
     await init_beanie(
         database=client.tokyo_wellbeing,
-        document_models=[Area]
+        document_models=[Area, DataVersion]
     )
     
     print("MongoDBへの保存を開始...")
@@ -108,6 +110,10 @@ async def import_station_data():
     
     print(f"\n完了: {updated_count}区の駅情報を保存しました")
     
+    # データバージョンを更新（APIサーバーのキャッシュが差分を再構築する）
+    changed_groups = await data_version_service.sync()
+    print(f"データバージョン更新: {', '.join(changed_groups) if changed_groups else '変更なし'}")
+    
     # 全体統計
     total_towns = len(all_data)
     with_station = sum(1 for row in all_data if row.get('駅情報'))
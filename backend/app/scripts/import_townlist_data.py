@@ -15,6 +15,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.models_mongo.area import Area
+from app.models_mongo.data_version import DataVersion
+from app.services.data_version_service import data_version_service
 from dotenv import load_dotenv
 
 # 環境変数を読み込み
@@ -52,7 +54,7 @@ async def import_townlist_data():
     # Beanie初期化
     await init_beanie(
         database=client.tokyo_wellbeing,
-        document_models=[Area]
+        document_models=[Area, DataVersion]
     )
     
     print("\nMongoDBへの保存を開始...")
@@ -77,6 +79,10 @@ async def import_townlist_data():
             print(f"✗ {ward_name}のエリアデータが見つかりませんでした")
     
     print(f"\n完了: {updated_count}区の町名データを保存しました")
+    
+    # データバージョンを更新（APIサーバーの全文検索インデックスが差分を再構築する）
+    changed_groups = await data_version_service.sync()
+    print(f"データバージョン更新: {', '.join(changed_groups) if changed_groups else '変更なし'}")
 
 if __name__ == "__main__":
     asyncio.run(import_townlist_data())
\ No newline at end of file
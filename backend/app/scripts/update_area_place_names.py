@@ -13,6 +13,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.models_mongo.area import Area, AreaCharacteristics
+from app.models_mongo.data_version import DataVersion
+from app.services.data_version_service import data_version_service
 from dotenv import load_dotenv
 
 # 環境変数を読み込み
@@ -57,7 +59,7 @@ async def update_area_characteristics_with_places():
     # Beanie初期化
     await init_beanie(
         database=client.tokyo_wellbeing,
-        document_models=[Area]
+        document_models=[Area, DataVersion]
     )
     
     print("地名情報の追加を開始します...")
@@ -127,6 +129,10 @@ async def update_area_characteristics_with_places():
     
     print(f"\n完了: {updated_count}区の地名情報を追加しました")
     
+    # データバージョンを更新（APIサーバーのキャッシュが差分を再構築する）
+    changed_groups = await data_version_service.sync()
+    print(f"データバージョン更新: {', '.join(changed_groups) if changed_groups else '変更なし'}")
+    
     # 確認のため、いくつかのデータを表示
     print("\n=== 更新されたデータの確認 ===")
     sample_areas = ["葛飾区"]  # スクリーンショットの区を確認
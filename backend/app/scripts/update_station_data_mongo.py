@@ -16,6 +16,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.models_mongo.area import Area
+from app.models_mongo.data_version import DataVersion
+from app.services.data_version_service import data_version_service
 from dotenv import load_dotenv
 
 # 環境変数を読み込み
@@ -65,7 +67,7 @@ async def update_station_data():
     # Beanie初期化
     await init_beanie(
         database=client.tokyo_wellbeing,
-        document_models=[Area]
+        document_models=[Area, DataVersion]
     )
     
     print("MongoDBへの更新を開始...")
@@ -114,6 +116,10 @@ async def update_station_data():
             print(f"✗ {ward_name}のエリアデータが見つかりませんでした")
     
     print(f"\n完了: {updated_count}区の駅情報を更新しました")
+    
+    # データバージョンを更新（APIサーバーのキャッシュが差分を再構築する）
+    changed_groups = await data_version_service.sync()
+    print(f"データバージョン更新: {', '.join(changed_groups) if changed_groups else '変更なし'}")
 
 if __name__ == "__main__":
     asyncio.run(update_station_data())
\ No newline at end of file
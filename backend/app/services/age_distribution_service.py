@@ -0,0 +1,117 @@
+"""
+全エリアの年齢分布の一覧
+AgeDistribution とリンク先の Area を1回の集計（$lookup）で取得し、
+区名のフィンガープリント（data_version_service）と age_distributions コレクションの
+件数・最大ID・最終更新日時が変わるまで結果を再利用する
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.models_mongo.age_distribution import AgeDistribution
+from app.services.data_version_service import data_version_service
+
+logger = logging.getLogger(__name__)
+
+# 一覧が依存するエリアのフィールドグループ（区名・区コード）
+AGE_DISTRIBUTION_GROUPS = ("basic",)
+
+# age_distributions コレクションの変更を確認する間隔（秒）
+PROBE_TTL_SECONDS = 10.0
+
+
+def _area_id(area_code: str) -> int:
+    """区コード（13101）からエリアID（101）"""
+    return int(area_code[2:]) if area_code.startswith("13") else 0
+
+
+class AgeDistributionListing:
+    """エリアIDの順に並べた年齢分布の一覧（区名と年齢分布のデータが変わるまでキャッシュ）"""
+
+    def __init__(self, probe_ttl_seconds: float = PROBE_TTL_SECONDS):
+        self.probe_ttl_seconds = probe_ttl_seconds
+        self._results: Optional[List[Dict[str, Any]]] = None
+        self._version_token: Optional[str] = None
+        self._checked_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._results is not None and time.monotonic() - self._checked_at < self.probe_ttl_seconds
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        if self._is_fresh():
+            return self._results
+
+        async with self._lock:
+            if self._is_fresh():
+                return self._results
+            token = await self._current_token()
+            if self._results is None or token != self._version_token:
+                self._results = await self._load()
+                self._version_token = token
+                logger.info(f"Age distribution listing reloaded ({len(self._results)} areas)")
+            self._checked_at = time.monotonic()
+            return self._results
+
+    async def get_by_area_ids(self, area_ids: List[int]) -> List[Dict[str, Any]]:
+        """指定したエリアIDの年齢分布（指定の順、データのないエリアは除く）"""
+        by_id = {row["area_id"]: row for row in await self.get_all()}
+        return [by_id[area_id] for area_id in area_ids if area_id in by_id]
+
+    async def _current_token(self) -> str:
+        """区名のフィンガープリントと age_distributions コレクションの状態から合成したバージョン"""
+        versions = await data_version_service.get_versions()
+        count, last_id, updated_at = await self._probe()
+        return "|".join([
+            *(versions.get(group, {}).get("fingerprint", "") for group in AGE_DISTRIBUTION_GROUPS),
+            str(count),
+            str(last_id),
+            updated_at.isoformat() if updated_at else ""
+        ])
+
+    async def _probe(self):
+        """
+        age_distributions の件数・最大ID・最終更新日時（1回の集計で取得）
+        入れ替え（delete_all → insert_many）は最大IDの変化で、保存による更新は更新日時の変化で検知する
+        """
+        result = await AgeDistribution.get_motor_collection().aggregate([
+            {"$group": {
+                "_id": None,
+                "count": {"$sum": 1},
+                "last_id": {"$max": "$_id"},
+                "updated_at": {"$max": "$updated_at"}
+            }}
+        ]).to_list(1)
+        if not result:
+            return 0, None, None
+        return result[0]["count"], result[0]["last_id"], result[0]["updated_at"]
+
+    async def _load(self) -> List[Dict[str, Any]]:
+        # fetch_links で Area を $lookup により同じ集計で取得
+        age_distributions = await AgeDistribution.find_all(fetch_links=True).to_list()
+
+        results = []
+        for age_dist in age_distributions:
+            area = age_dist.area
+            # リンク先のエリアが削除されている場合は Link のまま残る
+            if area is None or not hasattr(area, "code"):
+                continue
+            results.append({
+                "area_id": _area_id(area.code),
+                "area_name": area.name,
+                "age_0_14": age_dist.age_0_14,
+                "age_15_64": age_dist.age_15_64,
+                "age_65_plus": age_dist.age_65_plus,
+                "median_age": age_dist.median_age,
+                "aging_rate": age_dist.aging_rate,
+                "youth_rate": age_dist.youth_rate,
+                "total_population": age_dist.total_population,
+                "year": age_dist.year
+            })
+        results.sort(key=lambda row: row["area_id"])
+        return results
+
+
+# シングルトンインスタンス
+age_distribution_listing = AgeDistributionListing()
@@ -0,0 +1,324 @@
+"""
+エリアデータのエクスポート
+Motorのカーソルを1回だけ読み、各ドキュメントを複数の表（基本情報・住宅・保育園など）の
+ライターに振り分けて書き出す（全件をメモリに持たない）
+- 形式：CSV、Parquet、Arrow（Parquet・Arrowは pyarrow がある場合のみ）
+- 列を指定した場合は、必要なフィールドだけをMongoDBから取得する
+"""
+import csv
+import io
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.models_mongo.area import Area
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow は任意（なければCSVのみ）
+    pa = pq = None
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+FILE_EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrow"}
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+# CSVをまとめて書き出すバッファの大きさ（バイト）と、Parquet・Arrowの1バッチの行数
+CSV_FLUSH_BYTES = 64 * 1024
+ARROW_BATCH_ROWS = 1000
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """出力する列（name）と、ドキュメント内のフィールドのパス・型"""
+    name: str
+    path: str
+    type: str = "string"  # string / int / float
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """出力する表（source の埋め込みデータがあるエリアだけを行にする）"""
+    name: str
+    columns: Tuple[ExportColumn, ...]
+    source: Optional[str] = None
+    # 列を指定した場合も必ず含める列
+    key_columns: Tuple[str, ...] = ("area_code",)
+
+
+def _area_columns() -> Tuple[ExportColumn, ...]:
+    return (ExportColumn("area_code", "code"), ExportColumn("area_name", "name"))
+
+
+def _embedded_table(name: str, source: str, fields: Sequence[Tuple[str, str]]) -> ExportTable:
+    return ExportTable(
+        name=name,
+        source=source,
+        columns=_area_columns() + tuple(
+            ExportColumn(field, f"{source}.{field}", field_type) for field, field_type in fields
+        )
+    )
+
+
+# 出力する表（テーブル名 -> 定義）
+EXPORT_TABLES: Dict[str, ExportTable] = {
+    table.name: table
+    for table in (
+        ExportTable(
+            name="area_basic_info",
+            key_columns=("code",),
+            columns=(
+                ExportColumn("code", "code"),
+                ExportColumn("name", "name"),
+                ExportColumn("name_kana", "name_kana"),
+                ExportColumn("name_en", "name_en"),
+                ExportColumn("center_lat", "center_lat", "float"),
+                ExportColumn("center_lng", "center_lng", "float"),
+                ExportColumn("area_km2", "area_km2", "float"),
+                ExportColumn("population", "population", "int"),
+                ExportColumn("households", "households", "int"),
+                ExportColumn("population_density", "population_density", "float"),
+            )
+        ),
+        _embedded_table("housing_data", "housing_data", [
+            ("rent_1r", "float"), ("rent_1k", "float"), ("rent_1dk", "float"), ("rent_1ldk", "float"),
+            ("rent_2ldk", "float"), ("rent_3ldk", "float"), ("vacant_rate", "float"), ("data_source", "string"),
+        ]),
+        _embedded_table("childcare_data", "childcare_data", [
+            ("nursery_schools", "int"), ("kindergartens", "int"), ("total_capacity", "int"),
+            ("waiting_children", "int"), ("acceptance_rate", "float"), ("data_source", "string"),
+        ]),
+        _embedded_table("park_data", "park_data", [
+            ("total_parks", "int"), ("total_area_m2", "float"), ("park_per_capita", "float"),
+            ("large_parks", "int"), ("data_source", "string"),
+        ]),
+        _embedded_table("school_data", "school_data", [
+            ("elementary_schools", "int"), ("junior_high_schools", "int"), ("high_schools", "int"),
+            ("universities", "int"), ("average_score", "float"), ("data_source", "string"),
+        ]),
+        _embedded_table("safety_data", "safety_data", [
+            ("crime_rate_per_1000", "float"), ("disaster_risk_score", "float"), ("police_stations", "int"),
+            ("fire_stations", "int"), ("data_source", "string"),
+        ]),
+        _embedded_table("medical_data", "medical_data", [
+            ("hospitals", "int"), ("clinics", "int"), ("doctors_per_1000", "float"),
+            ("emergency_hospitals", "int"), ("data_source", "string"),
+        ]),
+    )
+}
+
+
+def select_columns(table: ExportTable, columns: Optional[Iterable[str]] = None) -> List[ExportColumn]:
+    """列の指定を表に適用（指定がなければ全列、指定した列が1つもなければ空）"""
+    if not columns:
+        return list(table.columns)
+    requested = set(columns)
+    if not requested & {column.name for column in table.columns}:
+        return []
+    return [column for column in table.columns if column.name in requested or column.name in table.key_columns]
+
+
+def mongo_projection(selected: Dict[str, Tuple[ExportTable, List[ExportColumn]]]) -> Dict[str, int]:
+    """出力する列のフィールドだけを取得する射影"""
+    projection = {"_id": 0}
+    for table, columns in selected.values():
+        for column in columns:
+            projection[column.path] = 1
+    return projection
+
+
+def _lookup(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def require_pyarrow(export_format: str):
+    if export_format in ("parquet", "arrow") and pa is None:
+        raise ValueError(f"pyarrow is required for {export_format} export")
+
+
+class CsvTableWriter:
+    """CSVの書き出し（一定量ごとにまとめて sink に書き込む）"""
+
+    def __init__(self, sink: BinaryIO, columns: List[ExportColumn]):
+        self.sink = sink
+        self.columns = columns
+        self.rows = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow([column.name for column in columns])
+
+    def write_row(self, row: List[Any]):
+        self._writer.writerow(["" if value is None else value for value in row])
+        self.rows += 1
+        if self._buffer.tell() >= CSV_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        data = self._buffer.getvalue()
+        if data:
+            self.sink.write(data.encode("utf-8"))
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+    def close(self):
+        self.flush()
+
+
+class ArrowTableWriter:
+    """Parquet・Arrow（IPCファイル形式）の書き出し（ARROW_BATCH_ROWS 行ごとに書き込む）"""
+
+    def __init__(self, sink: BinaryIO, columns: List[ExportColumn], export_format: str):
+        require_pyarrow(export_format)
+        arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        self.columns = columns
+        self.rows = 0
+        self.schema = pa.schema([(column.name, arrow_types[column.type]) for column in columns])
+        if export_format == "parquet":
+            self._writer = pq.ParquetWriter(sink, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(sink, self.schema)
+        self._batch: List[List[Any]] = [[] for _ in columns]
+
+    def write_row(self, row: List[Any]):
+        for values, value in zip(self._batch, row):
+            values.append(value)
+        self.rows += 1
+        if len(self._batch[0]) >= ARROW_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self._batch[0]:
+            return
+        self._writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(self._batch, self.schema)],
+            schema=self.schema
+        ))
+        self._batch = [[] for _ in self.columns]
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+def create_writer(sink: BinaryIO, columns: List[ExportColumn], export_format: str):
+    if export_format == "csv":
+        return CsvTableWriter(sink, columns)
+    return ArrowTableWriter(sink, columns, export_format)
+
+
+def _cast(value: Any, column_type: str) -> Any:
+    if value is None:
+        return None
+    try:
+        if column_type == "int":
+            return int(value)
+        if column_type == "float":
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if column_type != "string" or isinstance(value, str) else str(value)
+
+
+class AreaExporter:
+    """1回のカーソルの読み出しで複数の表を書き出す"""
+
+    def __init__(self, tables: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None):
+        names = list(tables) if tables else list(EXPORT_TABLES)
+        unknown = set(names) - set(EXPORT_TABLES)
+        if unknown:
+            raise ValueError(f"Unknown tables: {sorted(unknown)}")
+
+        # テーブル名 -> (定義, 出力する列)、指定した列を含まない表は除く
+        self.selected: Dict[str, Tuple[ExportTable, List[ExportColumn]]] = {}
+        for name in names:
+            table = EXPORT_TABLES[name]
+            selected_columns = select_columns(table, columns)
+            if selected_columns:
+                self.selected[name] = (table, selected_columns)
+        if not self.selected:
+            raise ValueError("No columns selected")
+
+    async def documents(self) -> AsyncIterator[Dict[str, Any]]:
+        """エリアのドキュメントをエリアコード順に1件ずつ取得"""
+        cursor = Area.get_motor_collection().find({}, mongo_projection(self.selected)).sort("code", 1)
+        async for doc in cursor:
+            yield doc
+
+    def rows(self, doc: Dict[str, Any]) -> Iterable[Tuple[str, List[Any]]]:
+        """1件のドキュメントから各表の行を作る"""
+        for name, (table, columns) in self.selected.items():
+            if table.source and doc.get(table.source) is None:
+                continue
+            yield name, [_cast(_lookup(doc, column.path), column.type) for column in columns]
+
+    async def export(self, writers: Dict[str, Any]) -> Dict[str, int]:
+        """各表のライターに書き出し、表ごとの行数を返す"""
+        async for doc in self.documents():
+            for name, row in self.rows(doc):
+                writers[name].write_row(row)
+        for writer in writers.values():
+            writer.close()
+        return {name: writer.rows for name, writer in writers.items()}
+
+
+class ChunkSink:
+    """書き込まれたバイト列を溜めておき、drain() で取り出す（ストリーミング応答用）"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def table_exporter(table: str, export_format: str = "csv",
+                   columns: Optional[Sequence[str]] = None) -> AreaExporter:
+    """1つの表のエクスポートを準備（形式・表・列が不正なら ValueError）"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format: {export_format}")
+    require_pyarrow(export_format)
+    return AreaExporter([table], columns)
+
+
+async def stream_table(exporter: AreaExporter, export_format: str = "csv") -> AsyncIterator[bytes]:
+    """1つの表を指定の形式で書き出し、書き出したバイト列を順に返す"""
+    (_, selected_columns), = exporter.selected.values()
+    sink = ChunkSink()
+    writer = create_writer(sink, selected_columns, export_format)
+    async for doc in exporter.documents():
+        for _, row in exporter.rows(doc):
+            writer.write_row(row)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
@@ -0,0 +1,258 @@
+"""
+類似エリア検索サービス
+各エリアの埋め込みデータ（住宅・公園・学校・治安・医療・文化・保育・年齢構成）と混雑度から
+標準化した特徴ベクトルを作り、エリア間の距離行列を事前計算する
+条件（例：家賃が基準エリアより安い）はNumPyのマスクでまとめて適用する
+インデックスはdata_version_serviceのフィンガープリントが変わったときだけ再構築する
+"""
+import asyncio
+import logging
+import math
+import operator
+import re
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models_mongo.area import Area
+from app.services.data_version_service import data_version_service
+from app.services.tokyo_congestion_service import tokyo_congestion_service
+
+logger = logging.getLogger(__name__)
+
+# 特徴量のグループ（congestion以外はdata_version_serviceのグループ名）と特徴量名 -> 値の取得方法
+FEATURE_GROUPS: Dict[str, Dict[str, Callable[[Area], Optional[float]]]] = {
+    "basic": {
+        "population_density": lambda a: a.population_density,
+    },
+    "housing_data": {
+        name: (lambda a, name=name: getattr(a.housing_data, name) if a.housing_data else None)
+        for name in ("rent_1r", "rent_1k", "rent_1dk", "rent_1ldk", "rent_2ldk", "rent_3ldk", "vacant_rate")
+    },
+    "park_data": {
+        name: (lambda a, name=name: getattr(a.park_data, name) if a.park_data else None)
+        for name in ("total_parks", "total_area_m2", "park_per_capita", "large_parks")
+    },
+    "school_data": {
+        name: (lambda a, name=name: getattr(a.school_data, name) if a.school_data else None)
+        for name in ("elementary_schools", "junior_high_schools", "high_schools", "universities", "average_score")
+    },
+    "safety_data": {
+        name: (lambda a, name=name: getattr(a.safety_data, name) if a.safety_data else None)
+        for name in ("crime_rate_per_1000", "disaster_risk_score", "police_stations", "fire_stations")
+    },
+    "medical_data": {
+        name: (lambda a, name=name: getattr(a.medical_data, name) if a.medical_data else None)
+        for name in ("hospitals", "clinics", "doctors_per_1000", "emergency_hospitals")
+    },
+    "culture_data": {
+        name: (lambda a, name=name: getattr(a.culture_data, name) if a.culture_data else None)
+        for name in (
+            "libraries", "museums", "community_centers", "sports_facilities", "library_books_per_capita",
+            "cultural_events_yearly", "movie_theaters", "theme_parks", "shopping_malls", "game_centers"
+        )
+    },
+    "childcare_data": {
+        name: (lambda a, name=name: getattr(a.childcare_data, name) if a.childcare_data else None)
+        for name in ("nursery_schools", "kindergartens", "total_capacity", "waiting_children", "acceptance_rate")
+    },
+    "age_distribution": {
+        f"age_{band}_ratio": (lambda a, band=band: _age_ratio(a, band))
+        for band in ("0-14", "15-64", "65+")
+    },
+    "congestion": {
+        "congestion_score": lambda a: _congestion_score(a.code),
+    },
+}
+
+# 比較演算子（長いものから順に照合）
+CONSTRAINT_OPERATORS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+CONSTRAINT_PATTERN = re.compile(r"^\s*([\w\-+]+)\s*(<=|>=|==|<|>|=)\s*(.+?)\s*$")
+
+# 結果に含める代表的な特徴量
+SUMMARY_FEATURES = ("rent_2ldk", "crime_rate_per_1000", "total_parks", "nursery_schools", "congestion_score")
+
+
+def _age_ratio(area: Area, band: str) -> Optional[float]:
+    """年齢構成の比率（0-14 / 15-64 / 65+ の合計に対する割合）"""
+    distribution = area.age_distribution or {}
+    total = sum(distribution.get(key, 0) for key in ("0-14", "15-64", "65+"))
+    if not total or band not in distribution:
+        return None
+    return distribution[band] / total
+
+
+def _to_float(value: Optional[float]) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _congestion_score(area_code: str) -> Optional[float]:
+    """事前計算済みの混雑度テーブルから総合混雑度を取得"""
+    if area_code not in tokyo_congestion_service.area_codes:
+        return None
+    return tokyo_congestion_service.calculate_area_congestion(area_code, area_code)['congestion_score']
+
+
+def parse_constraints(constraints: Optional[str]) -> List[Tuple[str, str, str]]:
+    """
+    条件文字列を (特徴量名, 演算子, 値) のリストに変換
+    例: "rent_2ldk<base,crime_rate_per_1000<=5"（値の "base" は基準エリアの値）
+    """
+    if not constraints:
+        return []
+    parsed = []
+    for clause in constraints.split(","):
+        if not clause.strip():
+            continue
+        match = CONSTRAINT_PATTERN.match(clause)
+        if not match:
+            raise ValueError(f"Invalid constraint: {clause}")
+        parsed.append(match.groups())
+    return parsed
+
+
+class AreaSimilarityService:
+    """標準化した特徴ベクトルによる類似エリアの最近傍検索"""
+
+    def __init__(self):
+        self.area_codes: List[str] = []
+        self.area_names: List[str] = []
+        self.feature_names: List[str] = []
+        self._raw: Optional[np.ndarray] = None
+        self._distances: Optional[np.ndarray] = None
+        self._version_token: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self):
+        """データバージョンが変わっていればインデックスを再構築"""
+        token = self._target_token(await data_version_service.get_versions())
+        if self._distances is not None and token == self._version_token:
+            return
+
+        async with self._lock:
+            token = self._target_token(await data_version_service.get_versions())
+            if self._distances is not None and token == self._version_token:
+                return
+            areas = await Area.find_all().to_list()
+            self.build(areas)
+            self._version_token = token
+            logger.info(f"Area similarity index rebuilt ({len(self.area_codes)} areas, {len(self.feature_names)} features)")
+
+    def _target_token(self, versions: Dict) -> str:
+        """特徴量に使うグループのフィンガープリントを合成"""
+        return "|".join(
+            versions.get(group, {}).get("fingerprint", "")
+            for group in FEATURE_GROUPS
+        )
+
+    def build(self, areas: List[Area]):
+        """特徴量行列と距離行列を計算"""
+        areas = sorted(areas, key=lambda area: area.code)
+        self.area_codes = [area.code for area in areas]
+        self.area_names = [area.name for area in areas]
+        self.feature_names = [name for features in FEATURE_GROUPS.values() for name in features]
+
+        raw = np.array([
+            [
+                _to_float(getter(area))
+                for features in FEATURE_GROUPS.values()
+                for getter in features.values()
+            ]
+            for area in areas
+        ], dtype=float).reshape(len(areas), len(self.feature_names))
+
+        # 標準化（欠損値は平均 = 0 とみなす、ばらつきのない特徴量は0）
+        with warnings.catch_warnings():
+            # 全エリアで欠損している特徴量の警告は無視
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            mean = np.nanmean(raw, axis=0)
+            std = np.nanstd(raw, axis=0)
+        mean = np.nan_to_num(mean)
+        std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+        standardized = np.nan_to_num((raw - mean) / std)
+
+        # 特徴量の多いグループが距離を支配しないよう、グループごとの寄与をそろえる
+        weights = np.concatenate([
+            np.full(len(features), 1 / math.sqrt(len(features)))
+            for features in FEATURE_GROUPS.values()
+        ])
+        weighted = standardized * weights
+
+        diff = weighted[:, np.newaxis, :] - weighted[np.newaxis, :, :]
+        self._distances = np.sqrt((diff ** 2).sum(axis=-1))
+        self._raw = raw
+
+    def _constraint_mask(self, base_index: int, constraints: List[Tuple[str, str, str]]) -> np.ndarray:
+        mask = np.ones(len(self.area_codes), dtype=bool)
+        for feature, op, value in constraints:
+            if feature not in self.feature_names:
+                raise ValueError(f"Unknown feature: {feature}")
+            column = self._raw[:, self.feature_names.index(feature)]
+            if value == "base":
+                threshold = column[base_index]
+                if np.isnan(threshold):
+                    raise ValueError(f"Base area has no value for {feature}")
+            else:
+                try:
+                    threshold = float(value)
+                except ValueError:
+                    raise ValueError(f"Invalid value for {feature}: {value}")
+            # 値が欠損しているエリアは条件を満たさないものとする
+            with np.errstate(invalid="ignore"):
+                mask &= ~np.isnan(column) & CONSTRAINT_OPERATORS[op](column, threshold)
+        return mask
+
+    def _summary(self, index: int) -> Dict[str, Optional[float]]:
+        summary = {}
+        for feature in SUMMARY_FEATURES:
+            value = self._raw[index, self.feature_names.index(feature)]
+            summary[feature] = None if np.isnan(value) else float(value)
+        return summary
+
+    async def find_similar(self, area_code: str, k: int = 5, constraints: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """基準エリアに近いエリアを条件付きで k 件取得（基準エリアがなければNone）"""
+        await self.ensure_fresh()
+        if area_code not in self.area_codes:
+            return None
+
+        base_index = self.area_codes.index(area_code)
+        parsed = parse_constraints(constraints)
+        mask = self._constraint_mask(base_index, parsed)
+        mask[base_index] = False
+
+        candidates = np.flatnonzero(mask)
+        distances = self._distances[base_index, candidates]
+        order = candidates[np.argsort(distances, kind="stable")][:k]
+
+        return {
+            "base_area": {
+                "code": area_code,
+                "name": self.area_names[base_index],
+                **self._summary(base_index)
+            },
+            "constraints": [f"{feature}{op}{value}" for feature, op, value in parsed],
+            "total_matches": int(len(candidates)),
+            "similar_areas": [
+                {
+                    "code": self.area_codes[index],
+                    "name": self.area_names[index],
+                    "distance": round(float(self._distances[base_index, index]), 3),
+                    "similarity_score": round(100 / (1 + float(self._distances[base_index, index])), 1),
+                    **self._summary(index)
+                }
+                for index in order
+            ],
+            "features": self.feature_names
+        }
+
+
+# シングルトンインスタンス
+area_similarity_service = AreaSimilarityService()
@@ -8,6 +8,8 @@ import json
 import pandas as pd
 from typing import Dict, List, Optional
 import io
+
+from app.services.rate_limiter import rate_limiter, PRIORITY_BATCH
 from datetime import datetime
 
 class TokyoCKANAgeFetcher:
@@ -19,6 +21,11 @@ class TokyoCKANAgeFetcher:
             'User-Agent': 'Tokyo-Wellbeing-Map/1.0'
         }
     
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """レート制限（tokyo_opendata、バッチ優先度）を通してGETリクエストを送信"""
+        rate_limiter.acquire_sync("tokyo_opendata", priority=PRIORITY_BATCH)
+        return requests.get(url, **kwargs)
+    
     def search_age_population_datasets(self) -> List[Dict]:
         """年齢別人口に関するデータセットを検索"""
         search_terms = [
@@ -40,7 +47,7 @@ class TokyoCKANAgeFetcher:
                     'include_private': False
                 }
                 
-                response = requests.get(url, params=params, headers=self.headers)
+                response = self._get(url, params=params, headers=self.headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('success'):
@@ -61,7 +68,7 @@ class TokyoCKANAgeFetcher:
             url = f"{self.base_url}/package_show"
             params = {'id': dataset_id}
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self._get(url, params=params, headers=self.headers)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -74,7 +81,7 @@ class TokyoCKANAgeFetcher:
     def download_resource(self, resource_url: str, resource_format: str) -> Optional[pd.DataFrame]:
         """リソースをダウンロードしてDataFrameとして返す"""
         try:
-            response = requests.get(resource_url, headers=self.headers)
+            response = self._get(resource_url, headers=self.headers)
             if response.status_code == 200:
                 if resource_format.upper() in ['CSV', 'CSV/TSV']:
                     # CSVファイルとして読み込み
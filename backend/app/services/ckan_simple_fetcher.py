@@ -9,6 +9,8 @@ import pandas as pd
 from typing import Dict, Optional
 import io
 
+from app.services.rate_limiter import rate_limiter, PRIORITY_BATCH
+
 class TokyoCKANSimpleFetcher:
     """東京都CKAN APIから特定のデータセットを取得するクラス"""
     
@@ -18,6 +20,11 @@ class TokyoCKANSimpleFetcher:
             'User-Agent': 'Tokyo-Wellbeing-Map/1.0'
         }
     
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """レート制限（tokyo_opendata、バッチ優先度）を通してGETリクエストを送信"""
+        rate_limiter.acquire_sync("tokyo_opendata", priority=PRIORITY_BATCH)
+        return requests.get(url, **kwargs)
+    
     def get_specific_dataset(self, dataset_id: str) -> Optional[Dict]:
         """特定のデータセットを取得"""
         try:
@@ -26,7 +33,7 @@ class TokyoCKANSimpleFetcher:
             url = f"{self.base_url}/package_show"
             params = {'id': dataset_id}
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self._get(url, params=params, headers=self.headers)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -47,7 +54,7 @@ class TokyoCKANSimpleFetcher:
             'rows': 10
         }
         
-        response = requests.get(search_url, params=params, headers=self.headers)
+        response = self._get(search_url, params=params, headers=self.headers)
         age_data_by_ward = {}
         
         if response.status_code == 200:
@@ -70,7 +77,7 @@ class TokyoCKANSimpleFetcher:
                             
                             try:
                                 # Excelファイルをダウンロードして解析
-                                response = requests.get(resource_url)
+                                response = self._get(resource_url)
                                 if response.status_code == 200:
                                     df = pd.read_excel(io.BytesIO(response.content))
                                     
@@ -9,6 +9,8 @@ import pandas as pd
 from typing import Dict, List, Optional
 import io
 
+from app.services.rate_limiter import rate_limiter, PRIORITY_BATCH
+
 class TokyoCKANWasteSeparationFetcher:
     """東京都CKAN APIからゴミ分別ルールデータを取得するクラス"""
     
@@ -18,6 +20,11 @@ class TokyoCKANWasteSeparationFetcher:
             'User-Agent': 'Tokyo-Wellbeing-Map/1.0'
         }
     
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """レート制限（tokyo_opendata、バッチ優先度）を通してGETリクエストを送信"""
+        rate_limiter.acquire_sync("tokyo_opendata", priority=PRIORITY_BATCH)
+        return requests.get(url, **kwargs)
+    
     def search_waste_separation_datasets(self) -> List[Dict]:
         """ゴミ分別に関するデータセットを検索"""
         search_terms = [
@@ -43,7 +50,7 @@ class TokyoCKANWasteSeparationFetcher:
                     'include_private': False
                 }
                 
-                response = requests.get(url, params=params, headers=self.headers)
+                response = self._get(url, params=params, headers=self.headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('success'):
@@ -65,7 +72,7 @@ class TokyoCKANWasteSeparationFetcher:
             url = f"{self.base_url}/package_show"
             params = {'id': dataset_id}
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self._get(url, params=params, headers=self.headers)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -0,0 +1,252 @@
+"""
+複数の通勤先に対する通勤時間・通勤費の一括計算
+起点（区の中心と町）ごとに最寄り駅の候補とアクセス時間を持っておき、
+rail_network の駅 × 駅の所要時間表から 起点 × 候補駅 × 通勤先 を一度に計算する
+- 通勤時間：候補駅ごとの アクセス + 乗車 の最小値を、週の通勤日数で重み付けした平均
+- 通勤費：通勤先ごとに1か月定期と普通運賃の安い方（乗車時間からの概算）の合計
+"""
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models_mongo.area import Area
+from app.services.data_version_service import data_version_service
+from app.services.rail_network import BOARDING_WAIT_MINUTES, RailNetwork, access_minutes, rail_network
+
+logger = logging.getLogger(__name__)
+
+# 起点の計算に使うフィールドグループ（区の中心座標と町名・駅情報）
+COMMUTE_GROUPS = ("basic", "town_list")
+
+# 一度に指定できる通勤先の数
+MAX_COMMUTE_DESTINATIONS = 10
+
+# 通勤日数の既定値（日/週）
+DEFAULT_DAYS_PER_WEEK = 5
+
+# 町から最寄り駅までの徒歩時間（町の座標がないため一律、分）
+TOWN_ACCESS_MINUTES = 8.0
+
+# 運賃の概算（片道の普通運賃 = 基本 + 乗車1分あたり、円）
+BASE_FARE_YEN = 140
+FARE_YEN_PER_MINUTE = 6
+
+# 1か月定期の価格（片道運賃の倍数）と1か月の週数
+PASS_FARE_MULTIPLIER = 32
+WEEKS_PER_MONTH = 4.3
+
+# 町名リストの表記「町名（駅名｜路線）」
+TOWN_STATION_PATTERN = re.compile(r"^(.+?)（(.+?)）$")
+
+
+def monthly_commute_cost(ride_minutes, days_per_week):
+    """
+    1か月の通勤費（円、配列可）
+    1か月定期と、通勤日数分の往復の普通運賃の安い方（乗車しない場合は0）
+    """
+    ride_minutes = np.asarray(ride_minutes, dtype=float)
+    fare = BASE_FARE_YEN + FARE_YEN_PER_MINUTE * ride_minutes
+    commuter_pass = fare * PASS_FARE_MULTIPLIER
+    tickets = fare * 2 * np.asarray(days_per_week) * WEEKS_PER_MONTH
+    return np.where(ride_minutes > 0, np.minimum(commuter_pass, tickets), 0.0)
+
+
+def parse_town_station(town_with_station: str) -> Optional[Tuple[str, List[str]]]:
+    """「町名（駅名｜路線）」から町名と駅名の候補を取得（駅情報がなければNone）"""
+    match = TOWN_STATION_PATTERN.match(town_with_station)
+    if not match:
+        return None
+    town_name, station_info = match.groups()
+    station_part = station_info.split("｜")[0]
+    return town_name, [name.strip() for name in re.split(r"[・、/]", station_part) if name.strip()]
+
+
+class CommuteMatrixService:
+    """起点（区・町） × 通勤先の通勤時間と通勤費"""
+
+    def __init__(self, network: Optional[RailNetwork] = None):
+        self.network = network or rail_network
+        # 起点の情報と、起点ごとの候補駅の位置・アクセス時間 (起点, 候補)
+        self.origins: List[Dict[str, Any]] = []
+        self._candidates: np.ndarray = np.zeros((0, 1), dtype=int)
+        self._access: np.ndarray = np.zeros((0, 1))
+        self.version_token: Optional[str] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self):
+        """データバージョンが変わっていれば起点を再構築"""
+        token = self._target_token(await data_version_service.get_versions())
+        if self._loaded and token == self.version_token:
+            return
+
+        async with self._lock:
+            token = self._target_token(await data_version_service.get_versions())
+            if self._loaded and token == self.version_token:
+                return
+            self.build(await Area.find_all().to_list())
+            self.version_token = token
+            logger.info(f"Commute origins rebuilt ({len(self.origins)} origins)")
+
+    def _target_token(self, versions: Dict) -> str:
+        return "|".join(
+            versions.get(group, {}).get("fingerprint", "")
+            for group in COMMUTE_GROUPS
+        )
+
+    def build(self, areas: List[Area]):
+        """区の中心（最寄りの複数駅）と町（町名リストの駅）を起点にする"""
+        areas = sorted(areas, key=lambda area: area.code)
+        origins = [
+            {"type": "ward", "area_code": area.code, "area_name": area.name, "town_name": None}
+            for area in areas
+        ]
+        if areas:
+            candidates, distances = self.network.nearest_station_indices(
+                [area.center_lat for area in areas], [area.center_lng for area in areas]
+            )
+            access = access_minutes(distances)
+        else:
+            candidates, access = self._candidates[:0], self._access[:0]
+        width = candidates.shape[1]
+
+        # 町は駅情報の駅（複数あれば全部）を候補にし、足りない分はアクセス時間を無限大で埋める
+        town_candidates, town_access = [], []
+        for area in areas:
+            for item in area.town_list_with_stations or []:
+                parsed = parse_town_station(item)
+                if parsed is None:
+                    continue
+                town_name, station_names = parsed
+                positions = [
+                    position for position in map(self.network.station_position, station_names)
+                    if position is not None
+                ][:width]
+                if not positions:
+                    continue
+                origins.append({"type": "town", "area_code": area.code, "area_name": area.name, "town_name": town_name})
+                town_candidates.append(positions + [0] * (width - len(positions)))
+                town_access.append([TOWN_ACCESS_MINUTES] * len(positions) + [np.inf] * (width - len(positions)))
+
+        if town_candidates:
+            candidates = np.vstack([candidates, np.array(town_candidates, dtype=int)])
+            access = np.vstack([access, np.array(town_access)])
+
+        self.origins = origins
+        self._candidates = candidates
+        self._access = access
+        self._loaded = True
+
+    def resolve_destinations(self, destinations: Sequence[Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+        """通勤先 [{station, days_per_week}] を駅名と通勤日数の配列に変換"""
+        if not destinations:
+            raise ValueError("At least one commute destination is required")
+        if len(destinations) > MAX_COMMUTE_DESTINATIONS:
+            raise ValueError(f"Too many commute destinations (max {MAX_COMMUTE_DESTINATIONS})")
+
+        stations, days = [], []
+        for destination in destinations:
+            station = self.network.resolve_station(str(destination.get("station") or ""))
+            if station is None:
+                raise ValueError(f"Unknown station: {destination.get('station')}")
+            days_per_week = destination.get("days_per_week")
+            if days_per_week is None:
+                days_per_week = DEFAULT_DAYS_PER_WEEK
+            if not isinstance(days_per_week, (int, float)) or not 1 <= days_per_week <= 7:
+                raise ValueError(f"days_per_week must be between 1 and 7: {days_per_week}")
+            stations.append(station)
+            days.append(float(days_per_week))
+        return stations, np.array(days)
+
+    def _evaluate(self, candidates: np.ndarray, access: np.ndarray,
+                  stations: List[str], days: np.ndarray) -> Dict[str, np.ndarray]:
+        """(起点, 候補) の駅とアクセス時間から、通勤先ごとの所要時間と通勤費を計算"""
+        ride = self.network.minutes_to_many(stations)[candidates]       # (起点, 候補, 通勤先)
+        total = access[:, :, np.newaxis] + ride
+        best = np.argmin(total, axis=1)[:, np.newaxis, :]                # (起点, 1, 通勤先)
+        minutes = np.take_along_axis(total, best, axis=1)[:, 0, :]
+        ride_minutes = np.take_along_axis(ride, best, axis=1)[:, 0, :]
+        origin_stations = np.take_along_axis(
+            np.broadcast_to(candidates[:, :, np.newaxis], ride.shape), best, axis=1
+        )[:, 0, :]
+
+        costs = monthly_commute_cost(np.maximum(ride_minutes - BOARDING_WAIT_MINUTES, 0), days)
+        return {
+            "minutes": minutes,
+            "weighted_minutes": minutes @ days / days.sum(),
+            "weekly_minutes": minutes @ days * 2,
+            "monthly_cost": costs.sum(axis=1),
+            "origin_stations": origin_stations,
+        }
+
+    def origin_minutes(self, station: str) -> np.ndarray:
+        """全起点と駅の間の所要時間（起点の並びは self.origins、駅は解決済みの駅名）"""
+        ride = self.network.minutes_to_many([station])[self._candidates][:, :, 0]
+        return (self._access + ride).min(axis=1)
+
+    def evaluate_points(self, lat, lng, destinations: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """任意の地点（配列可）から通勤先への通勤時間と通勤費"""
+        stations, days = self.resolve_destinations(destinations)
+        candidates, distances = self.network.nearest_station_indices(lat, lng)
+        return self._evaluate(candidates, access_minutes(distances), stations, days)
+
+    async def ward_minutes(self, destinations: Sequence[Dict[str, Any]]) -> Dict[str, float]:
+        """区ごとの重み付き通勤時間（area_code -> 分）"""
+        await self.ensure_fresh()
+        stations, days = self.resolve_destinations(destinations)
+        wards = [i for i, origin in enumerate(self.origins) if origin["type"] == "ward"]
+        result = self._evaluate(self._candidates[wards], self._access[wards], stations, days)
+        return {
+            self.origins[i]["area_code"]: float(minutes)
+            for i, minutes in zip(wards, result["weighted_minutes"])
+        }
+
+    async def rank(self, destinations: Sequence[Dict[str, Any]], include_towns: bool = True,
+                   limit: Optional[int] = None) -> Dict[str, Any]:
+        """全起点を重み付き通勤時間の短い順（同じなら通勤費の安い順）に並べる"""
+        await self.ensure_fresh()
+        stations, days = self.resolve_destinations(destinations)
+        rows = np.array([
+            i for i, origin in enumerate(self.origins)
+            if include_towns or origin["type"] == "ward"
+        ], dtype=int)
+        result = self._evaluate(self._candidates[rows], self._access[rows], stations, days)
+
+        order = np.lexsort((result["monthly_cost"], result["weighted_minutes"]))
+        if limit is not None:
+            order = order[:limit]
+
+        ranking = []
+        for rank, i in enumerate(order.tolist(), 1):
+            ranking.append({
+                "rank": rank,
+                **self.origins[rows[i]],
+                "weighted_minutes": round(float(result["weighted_minutes"][i]), 1),
+                "weekly_minutes": round(float(result["weekly_minutes"][i]), 1),
+                "monthly_commute_cost": int(round(float(result["monthly_cost"][i]), -1)),
+                "destinations": [
+                    {
+                        "station": station,
+                        "days_per_week": int(day),
+                        "minutes": round(float(result["minutes"][i, j]), 1),
+                        "origin_station": self.network.stations[result["origin_stations"][i, j]]
+                    }
+                    for j, (station, day) in enumerate(zip(stations, days))
+                ]
+            })
+
+        return {
+            "destinations": [
+                {"station": station, "days_per_week": int(day)}
+                for station, day in zip(stations, days)
+            ],
+            "total_origins": int(len(rows)),
+            "ranking": ranking
+        }
+
+
+# シングルトンインスタンス
+commute_matrix_service = CommuteMatrixService()
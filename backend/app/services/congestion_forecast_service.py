@@ -0,0 +1,190 @@
+"""
+混雑度の予測サービス
+蓄積した時間単位の集計値（congestion_rollups）から、エリアごとに
+曜日 × 時間帯（7 × 24）の予測表を学習し、メモリ上に保持する
+
+モデル（加法モデル、NumPyで全エリアを一括推定）:
+    予測値 = 事前分布（静的モデルの平日/週末 × 時間帯）
+           + 曜日効果（エリア × 曜日）
+           + 時間帯補正（エリア × 平日/週末 × 時間帯）
+各効果は観測の新しさで重み付けした残差の平均を、観測数に応じて0へ縮小（shrinkage）して求める
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.models_mongo.congestion_history import CongestionRollup
+from app.services.tokyo_congestion_service import tokyo_congestion_service
+from app.utils.timezones import TOKYO_TZ, as_utc, tokyo_now, utc_now
+
+logger = logging.getLogger(__name__)
+
+# 学習に使う期間と、観測の重みが半分になるまでの日数
+TRAINING_WEEKS = 8
+HALF_LIFE_DAYS = 14.0
+
+# 縮小の強さ（この重みの観測で効果が半分だけ反映される）
+DOW_PRIOR_WEIGHT = 6.0
+HOUR_PRIOR_WEIGHT = 3.0
+
+# 予測する時間数（7日 × 24時間）
+FORECAST_HOURS = 7 * 24
+
+
+def _day_type(dow: np.ndarray) -> np.ndarray:
+    """曜日（月=0〜日=6）から平日/週末（0/1）"""
+    return (dow >= 5).astype(int)
+
+
+class CongestionForecastService:
+    """エリアごとの曜日 × 時間帯の混雑度予測表"""
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval or settings.CONGESTION_FORECAST_REFRESH_MINUTES * 60
+        self.area_codes = tokyo_congestion_service.area_codes
+        self._area_index = {code: index for index, code in enumerate(self.area_codes)}
+
+        # 事前分布：静的モデルの (エリア × 平日/週末 × 24時間) を曜日に展開
+        prior = tokyo_congestion_service.congestion_tensor.astype(float)
+        self._prior = prior[:, _day_type(np.arange(7)), :]  # (エリア, 7, 24)
+
+        self._table: np.ndarray = np.clip(np.rint(self._prior), 0, 100).astype(np.int16)
+        self._samples = np.zeros(len(self.area_codes), dtype=int)
+        self.trained_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def train(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """時間単位の集計値を読み込み、予測表を再計算"""
+        now = as_utc(now) if now else utc_now()
+        since = now - timedelta(weeks=TRAINING_WEEKS)
+        rows = await CongestionRollup.get_motor_collection().find(
+            {"resolution": "hour", "bucket_start": {"$gte": since}},
+            {"area_code": 1, "bucket_start": 1, "mean": 1, "samples": 1}
+        ).to_list(length=None)
+
+        area_indices = []
+        timestamps = []
+        values = []
+        samples = []
+        for row in rows:
+            index = self._area_index.get(row["area_code"])
+            if index is None:
+                continue
+            area_indices.append(index)
+            timestamps.append(as_utc(row["bucket_start"]))
+            values.append(row["mean"])
+            samples.append(row.get("samples", 1))
+
+        self._fit(
+            np.asarray(area_indices, dtype=int),
+            timestamps,
+            np.asarray(values, dtype=float),
+            np.asarray(samples, dtype=float),
+            now
+        )
+        self.trained_at = now
+        logger.info(f"Trained congestion forecast from {len(values)} hourly rollups")
+        return {"rollups": len(values), "trained_at": now.isoformat()}
+
+    def _fit(self, area_indices: np.ndarray, timestamps: List[datetime], values: np.ndarray,
+             samples: np.ndarray, now: datetime):
+        n_areas = len(self.area_codes)
+        if len(values) == 0:
+            self._table = np.clip(np.rint(self._prior), 0, 100).astype(np.int16)
+            self._samples = np.zeros(n_areas, dtype=int)
+            return
+
+        # 曜日・時間帯は日本時間で判定（集計値のbucket_startはUTC）
+        local = [timestamp.astimezone(TOKYO_TZ) for timestamp in timestamps]
+        dow = np.fromiter((t.weekday() for t in local), dtype=int, count=len(local))
+        hour = np.fromiter((t.hour for t in local), dtype=int, count=len(local))
+        age_days = np.fromiter(((now - t).total_seconds() / 86400 for t in timestamps), dtype=float, count=len(timestamps))
+
+        # 新しい観測ほど重く、集計に含まれる観測数でも重み付け
+        weights = samples * np.power(0.5, age_days / HALF_LIFE_DAYS)
+        residual = values - self._prior[area_indices, dow, hour]
+
+        # 曜日効果（エリア × 曜日）
+        dow_key = area_indices * 7 + dow
+        dow_weight = np.bincount(dow_key, weights=weights, minlength=n_areas * 7)
+        dow_sum = np.bincount(dow_key, weights=weights * residual, minlength=n_areas * 7)
+        dow_effect = (dow_sum / (dow_weight + DOW_PRIOR_WEIGHT)).reshape(n_areas, 7)
+
+        # 時間帯補正（エリア × 平日/週末 × 時間帯）：曜日効果を除いた残差から推定
+        day_type = _day_type(dow)
+        hour_residual = residual - dow_effect[area_indices, dow]
+        hour_key = (area_indices * 2 + day_type) * 24 + hour
+        hour_weight = np.bincount(hour_key, weights=weights, minlength=n_areas * 2 * 24)
+        hour_sum = np.bincount(hour_key, weights=weights * hour_residual, minlength=n_areas * 2 * 24)
+        hour_effect = (hour_sum / (hour_weight + HOUR_PRIOR_WEIGHT)).reshape(n_areas, 2, 24)
+
+        forecast = (
+            self._prior
+            + dow_effect[:, :, np.newaxis]
+            + hour_effect[:, _day_type(np.arange(7)), :]
+        )
+        self._table = np.clip(np.rint(forecast), 0, 100).astype(np.int16)
+        self._samples = np.bincount(area_indices, weights=samples, minlength=n_areas).astype(int)
+
+    def get_forecast(self, area_code: str, hours: int = FORECAST_HOURS,
+                     now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """現在時刻から hours 時間分の予測（日本時間）"""
+        index = self._area_index.get(area_code)
+        if index is None:
+            return None
+
+        local_now = tokyo_now(now)
+        start = local_now.replace(minute=0, second=0, microsecond=0)
+        # 曜日 × 時間帯の表を現在時刻から始まる時系列に並べ替え
+        offset = start.weekday() * 24 + start.hour
+        weekly = self._table[index].reshape(-1)
+        values = np.take(weekly, np.arange(offset, offset + hours), mode="wrap")
+
+        return {
+            "area_code": area_code,
+            "timezone": "Asia/Tokyo",
+            "trained_at": self.trained_at.isoformat() if self.trained_at else None,
+            "history_samples": int(self._samples[index]),
+            "source": "history" if self._samples[index] else "model",
+            "points": [
+                {"time": (start + timedelta(hours=i)).isoformat(), "congestion": int(value)}
+                for i, value in enumerate(values)
+            ]
+        }
+
+    def get_current(self, area_code: str, now: Optional[datetime] = None) -> Optional[int]:
+        """現在の時間帯の予測値"""
+        index = self._area_index.get(area_code)
+        if index is None:
+            return None
+        local_now = tokyo_now(now)
+        return int(self._table[index, local_now.weekday(), local_now.hour])
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.train()
+            except Exception as e:
+                logger.error(f"Error training congestion forecast: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+# シングルトンインスタンス
+congestion_forecast_service = CongestionForecastService()
@@ -0,0 +1,222 @@
+"""
+混雑度ヒートマップのグリッド生成
+23区を覆う固定のkmグリッド上に、駅の乗降者数・主要施設の来訪者数・商業集積度を
+ガウスカーネル密度推定で広げ、平日/週末 × 24時間のレイヤーを一括で生成する
+レイヤーはuint8に量子化し、タイル単位のバイト列として保持する
+"""
+import base64
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.data.tokyo_locations import ATTRACTION_COORDINATES, STATION_COORDINATES, WARD_CENTERS
+from app.services.congestion_model import DAY_TYPES
+from app.services.tokyo_congestion_service import tokyo_congestion_service
+
+logger = logging.getLogger(__name__)
+
+# グリッドの範囲（23区を覆う矩形）とセルの大きさ
+BOUNDS = {"south": 35.52, "north": 35.82, "west": 139.56, "east": 139.93}
+CELL_KM = 0.5
+
+# タイル1枚あたりのセル数（一辺）
+TILE_CELLS = 16
+
+# 1度あたりの距離（km）
+KM_PER_DEG_LAT = 110.57
+KM_PER_DEG_LNG = 111.32 * math.cos(math.radians((BOUNDS["south"] + BOUNDS["north"]) / 2))
+
+# 発生源ごとのカーネル幅（km）と重み（混雑度の基本スコアの重みに合わせる）
+STATION_BANDWIDTH_KM = 0.8
+ATTRACTION_BANDWIDTH_KM = 0.6
+SOURCE_WEIGHTS = {
+    "station": 0.25,
+    "attraction": 0.40,  # 観光地スコア + 主要観光施設
+    "retail": 0.15,
+}
+
+# 区の中心から区の半径のこの倍数より離れたセルは範囲外（湾岸・都外）とみなす
+WARD_MASK_RADIUS_FACTOR = 1.4
+
+
+def _to_km(lat: np.ndarray, lng: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """緯度経度をグリッド原点（南西端）からのkm座標に変換"""
+    x = (np.asarray(lng) - BOUNDS["west"]) * KM_PER_DEG_LNG
+    y = (np.asarray(lat) - BOUNDS["south"]) * KM_PER_DEG_LAT
+    return x, y
+
+
+class CongestionHeatmapService:
+    """混雑度ヒートマップのレイヤー・タイル"""
+
+    def __init__(self):
+        width_km = (BOUNDS["east"] - BOUNDS["west"]) * KM_PER_DEG_LNG
+        height_km = (BOUNDS["north"] - BOUNDS["south"]) * KM_PER_DEG_LAT
+        self.nx = int(math.ceil(width_km / CELL_KM))
+        self.ny = int(math.ceil(height_km / CELL_KM))
+        # セル中心のkm座標（行は南→北）
+        self._cell_x = (np.arange(self.nx) + 0.5) * CELL_KM
+        self._cell_y = (np.arange(self.ny) + 0.5) * CELL_KM
+
+        self._layers: Optional[np.ndarray] = None
+        self._tiles: Dict[Tuple[int, int, int, int], bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tiles_x(self) -> int:
+        return int(math.ceil(self.nx / TILE_CELLS))
+
+    @property
+    def tiles_y(self) -> int:
+        return int(math.ceil(self.ny / TILE_CELLS))
+
+    def _collect_sources(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """
+        発生源の (x, y, 重み, カーネル幅, 区コード) を収集
+        重みは発生源の種類ごとに合計1に正規化してからSOURCE_WEIGHTSを掛ける
+        """
+        service = tokyo_congestion_service
+        groups = []
+
+        # 駅（複数の区に登録されている駅は最大の乗降者数で1つにまとめる）
+        stations: Dict[str, Tuple[str, float]] = {}
+        for area_code, passengers in service.station_passengers.items():
+            for name, count in passengers.items():
+                if name in STATION_COORDINATES and (name not in stations or stations[name][1] < count):
+                    stations[name] = (area_code, count)
+        groups.append([
+            (*STATION_COORDINATES[name], count, STATION_BANDWIDTH_KM, area_code, "station")
+            for name, (area_code, count) in stations.items()
+        ])
+
+        # 主要観光施設・商業施設
+        groups.append([
+            (*ATTRACTION_COORDINATES[name], visitors, ATTRACTION_BANDWIDTH_KM, area_code, "attraction")
+            for area_code, attractions in service.major_attractions.items()
+            for name, visitors in attractions.items()
+            if name in ATTRACTION_COORDINATES
+        ])
+
+        # 商業集積度（区の中心に、区の半径程度の幅で広げる）
+        groups.append([
+            (lat, lng, service.retail_density.get(area_code, 200) * area_km2,
+             math.sqrt(area_km2 / math.pi), area_code, "retail")
+            for area_code, (lat, lng, area_km2) in WARD_CENTERS.items()
+        ])
+
+        lats, lngs, weights, bandwidths, area_codes = [], [], [], [], []
+        for group in groups:
+            total = sum(item[2] for item in group) or 1.0
+            for lat, lng, weight, bandwidth, area_code, kind in group:
+                lats.append(lat)
+                lngs.append(lng)
+                weights.append(weight / total * SOURCE_WEIGHTS[kind])
+                bandwidths.append(bandwidth)
+                area_codes.append(area_code)
+
+        x, y = _to_km(np.array(lats), np.array(lngs))
+        return x, y, np.array(weights), np.array(bandwidths), area_codes
+
+    def _hourly_multipliers(self, area_codes: List[str]) -> np.ndarray:
+        """
+        発生源ごとの (平日/週末 × 24時間) の倍率
+        所在する区の時間帯別混雑度を基本スコアで割った値（区の時間帯別プロファイル）
+        """
+        service = tokyo_congestion_service
+        index = {code: i for i, code in enumerate(service.area_codes)}
+        rows = np.array([index[code] for code in area_codes])
+        tensor = service.congestion_tensor[rows].astype(float)  # (発生源, 2, 24)
+        base = np.array([service._calculate_base_score(code) for code in area_codes])
+        return tensor / np.maximum(base, 1.0)[:, np.newaxis, np.newaxis]
+
+    def _ward_mask(self) -> np.ndarray:
+        """23区の範囲内とみなすセル（区の中心からの距離で近似）"""
+        lat, lng, area_km2 = (np.array(values) for values in zip(*WARD_CENTERS.values()))
+        x, y = _to_km(lat, lng)
+        radius = np.sqrt(area_km2 / math.pi) * WARD_MASK_RADIUS_FACTOR
+        dx = self._cell_x[np.newaxis, np.newaxis, :] - x[:, np.newaxis, np.newaxis]
+        dy = self._cell_y[np.newaxis, :, np.newaxis] - y[:, np.newaxis, np.newaxis]
+        distance = np.sqrt(dx ** 2 + dy ** 2)
+        return (distance <= radius[:, np.newaxis, np.newaxis]).any(axis=0)
+
+    def _compute_layers(self) -> np.ndarray:
+        """(平日/週末, 24時間, 行, 列) のuint8レイヤーを計算"""
+        x, y, weights, bandwidths, area_codes = self._collect_sources()
+
+        # ガウスカーネルは x, y 方向に分離できるため、発生源ごとの1次元カーネルの外積で計算
+        gx = np.exp(-0.5 * ((self._cell_x[np.newaxis, :] - x[:, np.newaxis]) / bandwidths[:, np.newaxis]) ** 2)
+        gy = np.exp(-0.5 * ((self._cell_y[np.newaxis, :] - y[:, np.newaxis]) / bandwidths[:, np.newaxis]) ** 2)
+        normalized = weights / (2 * math.pi * bandwidths ** 2)
+
+        hourly_weights = normalized[:, np.newaxis, np.newaxis] * self._hourly_multipliers(area_codes)
+        density = np.einsum("pdh,py,px->dhyx", hourly_weights, gy, gx, optimize=True)
+        density *= self._ward_mask()[np.newaxis, np.newaxis]
+
+        # 全レイヤー共通の最大値で量子化（時間帯どうしで色を比較できるように）
+        peak = density.max() or 1.0
+        return np.rint(density / peak * 255).astype(np.uint8)
+
+    def _ensure_layers(self) -> np.ndarray:
+        if self._layers is None:
+            with self._lock:
+                if self._layers is None:
+                    layers = self._compute_layers()
+                    layers.setflags(write=False)
+                    self._tiles = self._split_tiles(layers)
+                    self._layers = layers
+                    logger.info(f"Computed congestion heatmap layers {layers.shape}")
+        return self._layers
+
+    def _split_tiles(self, layers: np.ndarray) -> Dict[Tuple[int, int, int, int], bytes]:
+        """レイヤーをTILE_CELLS四方のタイル（端は0埋め）に分割したバイト列"""
+        padded = np.zeros(
+            (len(DAY_TYPES), 24, self.tiles_y * TILE_CELLS, self.tiles_x * TILE_CELLS), dtype=np.uint8
+        )
+        padded[:, :, :self.ny, :self.nx] = layers
+        tiles = {}
+        for d in range(len(DAY_TYPES)):
+            for hour in range(24):
+                for ty in range(self.tiles_y):
+                    for tx in range(self.tiles_x):
+                        tile = padded[d, hour, ty * TILE_CELLS:(ty + 1) * TILE_CELLS, tx * TILE_CELLS:(tx + 1) * TILE_CELLS]
+                        tiles[(d, hour, ty, tx)] = tile.tobytes()
+        return tiles
+
+    def get_metadata(self) -> Dict:
+        """グリッドの範囲・大きさ・タイル構成"""
+        return {
+            "bounds": BOUNDS,
+            "cell_km": CELL_KM,
+            "width": self.nx,
+            "height": self.ny,
+            "row_order": "south_to_north",
+            "tile_cells": TILE_CELLS,
+            "tiles_x": self.tiles_x,
+            "tiles_y": self.tiles_y,
+            "day_types": list(DAY_TYPES),
+            "hours": list(range(24)),
+            "dtype": "uint8"
+        }
+
+    def get_layer(self, day_type: str, hour: int) -> Dict:
+        """1時間分のレイヤー全体（base64エンコードしたuint8配列）"""
+        layers = self._ensure_layers()
+        layer = layers[DAY_TYPES.index(day_type), hour]
+        return {
+            **self.get_metadata(),
+            "day_type": day_type,
+            "hour": hour,
+            "data": base64.b64encode(layer.tobytes()).decode("ascii")
+        }
+
+    def get_tile(self, day_type: str, hour: int, ty: int, tx: int) -> Optional[bytes]:
+        """タイル1枚分のuint8バイト列（TILE_CELLS × TILE_CELLS）"""
+        self._ensure_layers()
+        return self._tiles.get((DAY_TYPES.index(day_type), hour, ty, tx))
+
+
+# シングルトンインスタンス
+congestion_heatmap_service = CongestionHeatmapService()
@@ -0,0 +1,345 @@
+"""
+混雑度の履歴（時系列）サービス
+- 観測値をバッファし、時系列コレクション（congestion_observations）にまとめて追記
+- 観測値はエリア・データソースごとに1時間1件まで（時刻はタイムゾーン付きのUTCで保存）
+- バックグラウンドで 生データ → 時間 → 日 → 週 の集計値（congestion_rollups）をデータソースごとに生成
+- 履歴の参照は集計値のみを読み、生データは走査しない
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.models_mongo.congestion_history import CongestionObservation, CongestionRollup, ObservationMeta
+from app.utils.timezones import TOKYO_TZ, as_utc, utc_now
+
+logger = logging.getLogger(__name__)
+
+# 集計の粒度と、その集計元（Noneは生データ）
+RESOLUTIONS = ("hour", "day", "week")
+ROLLUP_SOURCES = {"hour": None, "day": "hour", "week": "day"}
+
+# 日・週の区切りは日本時間で行う
+ROLLUP_TIMEZONE = "Asia/Tokyo"
+
+# 参照期間に応じた粒度の自動選択（期間の上限）
+AUTO_RESOLUTION_LIMITS = [
+    ("hour", timedelta(days=3)),
+    ("day", timedelta(days=120)),
+]
+
+# 1回の参照で返す最大の点数
+MAX_POINTS = 2000
+
+
+def choose_resolution(start: datetime, end: datetime) -> str:
+    """参照期間から集計の粒度を選択"""
+    span = end - start
+    for resolution, limit in AUTO_RESOLUTION_LIMITS:
+        if span <= limit:
+            return resolution
+    return "week"
+
+
+def bucket_floor(value: datetime, resolution: str) -> datetime:
+    """時刻を含む集計バケットの開始時刻（日・週は日本時間で区切る、UTCで返す）"""
+    local = as_utc(value).astimezone(TOKYO_TZ).replace(minute=0, second=0, microsecond=0)
+    if resolution != "hour":
+        local = local.replace(hour=0)
+    if resolution == "week":
+        local -= timedelta(days=local.weekday())
+    return local.astimezone(timezone.utc)
+
+
+class CongestionHistoryService:
+    """混雑度の観測値の記録・集計・参照"""
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        rollup_interval: Optional[float] = None,
+        max_buffer: Optional[int] = None
+    ):
+        self.flush_interval = flush_interval or settings.CONGESTION_HISTORY_FLUSH_SECONDS
+        self.rollup_interval = rollup_interval or settings.CONGESTION_ROLLUP_INTERVAL_MINUTES * 60
+        self.max_buffer = max_buffer or settings.CONGESTION_HISTORY_MAX_BUFFER
+        self._buffer: List[CongestionObservation] = []
+        # バッファの上限を超えて破棄した観測値の数
+        self.dropped = 0
+        # (area_code, source) -> 最後に記録した時刻（時単位）
+        self._recorded_hours: Dict[Tuple[str, str], datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_rollup: Optional[datetime] = None
+        # 前回の集計以降に書き出した観測値の最も古い時刻（遅れて書き出した観測値も再集計する）
+        self._changed_since: Optional[datetime] = None
+
+    def record(
+        self,
+        area_code: str,
+        congestion: float,
+        congestion_score: float,
+        source: str,
+        timestamp: Optional[datetime] = None
+    ) -> bool:
+        """観測値をバッファに追加（同じ時間帯に記録済みならFalse）"""
+        timestamp = as_utc(timestamp) if timestamp else utc_now()
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        key = (area_code, source)
+        if self._recorded_hours.get(key) == hour:
+            return False
+
+        self._recorded_hours[key] = hour
+        self._buffer.append(CongestionObservation(
+            timestamp=timestamp,
+            meta=ObservationMeta(area_code=area_code, source=source),
+            congestion=float(congestion),
+            congestion_score=float(congestion_score)
+        ))
+        self._trim_buffer()
+        return True
+
+    def _trim_buffer(self):
+        """バッファが上限を超えた分を古いものから破棄（MongoDB障害時にメモリが増え続けないように）"""
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow <= 0:
+            return
+        del self._buffer[:overflow]
+        self.dropped += overflow
+        logger.warning(
+            f"Congestion observation buffer is full; dropped {overflow} oldest observations "
+            f"({self.dropped} in total)"
+        )
+
+    async def flush_observations(self) -> int:
+        """バッファの観測値を時系列コレクションに追記"""
+        if not self._buffer:
+            return 0
+        observations, self._buffer = self._buffer, []
+        try:
+            await CongestionObservation.insert_many(observations)
+        except Exception as e:
+            logger.error(f"Error inserting congestion observations: {e}")
+            self._buffer = observations + self._buffer
+            self._trim_buffer()
+            return 0
+        self._mark_changed(min(observation.timestamp for observation in observations))
+        return len(observations)
+
+    def _mark_changed(self, since: Optional[datetime]):
+        if since is None:
+            return
+        since = as_utc(since)
+        if self._changed_since is None or since < self._changed_since:
+            self._changed_since = since
+
+    async def downsample(self) -> Dict[str, int]:
+        """時間 → 日 → 週の順に集計値を更新し、粒度ごとの更新件数を返す"""
+        changed_since, self._changed_since = self._changed_since, None
+        updated = {}
+        try:
+            for resolution in RESOLUTIONS:
+                updated[resolution] = await self._rollup(resolution, changed_since)
+        except Exception:
+            # 次回の集計で同じ範囲をやり直す
+            self._mark_changed(changed_since)
+            raise
+        self._last_rollup = utc_now()
+        return updated
+
+    async def _rollup_start(self, resolution: str, changed_since: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        再集計の開始時刻
+        最新の集計バケット（途中の可能性がある）と、前回の集計以降に書き出した
+        最も古い観測値を含むバケットのうち早い方から再集計する
+        集計値がまだなければNone（全期間を集計）
+        """
+        latest = await CongestionRollup.find(
+            CongestionRollup.resolution == resolution
+        ).sort(-CongestionRollup.bucket_start).limit(1).to_list()
+        if not latest:
+            return None
+        start = as_utc(latest[0].bucket_start)
+        if changed_since is not None:
+            start = min(start, bucket_floor(changed_since, resolution))
+        return start
+
+    async def _rollup(self, resolution: str, changed_since: Optional[datetime] = None) -> int:
+        start = await self._rollup_start(resolution, changed_since)
+        source_resolution = ROLLUP_SOURCES[resolution]
+
+        bucket = {"date": None, "unit": resolution, "timezone": ROLLUP_TIMEZONE}
+        if resolution == "week":
+            bucket["startOfWeek"] = "monday"
+
+        if source_resolution is None:
+            # 生データ（時系列コレクション）から集計
+            collection = CongestionObservation.get_motor_collection()
+            match: Dict[str, Any] = {}
+            if start:
+                match["timestamp"] = {"$gte": start}
+            bucket["date"] = "$timestamp"
+            group = {
+                "_id": {
+                    "area_code": "$meta.area_code",
+                    "source": "$meta.source",
+                    "bucket": {"$dateTrunc": bucket}
+                },
+                "samples": {"$sum": 1},
+                "total": {"$sum": "$congestion"},
+                "minimum": {"$min": "$congestion"},
+                "maximum": {"$max": "$congestion"}
+            }
+        else:
+            # 1段細かい粒度の集計値から集計
+            collection = CongestionRollup.get_motor_collection()
+            match = {"resolution": source_resolution}
+            if start:
+                match["bucket_start"] = {"$gte": start}
+            bucket["date"] = "$bucket_start"
+            group = {
+                "_id": {
+                    "area_code": "$area_code",
+                    "source": "$source",
+                    "bucket": {"$dateTrunc": bucket}
+                },
+                "samples": {"$sum": "$samples"},
+                "total": {"$sum": "$total"},
+                "minimum": {"$min": "$minimum"},
+                "maximum": {"$max": "$maximum"}
+            }
+
+        now = utc_now()
+        operations = []
+        async for row in collection.aggregate([{"$match": match}, {"$group": group}]):
+            samples = row["samples"]
+            operations.append(UpdateOne(
+                {
+                    "area_code": row["_id"]["area_code"],
+                    "source": row["_id"].get("source"),
+                    "resolution": resolution,
+                    "bucket_start": row["_id"]["bucket"]
+                },
+                {"$set": {
+                    "samples": samples,
+                    "total": row["total"],
+                    "minimum": row["minimum"],
+                    "maximum": row["maximum"],
+                    "mean": row["total"] / samples if samples else 0.0,
+                    "updated_at": now
+                }},
+                upsert=True
+            ))
+
+        if operations:
+            await CongestionRollup.get_motor_collection().bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def get_history(
+        self,
+        area_code: str,
+        start: datetime,
+        end: datetime,
+        resolution: str = "auto",
+        source: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        期間内の混雑度の推移を集計値から取得
+        source を省略した場合は全データソースの観測値をバケットごとに合算する
+        """
+        start, end = as_utc(start), as_utc(end)
+        if resolution == "auto":
+            resolution = choose_resolution(start, end)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        match: Dict[str, Any] = {
+            "area_code": area_code,
+            "resolution": resolution,
+            "bucket_start": {"$gte": start, "$lt": end}
+        }
+        if source:
+            match["source"] = source
+
+        rollups = await CongestionRollup.get_motor_collection().aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": "$bucket_start",
+                "samples": {"$sum": "$samples"},
+                "total": {"$sum": "$total"},
+                "minimum": {"$min": "$minimum"},
+                "maximum": {"$max": "$maximum"}
+            }},
+            {"$sort": {"_id": 1}},
+            {"$limit": MAX_POINTS}
+        ]).to_list(MAX_POINTS)
+
+        points = [
+            {
+                "bucket_start": as_utc(rollup["_id"]).isoformat(),
+                "mean": round(rollup["total"] / rollup["samples"], 1) if rollup["samples"] else 0.0,
+                "min": rollup["minimum"],
+                "max": rollup["maximum"],
+                "samples": rollup["samples"]
+            }
+            for rollup in rollups
+        ]
+
+        total_samples = sum(rollup["samples"] for rollup in rollups)
+        summary = None
+        if total_samples:
+            summary = {
+                "mean": round(sum(rollup["total"] for rollup in rollups) / total_samples, 1),
+                "min": min(rollup["minimum"] for rollup in rollups),
+                "max": max(rollup["maximum"] for rollup in rollups),
+                "observations": total_samples
+            }
+            # 前半と後半の平均の差（正なら混雑が増加傾向）
+            if len(rollups) >= 2:
+                half = len(rollups) // 2
+                first = rollups[:half]
+                second = rollups[half:]
+                first_mean = sum(r["total"] for r in first) / max(1, sum(r["samples"] for r in first))
+                second_mean = sum(r["total"] for r in second) / max(1, sum(r["samples"] for r in second))
+                summary["trend"] = round(second_mean - first_mean, 1)
+
+        return {
+            "area_code": area_code,
+            "source": source,
+            "resolution": resolution,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "points": points,
+            "summary": summary
+        }
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_observations()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_observations()
+                if (self._last_rollup is None or
+                        (utc_now() - self._last_rollup).total_seconds() >= self.rollup_interval):
+                    await self.downsample()
+            except Exception as e:
+                logger.error(f"Error in congestion history background task: {e}")
+
+
+# シングルトンインスタンス
+congestion_history_service = CongestionHistoryService()
@@ -0,0 +1,205 @@
+"""
+時間帯別混雑度のベクトル化モデル
+エリア分類ごとの時間帯別倍率（プロファイル行列）を基本スコアのベクトルに適用し、
+(エリア数 × 平日/週末 × 時間スロット) のテンソルを一括で生成する
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# 曜日区分（テンソルの2軸目の並び）
+DAY_TYPES = ("weekday", "weekend")
+
+# APIで返す時間帯（7時〜22時）
+SERVICE_HOURS = tuple(range(7, 23))
+
+
+@dataclass(frozen=True)
+class ProfileSegment:
+    """プロファイルの時間帯区間（hoursの各時刻に倍率と下限を適用）"""
+    hours: Tuple[int, ...]
+    multiplier: float
+    floor: float = 0.0
+
+
+@dataclass(frozen=True)
+class AreaProfile:
+    """
+    エリア分類ごとの時間帯別プロファイル
+    segmentsは先頭から優先して適用し、どの区間にも該当しない時刻はdefault_multiplierを使う
+    """
+    default_multiplier: float
+    segments: Tuple[ProfileSegment, ...] = ()
+    default_floor: float = 0.0
+
+
+def _hours(start: int, end: int) -> Tuple[int, ...]:
+    """start時〜end時（endを含む）"""
+    return tuple(range(start, end + 1))
+
+
+# 平日のプロファイル（昼夜間人口比による分類）
+WEEKDAY_PROFILES: Dict[str, AreaProfile] = {
+    # ビジネス街：通勤ラッシュ・ランチ・帰宅ラッシュに集中し、夜間は閑散
+    "business": AreaProfile(1.0, (
+        ProfileSegment((8, 9), 1.5),
+        ProfileSegment((12, 13), 1.3),
+        ProfileSegment((18, 19), 1.4),
+        ProfileSegment(_hours(20, 23), 0.5, floor=20),
+    )),
+    # 住宅街：朝の通勤時間と帰宅後にやや混雑し、日中は落ち着く
+    "residential": AreaProfile(0.9, (
+        ProfileSegment((7, 8), 1.2),
+        ProfileSegment((18, 19, 20), 1.1),
+        ProfileSegment(_hours(10, 16), 0.7, floor=20),
+    )),
+    # 商業・繁華街：夕方から夜にかけて混雑
+    "commercial": AreaProfile(1.0, (
+        ProfileSegment((8, 9), 1.3),
+        ProfileSegment((12, 13), 1.2),
+        ProfileSegment((17, 18, 19), 1.4),
+        ProfileSegment(_hours(20, 23), 1.1),
+    )),
+}
+
+# 週末のプロファイル
+WEEKEND_PROFILES: Dict[str, AreaProfile] = {
+    # 繁華街・観光地：日中から夜まで特に混雑
+    "hotspot": AreaProfile(0.8, (
+        ProfileSegment(_hours(11, 20), 1.4),
+        ProfileSegment(_hours(10, 21), 1.2),
+    )),
+    # 商業エリア：買い物時間帯に混雑
+    "shopping": AreaProfile(0.8, (
+        ProfileSegment(_hours(11, 19), 1.2),
+    )),
+    # ビジネス街：終日空いている
+    "business": AreaProfile(0.4, default_floor=20),
+    # その他
+    "other": AreaProfile(0.7, (
+        ProfileSegment(_hours(11, 18), 0.9),
+    )),
+}
+
+
+class CongestionProfileModel:
+    """
+    プロファイル行列による混雑度モデル
+    - 倍率行列・下限行列: (分類数, 時間スロット数) を曜日区分ごとに保持
+    - evaluate(): 基本スコアのベクトルと分類インデックスから (単位数, 2, 時間スロット数) を生成
+    区や町丁目など単位の種類に依存せず、分類と基本スコアさえあれば同じ計算で評価できる
+    """
+
+    def __init__(
+        self,
+        weekday_profiles: Dict[str, AreaProfile] = WEEKDAY_PROFILES,
+        weekend_profiles: Dict[str, AreaProfile] = WEEKEND_PROFILES,
+        slot_minutes: int = 60,
+        cap: float = 100.0
+    ):
+        if 60 % slot_minutes != 0:
+            raise ValueError("slot_minutes must divide 60")
+
+        self.slot_minutes = slot_minutes
+        self.slots_per_hour = 60 // slot_minutes
+        self.slot_count = 24 * self.slots_per_hour
+        self.cap = cap
+
+        self.class_names: Dict[str, Tuple[str, ...]] = {
+            "weekday": tuple(weekday_profiles),
+            "weekend": tuple(weekend_profiles),
+        }
+        self._multipliers: Dict[str, np.ndarray] = {}
+        self._floors: Dict[str, np.ndarray] = {}
+        for day_type, profiles in (("weekday", weekday_profiles), ("weekend", weekend_profiles)):
+            multipliers, floors = self._build_matrices(profiles.values())
+            self._multipliers[day_type] = multipliers
+            self._floors[day_type] = floors
+
+    def _build_matrices(self, profiles: Iterable[AreaProfile]) -> Tuple[np.ndarray, np.ndarray]:
+        """プロファイル群から (分類数, 時間スロット数) の倍率行列と下限行列を構築"""
+        multiplier_rows = []
+        floor_rows = []
+        for profile in profiles:
+            multipliers = np.full(24, profile.default_multiplier, dtype=float)
+            floors = np.full(24, profile.default_floor, dtype=float)
+            # 先頭の区間を優先するため後ろから上書き
+            for segment in reversed(profile.segments):
+                hours = list(segment.hours)
+                multipliers[hours] = segment.multiplier
+                floors[hours] = segment.floor
+            multiplier_rows.append(multipliers)
+            floor_rows.append(floors)
+
+        # 時間単位の行列をスロット単位に展開
+        multiplier_matrix = np.repeat(np.vstack(multiplier_rows), self.slots_per_hour, axis=1)
+        floor_matrix = np.repeat(np.vstack(floor_rows), self.slots_per_hour, axis=1)
+        multiplier_matrix.setflags(write=False)
+        floor_matrix.setflags(write=False)
+        return multiplier_matrix, floor_matrix
+
+    def class_index(self, day_type: str, class_name: str) -> int:
+        """分類名から行列の行インデックスを取得"""
+        return self.class_names[day_type].index(class_name)
+
+    def evaluate(
+        self,
+        base_scores: Sequence[float],
+        weekday_classes: Sequence[int],
+        weekend_classes: Sequence[int]
+    ) -> np.ndarray:
+        """
+        (単位数, 2, 時間スロット数) の混雑度テンソル（float）を生成
+        """
+        base = np.asarray(base_scores, dtype=float)[:, np.newaxis]
+        class_indices = {
+            "weekday": np.asarray(weekday_classes, dtype=int),
+            "weekend": np.asarray(weekend_classes, dtype=int),
+        }
+
+        layers = []
+        for day_type in DAY_TYPES:
+            indices = class_indices[day_type]
+            values = base * self._multipliers[day_type][indices]
+            values = np.maximum(self._floors[day_type][indices], np.minimum(self.cap, values))
+            layers.append(values)
+
+        return np.stack(layers, axis=1)
+
+    def evaluate_int(
+        self,
+        base_scores: Sequence[float],
+        weekday_classes: Sequence[int],
+        weekend_classes: Sequence[int]
+    ) -> np.ndarray:
+        """evaluate()の結果を整数（切り捨て）に変換"""
+        return np.trunc(self.evaluate(base_scores, weekday_classes, weekend_classes)).astype(np.int64)
+
+    def evaluate_named(
+        self,
+        base_scores: Sequence[float],
+        weekday_class_names: Sequence[str],
+        weekend_class_names: Sequence[str]
+    ) -> np.ndarray:
+        """分類名で指定して整数テンソルを生成（町丁目単位などの任意の単位用）"""
+        return self.evaluate_int(
+            base_scores,
+            [self.class_index("weekday", name) for name in weekday_class_names],
+            [self.class_index("weekend", name) for name in weekend_class_names],
+        )
+
+    def slot_index(self, hour: int, minute: int = 0) -> int:
+        """時刻からスロットインデックスを取得"""
+        return hour * self.slots_per_hour + minute // self.slot_minutes
+
+    def to_hourly_dict(self, values: np.ndarray, hours: Iterable[int] = SERVICE_HOURS) -> Dict[str, int]:
+        """1単位・1曜日区分のスロット配列を {"時": 混雑度} の辞書に変換（各時の先頭スロット）"""
+        return {str(hour): int(values[self.slot_index(hour)]) for hour in hours}
+
+    def to_slot_labels(self) -> List[str]:
+        """スロットのラベル（HH:MM）"""
+        return [
+            f"{slot // self.slots_per_hour:02d}:{(slot % self.slots_per_hour) * self.slot_minutes:02d}"
+            for slot in range(self.slot_count)
+        ]
@@ -0,0 +1,178 @@
+"""
+混雑度の更新配信（Server-Sent Events）
+- プロセス内の1つのプロデューサーが、購読中のエリアの混雑度を一定間隔で1回だけ計算し、
+  内容が変わったときだけ購読者に配信する
+- 購読者ごとに上限付きのキューを持ち、読み出しが追いつかない接続は古い更新から捨てる
+  （最新の値だけが意味を持つため、他の購読者やプロデューサーを待たせない）
+- 更新がない間はハートビートを送り、プロキシによる切断を防ぐ
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+from app.core.config import settings
+from app.services.congestion_forecast_service import congestion_forecast_service
+from app.services.tokyo_congestion_service import tokyo_congestion_service
+from app.utils.timezones import tokyo_now
+
+logger = logging.getLogger(__name__)
+
+# 購読者ごとのキューの上限（超えた分は古い更新から捨てる）
+SUBSCRIBER_QUEUE_SIZE = 16
+
+# 配信に含める予測の時間数
+STREAM_FORECAST_HOURS = 3
+
+
+class Subscriber:
+    """1つの接続の購読状態"""
+
+    def __init__(self, area_codes: Set[str], queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.area_codes = area_codes
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def put(self, event: Dict[str, Any]):
+        """更新をキューに追加（満杯なら最も古い更新を捨てる）"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """SSEのイベント形式に変換"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class CongestionStreamService:
+    """混雑度の更新を購読者に配信するブロードキャスター"""
+
+    def __init__(self, interval: Optional[float] = None, heartbeat_interval: Optional[float] = None):
+        self.interval = interval or settings.CONGESTION_STREAM_INTERVAL_SECONDS
+        self.heartbeat_interval = heartbeat_interval or settings.CONGESTION_STREAM_HEARTBEAT_SECONDS
+        self._subscribers: Set[Subscriber] = set()
+        # area_code -> 最後に配信した内容
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"connections": 0, "published": 0, "delivered": 0, "dropped": 0, "computations": 0}
+
+    def _subscribed_areas(self) -> Set[str]:
+        areas: Set[str] = set()
+        for subscriber in self._subscribers:
+            areas |= subscriber.area_codes
+        return areas
+
+    def _compute_snapshot(self, area_code: str) -> Dict[str, Any]:
+        """エリアの現在の混雑度（静的モデルと予測表から算出）"""
+        self._stats["computations"] += 1
+        congestion_data = tokyo_congestion_service.calculate_area_congestion(area_code, area_code)
+
+        current_congestion = congestion_forecast_service.get_current(area_code)
+        if current_congestion is None:
+            current_congestion = tokyo_congestion_service.get_current_congestion(area_code)
+
+        forecast = congestion_forecast_service.get_forecast(area_code, STREAM_FORECAST_HOURS + 1)
+        upcoming = forecast["points"][1:] if forecast else []
+
+        return {
+            "area_code": area_code,
+            "current_congestion": current_congestion,
+            "congestion_score": congestion_data['congestion_score'],
+            "forecast": upcoming,
+            "data_source": congestion_data['data_source']
+        }
+
+    def publish(self, area_code: str, snapshot: Dict[str, Any]) -> bool:
+        """内容が前回と異なる場合だけ購読者に配信（配信したらTrue）"""
+        if self._latest.get(area_code) == snapshot:
+            return False
+        self._latest[area_code] = snapshot
+
+        event = {**snapshot, "updated_at": tokyo_now().isoformat()}
+        self._stats["published"] += 1
+        for subscriber in self._subscribers:
+            if area_code in subscriber.area_codes:
+                subscriber.put(event)
+                self._stats["delivered"] += 1
+        return True
+
+    def refresh(self) -> int:
+        """購読中の全エリアを1回ずつ計算して配信し、配信した件数を返す"""
+        published = 0
+        for area_code in sorted(self._subscribed_areas()):
+            if self.publish(area_code, self._compute_snapshot(area_code)):
+                published += 1
+        return published
+
+    async def subscribe(self, area_codes: Iterable[str]) -> AsyncIterator[str]:
+        """
+        購読を開始し、SSEの文字列を順に返す
+        最初に各エリアの最新の値を送り、以降は更新とハートビートを送る
+        """
+        subscriber = Subscriber(set(area_codes))
+        self._subscribers.add(subscriber)
+        self._stats["connections"] += 1
+        try:
+            for area_code in sorted(subscriber.area_codes):
+                if area_code not in self._latest:
+                    self._latest[area_code] = self._compute_snapshot(area_code)
+                yield format_sse("congestion", {**self._latest[area_code], "updated_at": tokyo_now().isoformat()})
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield format_sse("heartbeat", {"time": tokyo_now().isoformat()})
+                    continue
+                if subscriber.dropped:
+                    # 読み出しが遅れて捨てた更新がある場合は件数を通知
+                    dropped, subscriber.dropped = subscriber.dropped, 0
+                    self._stats["dropped"] += dropped
+                    yield format_sse("dropped", {"count": dropped})
+                yield format_sse("congestion", event)
+        finally:
+            self._subscribers.discard(subscriber)
+            self._stats["connections"] -= 1
+            # 購読者がいなくなったエリアの最新値は破棄（再購読時に計算し直す）
+            for area_code in set(self._latest) - self._subscribed_areas():
+                del self._latest[area_code]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "subscribed_areas": len(self._subscribed_areas()),
+            "interval_seconds": self.interval,
+            "heartbeat_seconds": self.heartbeat_interval
+        }
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self._subscribers:
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error publishing congestion updates: {e}")
+
+
+# シングルトンインスタンス
+congestion_stream_service = CongestionStreamService()
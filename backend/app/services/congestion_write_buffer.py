@@ -0,0 +1,161 @@
+"""
+CongestionDataの書き込みバッファ（write-behind）
+- area_codeごとに更新をまとめ、最後の内容だけを書き込む
+- 前回書き込んだ内容とハッシュが同じ更新は書き込まない
+- 一定間隔で UpdateOne(upsert=True) の bulk_write としてまとめて書き込む
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.models_mongo.congestion import CongestionData
+
+logger = logging.getLogger(__name__)
+
+# 新規作成時のピーク・閑散時間帯（既存の挙動と同じ既定値）
+DEFAULT_PEAK_TIMES = ["平日 8:00-9:00", "平日 18:00-19:00"]
+DEFAULT_QUIET_TIMES = ["週末早朝", "平日 10:00-16:00"]
+
+
+def build_payload(congestion_data: Dict) -> Dict[str, Any]:
+    """混雑度データから保存対象のフィールドを抽出"""
+    return {
+        "weekday_congestion": congestion_data['weekday_congestion'],
+        "weekend_congestion": congestion_data['weekend_congestion'],
+        "congestion_factors": congestion_data['congestion_factors'],
+        "congestion_score": congestion_data['congestion_score'],
+        "facility_congestion": congestion_data.get('facility_congestion', {})
+    }
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class CongestionWriteBuffer:
+    """混雑度データの書き込みをまとめて行うバッファ"""
+
+    def __init__(self, flush_interval: Optional[float] = None):
+        self.flush_interval = flush_interval or settings.CONGESTION_WRITE_FLUSH_SECONDS
+        # area_code -> (area_name, payload, hash)
+        self._pending: Dict[str, Tuple[str, Dict[str, Any], str]] = {}
+        # area_code -> 最後に書き込んだ内容のハッシュ
+        self._written_hashes: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._stats = {"submitted": 0, "skipped": 0, "coalesced": 0, "written": 0, "flushes": 0, "errors": 0}
+
+    def submit(self, area_code: str, area_name: str, congestion_data: Dict) -> bool:
+        """
+        更新をバッファに登録（書き込み予定になればTrue、内容が変わらずスキップした場合はFalse）
+        """
+        self._stats["submitted"] += 1
+        payload = build_payload(congestion_data)
+        digest = payload_hash(payload)
+
+        if area_code in self._pending:
+            self._stats["coalesced"] += 1
+        elif self._written_hashes.get(area_code) == digest:
+            self._stats["skipped"] += 1
+            return False
+
+        self._pending[area_code] = (area_name, payload, digest)
+        return True
+
+    async def flush(self) -> int:
+        """バッファ内の更新を1回のbulk_writeで書き込み、書き込んだ件数を返す"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            now = datetime.now()
+            operations = []
+            for area_code, (area_name, payload, digest) in pending.items():
+                if self._written_hashes.get(area_code) == digest:
+                    continue
+                operations.append(UpdateOne(
+                    {"area_code": area_code},
+                    {
+                        "$set": {**payload, "payload_hash": digest, "updated_at": now},
+                        "$setOnInsert": {
+                            "area_name": area_name,
+                            "peak_times": DEFAULT_PEAK_TIMES,
+                            "quiet_times": DEFAULT_QUIET_TIMES,
+                            "created_at": now
+                        }
+                    },
+                    upsert=True
+                ))
+
+            if not operations:
+                return 0
+
+            try:
+                await CongestionData.get_motor_collection().bulk_write(operations, ordered=False)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Error flushing congestion data: {e}")
+                # 書き込めなかった更新を戻す（その間に届いた新しい更新を優先）
+                for area_code, entry in pending.items():
+                    self._pending.setdefault(area_code, entry)
+                return 0
+
+            for area_code, (_, _, digest) in pending.items():
+                self._written_hashes[area_code] = digest
+            self._stats["written"] += len(operations)
+            self._stats["flushes"] += 1
+            logger.info(f"Flushed {len(operations)} congestion data updates")
+            return len(operations)
+
+    async def _load_written_hashes(self):
+        """保存済みのハッシュを読み込み、再起動直後の同一内容の書き込みを避ける"""
+        cursor = CongestionData.get_motor_collection().find(
+            {"payload_hash": {"$exists": True}},
+            {"area_code": 1, "payload_hash": 1}
+        )
+        async for document in cursor:
+            self._written_hashes[document["area_code"]] = document["payload_hash"]
+
+    async def start(self):
+        if self._task is not None:
+            return
+        try:
+            await self._load_written_hashes()
+        except Exception as e:
+            logger.error(f"Error loading congestion data hashes: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """定期書き込みを停止し、残りの更新を書き込む"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in congestion write buffer: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": len(self._pending), "tracked_areas": len(self._written_hashes)}
+
+
+# シングルトンインスタンス
+congestion_write_buffer = CongestionWriteBuffer()
@@ -0,0 +1,176 @@
+"""
+エリアデータのバージョン管理サービス
+インポートスクリプト実行後にフィールドグループ単位のフィンガープリントを記録し、
+インデックスやキャッシュの差分再構築に利用する
+sync() を呼ばない書き込みも、エリアの件数と最終更新日時の変化から検知して記録し直す
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from app.models_mongo.area import Area
+from app.models_mongo.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+
+# フィールドグループとAreaドキュメントのフィールドの対応
+AREA_FIELD_GROUPS: Dict[str, List[str]] = {
+    "basic": [
+        "name", "name_kana", "name_en", "center_lat", "center_lng", "boundary",
+        "area_km2", "population", "households", "population_density"
+    ],
+    "housing_data": ["housing_data"],
+    "park_data": ["park_data"],
+    "school_data": ["school_data"],
+    "safety_data": ["safety_data"],
+    "medical_data": ["medical_data"],
+    "culture_data": ["culture_data"],
+    "childcare_data": ["childcare_data"],
+    "age_distribution": ["age_distribution"],
+    "characteristics": ["characteristics"],
+    "town_list": ["town_list", "town_list_with_stations", "station_coverage"],
+    "childcare_supports": ["childcare_supports"],
+}
+
+
+def _hash(value: Any) -> str:
+    """値のフィンガープリントを計算"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class DataVersionService:
+    """
+    エリアデータのフィンガープリントを管理
+    - sync(): 現在のエリアデータからフィンガープリントを計算し、変化したグループを記録
+    - get_versions(): 記録済みのフィンガープリントを取得（プロセス内で短時間キャッシュ）
+      エリアの件数・最終更新日時が前回から変わっていれば sync() で記録し直す
+    """
+
+    def __init__(self, cache_ttl_seconds: float = 10.0):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._versions: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: float = 0.0
+        # 前回確認したエリアの件数と最終更新日時
+        self._area_probe: Optional[Tuple[int, Optional[datetime]]] = None
+        self._lock = asyncio.Lock()
+
+    def fingerprint_areas(self, areas: Iterable[Area]) -> Dict[str, Dict[str, Any]]:
+        """エリアリストからグループ別のフィンガープリントを計算"""
+        area_dicts = [area.model_dump(mode="json") for area in areas]
+
+        versions = {}
+        for group, fields in AREA_FIELD_GROUPS.items():
+            area_fingerprints = {
+                area_dict["code"]: _hash({field: area_dict.get(field) for field in fields})
+                for area_dict in area_dicts
+            }
+            versions[group] = {
+                "fingerprint": _hash(sorted(area_fingerprints.items())),
+                "area_fingerprints": area_fingerprints
+            }
+
+        return versions
+
+    async def sync(self, areas: Optional[List[Area]] = None) -> List[str]:
+        """
+        現在のエリアデータとの差分を記録
+        変化したフィールドグループ名のリストを返す
+        """
+        if areas is None:
+            areas = await Area.find_all().to_list()
+
+        current = self.fingerprint_areas(areas)
+        stored = {doc.group: doc for doc in await DataVersion.find_all().to_list()}
+
+        changed_groups = []
+        for group, version in current.items():
+            existing = stored.get(group)
+            if existing and existing.fingerprint == version["fingerprint"]:
+                continue
+
+            if existing:
+                existing.fingerprint = version["fingerprint"]
+                existing.area_fingerprints = version["area_fingerprints"]
+                existing.updated_at = datetime.utcnow()
+                await existing.save()
+            else:
+                await DataVersion(
+                    group=group,
+                    fingerprint=version["fingerprint"],
+                    area_fingerprints=version["area_fingerprints"]
+                ).insert()
+            changed_groups.append(group)
+
+        self._versions = current
+        self._loaded_at = time.monotonic()
+        self._area_probe = self._probe_from_areas(areas)
+
+        if changed_groups:
+            logger.info(f"Data version updated: {', '.join(changed_groups)}")
+
+        return changed_groups
+
+    @staticmethod
+    def _probe_from_areas(areas: List[Area]) -> Tuple[int, Optional[datetime]]:
+        return len(areas), max((area.updated_at for area in areas), default=None)
+
+    async def _probe(self) -> Tuple[int, Optional[datetime]]:
+        """エリアの件数と最終更新日時（1回の集計で取得）"""
+        result = await Area.get_motor_collection().aggregate([
+            {"$group": {"_id": None, "count": {"$sum": 1}, "updated_at": {"$max": "$updated_at"}}}
+        ]).to_list(1)
+        if not result:
+            return 0, None
+        return result[0]["count"], result[0]["updated_at"]
+
+    async def get_versions(self) -> Dict[str, Dict[str, Any]]:
+        """記録済みのフィンガープリントを取得"""
+        if self._versions and time.monotonic() - self._loaded_at < self.cache_ttl_seconds:
+            return self._versions
+
+        async with self._lock:
+            if self._versions and time.monotonic() - self._loaded_at < self.cache_ttl_seconds:
+                return self._versions
+
+            probe = await self._probe()
+            docs = await DataVersion.find_all().to_list()
+            if len(docs) < len(AREA_FIELD_GROUPS) or probe != self._area_probe:
+                # 未記録のグループがある場合や、前回の確認以降にエリアが書き換えられた場合は
+                # 現在のデータから記録し直す（プロセスの起動直後も一度記録し直す）
+                await self.sync()
+            else:
+                self._versions = {
+                    doc.group: {
+                        "fingerprint": doc.fingerprint,
+                        "area_fingerprints": doc.area_fingerprints
+                    }
+                    for doc in docs
+                }
+                self._loaded_at = time.monotonic()
+
+        return self._versions
+
+    async def version_token(self, groups: Optional[Iterable[str]] = None) -> str:
+        """指定グループ（省略時は全グループ）の合成バージョン文字列を取得"""
+        versions = await self.get_versions()
+        selected = sorted(groups) if groups is not None else sorted(versions)
+        return _hash([versions.get(group, {}).get("fingerprint") for group in selected])[:16]
+
+    async def area_version_token(self, area_code: str, groups: Optional[Iterable[str]] = None) -> str:
+        """特定エリアの合成バージョン文字列を取得"""
+        versions = await self.get_versions()
+        selected = sorted(groups) if groups is not None else sorted(versions)
+        return _hash([
+            versions.get(group, {}).get("area_fingerprints", {}).get(area_code)
+            for group in selected
+        ])[:16]
+
+
+# シングルトンインスタンス
+data_version_service = DataVersionService()
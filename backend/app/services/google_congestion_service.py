@@ -2,12 +2,12 @@
 Google Places APIを使用した混雑度データ取得サービス
 """
 import os
-import googlemaps
 from typing import Dict, List, Optional
 import logging
-from datetime import datetime
 import asyncio
 from app.core.config import settings
+from app.services.places_client import AsyncPlacesClient
+from app.utils.timezones import tokyo_now
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +17,20 @@ class GoogleCongestionService:
         self.api_key = settings.GOOGLE_PLACES_API_KEY
         if not self.api_key:
             logger.error("Google Places API key not found!")
-            self.gmaps = None
+            self.places = None
         else:
-            self.gmaps = googlemaps.Client(key=self.api_key)
+            self.places = AsyncPlacesClient(api_key=self.api_key)
+    
+    async def close(self):
+        if self.places:
+            await self.places.close()
     
     async def get_area_real_congestion(self, area_name: str, lat: float, lng: float) -> Dict:
         """
         エリアの実際の混雑度データを取得
         """
-        if not self.gmaps:
-            logger.error("Google Maps client not initialized")
+        if not self.places:
+            logger.error("Google Places client not initialized")
             return self._get_default_congestion_data()
         
         try:
@@ -42,37 +46,46 @@ class GoogleCongestionService:
             all_congestion_data = []
             facility_congestion = {}
             
-            for place_type, query in place_types:
-                # 施設を検索
-                try:
-                    places_result = self.gmaps.places_nearby(
-                        location=(lat, lng),
-                        radius=2000,  # 2km圏内
-                        type=place_type,
-                        language='ja'
-                    )
-                    
-                    places = places_result.get('results', [])[:5]  # 上位5件
-                    type_congestion_data = []
-                    
-                    for place in places:
-                        place_id = place.get('place_id')
-                        if place_id:
-                            congestion = await self._get_place_live_busyness(place_id)
-                            if congestion:
-                                type_congestion_data.append(congestion)
-                                all_congestion_data.append(congestion)
-                    
-                    if type_congestion_data:
-                        avg_congestion = sum(c['current_popularity'] for c in type_congestion_data) / len(type_congestion_data)
-                        facility_congestion[place_type] = {
-                            'average': avg_congestion,
-                            'places_count': len(type_congestion_data)
-                        }
-                
-                except Exception as e:
-                    logger.error(f"Error getting {place_type} data for {area_name}: {e}")
+            # 施設タイプ別の検索を並行して実行
+            search_results = await self.places.places_nearby_many(
+                location=(lat, lng),
+                radius=2000,  # 2km圏内
+                place_types=[place_type for place_type, _ in place_types]
+            )
+            
+            type_place_ids = {}
+            for place_type, _ in place_types:
+                places_result = search_results[place_type]
+                if isinstance(places_result, Exception):
+                    logger.error(f"Error getting {place_type} data for {area_name}: {places_result}")
                     continue
+                
+                places = places_result.get('results', [])[:5]  # 上位5件
+                type_place_ids[place_type] = [place['place_id'] for place in places if place.get('place_id')]
+            
+            # 全タイプの施設詳細を並行して取得
+            lookups = [
+                (place_type, place_id)
+                for place_type, place_ids in type_place_ids.items()
+                for place_id in place_ids
+            ]
+            busyness_results = await asyncio.gather(
+                *[self._get_place_live_busyness(place_id) for _, place_id in lookups]
+            )
+            
+            type_congestion_map = {place_type: [] for place_type in type_place_ids}
+            for (place_type, _), congestion in zip(lookups, busyness_results):
+                if congestion:
+                    type_congestion_map[place_type].append(congestion)
+                    all_congestion_data.append(congestion)
+            
+            for place_type, type_congestion_data in type_congestion_map.items():
+                if type_congestion_data:
+                    avg_congestion = sum(c['current_popularity'] for c in type_congestion_data) / len(type_congestion_data)
+                    facility_congestion[place_type] = {
+                        'average': avg_congestion,
+                        'places_count': len(type_congestion_data)
+                    }
             
             # 全体の統計を計算
             if all_congestion_data:
@@ -81,7 +94,7 @@ class GoogleCongestionService:
                 weekend_congestion = {}
                 
                 # 実際のデータから時間帯別の混雑度を推定
-                current_hour = datetime.now().hour
+                current_hour = tokyo_now().hour
                 base_congestion = sum(c['current_popularity'] for c in all_congestion_data) / len(all_congestion_data)
                 
                 for hour in range(7, 23):
@@ -116,7 +129,7 @@ class GoogleCongestionService:
                     'weekend_congestion': weekend_congestion,
                     'congestion_factors': congestion_factors,
                     'facility_congestion': facility_congestion,
-                    'last_updated': datetime.now(),
+                    'last_updated': tokyo_now(),
                     'data_source': 'google_places_api'
                 }
             else:
@@ -132,7 +145,7 @@ class GoogleCongestionService:
         """
         try:
             # Place Details APIで詳細情報を取得
-            place_details = self.gmaps.place(
+            place_details = await self.places.place(
                 place_id,
                 fields=['name', 'business_status', 'current_opening_hours', 'rating'],
                 language='ja'
@@ -146,7 +159,7 @@ class GoogleCongestionService:
             
             if result.get('business_status') == 'OPERATIONAL':
                 # 営業中の場合、評価や時間帯から混雑度を推定
-                current_hour = datetime.now().hour
+                current_hour = tokyo_now().hour
                 rating = result.get('rating', 3.0)
                 
                 # 時間帯と評価から混雑度を推定
@@ -183,7 +196,7 @@ class GoogleCongestionService:
             'weekend_congestion': {str(h): 40 for h in range(7, 23)},
             'congestion_factors': ["データ取得エラー"],
             'facility_congestion': {},
-            'last_updated': datetime.now(),
+            'last_updated': tokyo_now(),
             'data_source': 'default'
         }
 
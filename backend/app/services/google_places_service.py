@@ -3,7 +3,7 @@ Google Places API Service
 レジャー施設情報と混雑度データを取得するサービス
 """
 import os
-import googlemaps
+import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import statistics
@@ -11,6 +11,7 @@ import logging
 from sqlalchemy.orm import Session
 from app.models.area import Area, CultureData
 from app.core.config import settings
+from app.services.places_client import AsyncPlacesClient
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +21,17 @@ class GooglePlacesService:
         self.api_key = settings.GOOGLE_PLACES_API_KEY
         if not self.api_key:
             logger.warning("Google Places API key not found. Using sample data only.")
-            self.gmaps = None
+            self.places = None
         else:
-            self.gmaps = googlemaps.Client(key=self.api_key)
+            self.places = AsyncPlacesClient(api_key=self.api_key)
+    
+    async def close(self):
+        if self.places:
+            await self.places.close()
     
     async def update_leisure_facilities(self, area: Area, db: Session) -> Dict:
         """エリアのレジャー施設情報を更新"""
-        if not self.gmaps:
+        if not self.places:
             logger.info("Google Places API not configured. Skipping update.")
             return {}
         
@@ -34,13 +39,18 @@ class GooglePlacesService:
             # エリアの中心座標
             location = (area.center_lat, area.center_lng)
             
-            # 施設タイプごとに検索
-            facilities = {
-                'movie_theaters': await self._search_places(area.name, location, 'movie_theater', '映画館'),
-                'theme_parks': await self._search_places(area.name, location, 'amusement_park', 'テーマパーク'),
-                'shopping_malls': await self._search_places(area.name, location, 'shopping_mall', 'ショッピングモール'),
-                'game_centers': await self._search_places(area.name, location, 'arcade', 'ゲームセンター')
+            # 施設タイプごとに並行して検索
+            searches = {
+                'movie_theaters': ('movie_theater', '映画館'),
+                'theme_parks': ('amusement_park', 'テーマパーク'),
+                'shopping_malls': ('shopping_mall', 'ショッピングモール'),
+                'game_centers': ('arcade', 'ゲームセンター')
             }
+            results = await asyncio.gather(*[
+                self._search_places(area.name, location, place_type, query_suffix)
+                for place_type, query_suffix in searches.values()
+            ])
+            facilities = dict(zip(searches, results))
             
             # CultureDataを更新
             culture_data = db.query(CultureData).filter(CultureData.area_id == area.id).first()
@@ -64,7 +74,7 @@ class GooglePlacesService:
         """特定タイプの施設を検索"""
         try:
             # places_nearby APIを使用（新しいAPIに対応）
-            results = self.gmaps.places_nearby(
+            results = await self.places.places_nearby(
                 location=location,
                 radius=3000,  # 3km圏内
                 keyword=query_suffix,
@@ -92,7 +102,7 @@ class GooglePlacesService:
     
     async def get_area_congestion_data(self, area: Area) -> Dict:
         """エリアの混雑状況データを取得"""
-        if not self.gmaps:
+        if not self.places:
             return self._get_sample_congestion_data()
         
         try:
@@ -110,32 +120,48 @@ class GooglePlacesService:
             all_congestion_data = []
             facility_congestion = {}
             
-            for place_type, query in facility_types:
-                # 施設を検索
-                places = self.gmaps.places(
-                    query=f"{area.name} {query}",
-                    location=location,
-                    radius=2000,
-                    type=place_type,
-                    language='ja'
-                )
-                
-                type_congestion = []
-                
-                # 各施設の混雑データを取得
-                for place in places.get('results', [])[:3]:  # 各タイプ上位3施設
+            # 施設タイプ別の検索を並行して実行
+            search_results = await asyncio.gather(
+                *[
+                    self.places.places(
+                        query=f"{area.name} {query}",
+                        location=location,
+                        radius=2000,
+                        type=place_type,
+                        language='ja'
+                    )
+                    for place_type, query in facility_types
+                ],
+                return_exceptions=True
+            )
+            
+            lookups = []
+            for (place_type, _), places in zip(facility_types, search_results):
+                if isinstance(places, Exception):
+                    logger.error(f"Error searching {place_type} in {area.name}: {places}")
+                    continue
+                # 各タイプ上位3施設
+                for place in places.get('results', [])[:3]:
                     place_id = place.get('place_id')
                     if place_id:
-                        congestion = await self._get_place_congestion(place_id)
-                        if congestion:
-                            type_congestion.append(congestion)
-                            all_congestion_data.append(congestion)
-                
-                if type_congestion:
-                    facility_congestion[place_type] = {
-                        'average': statistics.mean([c['average_popularity'] for c in type_congestion]),
-                        'peak': max([c['peak_popularity'] for c in type_congestion])
-                    }
+                        lookups.append((place_type, place_id))
+            
+            # 全施設の混雑データを並行して取得
+            congestion_results = await asyncio.gather(
+                *[self._get_place_congestion(place_id) for _, place_id in lookups]
+            )
+            
+            type_congestion_map = {}
+            for (place_type, _), congestion in zip(lookups, congestion_results):
+                if congestion:
+                    type_congestion_map.setdefault(place_type, []).append(congestion)
+                    all_congestion_data.append(congestion)
+            
+            for place_type, type_congestion in type_congestion_map.items():
+                facility_congestion[place_type] = {
+                    'average': statistics.mean([c['average_popularity'] for c in type_congestion]),
+                    'peak': max([c['peak_popularity'] for c in type_congestion])
+                }
             
             # 全体の統計を計算
             if all_congestion_data:
@@ -160,7 +186,7 @@ class GooglePlacesService:
         """個別施設の混雑データを取得"""
         try:
             # Place Details APIで混雑情報を取得
-            place_details = self.gmaps.place(
+            place_details = await self.places.place(
                 place_id,
                 fields=['name', 'populartimes', 'current_popularity'],
                 language='ja'
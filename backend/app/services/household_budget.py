@@ -0,0 +1,398 @@
+"""
+家計シミュレーションの計算
+同じ世帯条件を全エリア × 全間取りに対してNumPyの配列でまとめて評価する
+（/simulation/household の1エリア分の計算と同じ式）
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.models_mongo.area import Area
+from app.services.data_version_service import data_version_service
+
+logger = logging.getLogger(__name__)
+
+# 間取りとHousingDataのフィールドの対応
+ROOM_TYPES = ("1R", "1K", "1DK", "1LDK", "2LDK", "3LDK")
+RENT_FIELDS = {
+    "1R": "rent_1r",
+    "1K": "rent_1k",
+    "1DK": "rent_1dk",
+    "1LDK": "rent_1ldk",
+    "2LDK": "rent_2ldk",
+    "3LDK": "rent_3ldk",
+}
+
+# 家賃データがない場合の既定値（万円）
+DEFAULT_RENT = 15
+
+# 家賃負担率の目安（これを超えると負担が大きい）
+AFFORDABLE_RENT_RATIO = 0.3
+
+# 行列の計算に使うフィールドグループ（data_version_serviceのグループ名）
+BUDGET_GROUPS = ("basic", "housing_data", "childcare_data")
+
+# パラメータスイープの上限（セル数）と、1回に計算するセル数の目安
+MAX_SWEEP_CELLS = 50_000
+SWEEP_CHUNK_CELLS = 10_000
+
+# これを超えるセル数のスイープはイベントループを止めないようスレッドで計算
+SWEEP_THREAD_CELLS = 5_000
+
+# スイープ結果のキャッシュの上限（配列の合計バイト数）
+SWEEP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def monthly_income_yen(annual_income: float) -> float:
+    """世帯年収（万円）から月収（円）"""
+    return annual_income / 12 * 10000
+
+
+def fixed_monthly_expenses(
+    adults: int,
+    children: int,
+    commute_count: int,
+    car_ownership: bool,
+    commute_cost=None
+) -> Dict[str, float]:
+    """
+    エリアに依存しない月々の支出（円）
+    commute_cost は通勤先から推定した通勤費（エリアごとの配列も可、省略時は一律の定期代）
+    """
+    total_people = adults + children
+    if commute_cost is None:
+        transport_cost = 15000 * commute_count  # 平均的な定期代
+    else:
+        transport_cost = commute_cost
+    if car_ownership:
+        transport_cost += 30000  # 駐車場代、ガソリン代等
+
+    return {
+        "光熱費": 15000 + 3000 * total_people,
+        "食費": 40000 * adults + 25000 * children,
+        "通信費": 5000 * adults + 2000 * children,
+        "交通費": transport_cost,
+        "その他": total_people * 10000,
+    }
+
+
+def childcare_rate(annual_income):
+    """保育料の月収に対する割合（所得に応じた簡易計算、配列も可）"""
+    return np.clip((np.asarray(annual_income) - 400) * 0.0001, 0.03, 0.1)
+
+
+def education_cost(
+    monthly_income: float,
+    annual_income: float,
+    children: int,
+    childcare_needed,
+    has_childcare_data
+):
+    """
+    教育費（保育料 + 習い事等）
+    has_childcare_data は真偽値またはエリアごとの配列（配列なら結果も配列）
+    """
+    childcare = np.where(
+        np.logical_and(childcare_needed, has_childcare_data),
+        monthly_income * childcare_rate(annual_income),
+        0.0
+    )
+    return childcare + children * 15000
+
+
+def affordability_score(rent, monthly_income: float):
+    """家賃負担率から affordability score（0-100）を計算"""
+    rent_ratio = np.asarray(rent) / monthly_income
+    return np.clip((1 - rent_ratio * 3) * 100, 0, 100)
+
+
+def _sweep_cells(definition: Dict[str, Any]) -> int:
+    """スイープのセル数"""
+    return (
+        len(definition["incomes"]) * len(definition["children"])
+        * len(definition["area_codes"]) * len(definition["room_types"])
+    )
+
+
+class HouseholdBudgetModel:
+    """全エリア × 全間取りの家賃行列を保持し、世帯条件ごとの家計を一括計算"""
+
+    def __init__(self):
+        self.area_codes: List[str] = []
+        self.area_names: List[str] = []
+        # (エリア, 間取り) の家賃（円）と、家賃データがあるかどうか
+        self.rents: np.ndarray = np.zeros((0, len(ROOM_TYPES)))
+        self.has_rent_data: np.ndarray = np.zeros((0, len(ROOM_TYPES)), dtype=bool)
+        self.has_childcare_data: np.ndarray = np.zeros(0, dtype=bool)
+        self.area_lat: np.ndarray = np.zeros(0)
+        self.area_lng: np.ndarray = np.zeros(0)
+        self.version_token: Optional[str] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        # スイープ結果はNumPy配列のまま保持し、応答時にリストへ変換
+        self._sweep_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sweep_cache_bytes = 0
+        self._sweep_stats = {"hits": 0, "misses": 0}
+
+    async def ensure_fresh(self):
+        """データバージョンが変わっていれば家賃行列を再構築"""
+        token = self._target_token(await data_version_service.get_versions())
+        if self._loaded and token == self.version_token:
+            return
+
+        async with self._lock:
+            token = self._target_token(await data_version_service.get_versions())
+            if self._loaded and token == self.version_token:
+                return
+            self.build(await Area.find_all().to_list())
+            self.version_token = token
+            logger.info(f"Household budget matrix rebuilt ({len(self.area_codes)} areas)")
+
+    def _target_token(self, versions: Dict) -> str:
+        return "|".join(
+            versions.get(group, {}).get("fingerprint", "")
+            for group in BUDGET_GROUPS
+        )
+
+    def build(self, areas: List[Area]):
+        areas = sorted(areas, key=lambda area: area.code)
+        self.area_codes = [area.code for area in areas]
+        self.area_names = [area.name for area in areas]
+
+        rents = np.full((len(areas), len(ROOM_TYPES)), np.nan)
+        for i, area in enumerate(areas):
+            if area.housing_data:
+                for j, room_type in enumerate(ROOM_TYPES):
+                    value = getattr(area.housing_data, RENT_FIELDS[room_type])
+                    if value is not None:
+                        rents[i, j] = value
+        self.has_rent_data = ~np.isnan(rents)
+        self.rents = np.where(self.has_rent_data, rents, DEFAULT_RENT) * 10000  # 円に変換
+        self.has_childcare_data = np.array([area.childcare_data is not None for area in areas], dtype=bool)
+        self.area_lat = np.array([area.center_lat for area in areas], dtype=float)
+        self.area_lng = np.array([area.center_lng for area in areas], dtype=float)
+        self._loaded = True
+        self._sweep_cache.clear()
+        self._sweep_cache_bytes = 0
+
+    def simulate(
+        self,
+        adults: int,
+        children: int,
+        annual_income: float,
+        commute_count: int = 0,
+        car_ownership: bool = False,
+        childcare_needed: bool = False,
+        commute_cost: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        世帯条件に対する (エリア, 間取り) の家計指標を計算
+        commute_cost はエリアごとの通勤費（省略時は一律の定期代）
+        """
+        monthly_income = monthly_income_yen(annual_income)
+        fixed_total = sum(fixed_monthly_expenses(
+            adults, children, commute_count, car_ownership, commute_cost
+        ).values())
+        education = education_cost(
+            monthly_income, annual_income, children, childcare_needed, self.has_childcare_data
+        )
+
+        # (エリア, 1) + (エリア, 間取り) のブロードキャストで支出合計を計算
+        total_expense = self.rents + (fixed_total + education)[:, np.newaxis]
+        disposable_income = monthly_income - total_expense
+        if monthly_income > 0:
+            savings_rate = disposable_income / monthly_income * 100
+            rent_ratio = self.rents / monthly_income
+            score = affordability_score(self.rents, monthly_income)
+        else:
+            savings_rate = np.zeros_like(total_expense)
+            rent_ratio = np.full_like(total_expense, np.inf)
+            score = np.zeros_like(total_expense)
+
+        return {
+            "rent": self.rents,
+            "total_expense": total_expense,
+            "disposable_income": disposable_income,
+            "savings_rate": savings_rate,
+            "rent_ratio": rent_ratio,
+            "affordability_score": score,
+            "affordable": rent_ratio <= AFFORDABLE_RENT_RATIO,
+        }
+
+    async def sweep(
+        self,
+        incomes: Sequence[float],
+        children: Sequence[int],
+        room_types: Optional[Sequence[str]] = None,
+        area_codes: Optional[Sequence[str]] = None,
+        adults: int = 2,
+        commute_count: int = 0,
+        car_ownership: bool = False,
+        childcare_needed: bool = False
+    ) -> Dict[str, Any]:
+        """
+        年収 × 子供の人数 × エリア × 間取り の全組み合わせの affordability score と貯蓄率
+        同じ条件（正規化後）の結果はキャッシュから返す
+        大きいグリッドはスレッドで計算する
+        """
+        definition = self._normalize_sweep(
+            incomes, children, room_types, area_codes, adults, commute_count, car_ownership, childcare_needed
+        )
+        key = hashlib.sha1(
+            json.dumps({**definition, "version": self.version_token}, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+        cached = self._sweep_cache.get(key)
+        if cached is not None:
+            self._sweep_cache.move_to_end(key)
+            self._sweep_stats["hits"] += 1
+            return self._render_sweep(cached)
+
+        self._sweep_stats["misses"] += 1
+        version = self.version_token
+        if _sweep_cells(definition) > SWEEP_THREAD_CELLS:
+            result = await asyncio.to_thread(self._compute_sweep, definition)
+        else:
+            result = self._compute_sweep(definition)
+
+        # 計算中に行列が再構築された場合は古い結果をキャッシュしない
+        if version == self.version_token:
+            self._store_sweep(key, result)
+        return self._render_sweep(result)
+
+    def _store_sweep(self, key: str, result: Dict[str, Any]):
+        """結果をキャッシュし、合計バイト数が上限を超えた分を古いものから削除"""
+        previous = self._sweep_cache.pop(key, None)
+        if previous is not None:
+            self._sweep_cache_bytes -= previous["nbytes"]
+        self._sweep_cache[key] = result
+        self._sweep_cache_bytes += result["nbytes"]
+        while self._sweep_cache_bytes > SWEEP_CACHE_MAX_BYTES and len(self._sweep_cache) > 1:
+            _, evicted = self._sweep_cache.popitem(last=False)
+            self._sweep_cache_bytes -= evicted["nbytes"]
+
+    @staticmethod
+    def _render_sweep(result: Dict[str, Any]) -> Dict[str, Any]:
+        """キャッシュした配列を応答用のリストに変換"""
+        response = {key: value for key, value in result.items() if key != "nbytes"}
+        response["affordability_score"] = result["affordability_score"].tolist()
+        response["savings_rate"] = result["savings_rate"].tolist()
+        return response
+
+    def check_sweep_size(
+        self,
+        income_count: int,
+        children_count: int,
+        room_types: Optional[Sequence[str]] = None,
+        area_codes: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        年収の軸を作る前にスイープのセル数（重複除去前の上限）を確認
+        上限を超える場合はValueError
+        """
+        rooms = len(set(room_types)) if room_types else len(ROOM_TYPES)
+        areas = len(set(area_codes)) if area_codes else len(self.area_codes)
+        cells = income_count * children_count * rooms * areas
+        if cells > MAX_SWEEP_CELLS:
+            raise ValueError(f"Sweep grid too large ({cells} cells, max {MAX_SWEEP_CELLS})")
+        return cells
+
+    def _normalize_sweep(self, incomes, children, room_types, area_codes, adults, commute_count,
+                         car_ownership, childcare_needed) -> Dict[str, Any]:
+        """スイープ条件を正規化（重複の除去・並べ替え・検証）"""
+        incomes = sorted({round(float(income), 2) for income in incomes})
+        children = sorted({int(count) for count in children})
+        if room_types:
+            unknown_rooms = set(room_types) - set(ROOM_TYPES)
+            if unknown_rooms:
+                raise ValueError(f"Unknown room types: {sorted(unknown_rooms)}")
+            room_types = [room_type for room_type in ROOM_TYPES if room_type in set(room_types)]
+        else:
+            room_types = list(ROOM_TYPES)
+
+        if area_codes:
+            unknown_areas = set(area_codes) - set(self.area_codes)
+            if unknown_areas:
+                raise ValueError(f"Unknown area codes: {sorted(unknown_areas)}")
+            area_codes = sorted(set(area_codes))
+        else:
+            area_codes = list(self.area_codes)
+
+        if not incomes or not children or not room_types or not area_codes:
+            raise ValueError("Sweep ranges must not be empty")
+        if min(incomes) <= 0:
+            raise ValueError("annual_income must be positive")
+        definition = {
+            "incomes": incomes,
+            "children": children,
+            "room_types": room_types,
+            "area_codes": area_codes,
+            "adults": int(adults),
+            "commute_count": int(commute_count),
+            "car_ownership": bool(car_ownership),
+            "childcare_needed": bool(childcare_needed),
+        }
+        cells = _sweep_cells(definition)
+        if cells > MAX_SWEEP_CELLS:
+            raise ValueError(f"Sweep grid too large ({cells} cells, max {MAX_SWEEP_CELLS})")
+        return definition
+
+    def _compute_sweep(self, definition: Dict[str, Any]) -> Dict[str, Any]:
+        area_index = {code: i for i, code in enumerate(self.area_codes)}
+        rows = np.array([area_index[code] for code in definition["area_codes"]])
+        cols = np.array([ROOM_TYPES.index(room_type) for room_type in definition["room_types"]])
+        rents = self.rents[np.ix_(rows, cols)][np.newaxis, np.newaxis]               # (1, 1, A, R)
+        has_childcare = self.has_childcare_data[rows][np.newaxis, np.newaxis, :, np.newaxis]  # (1, 1, A, 1)
+
+        incomes = np.array(definition["incomes"], dtype=float)
+        children = np.array(definition["children"], dtype=float)[np.newaxis, :, np.newaxis, np.newaxis]  # (1, C, 1, 1)
+        fixed_total = sum(fixed_monthly_expenses(
+            definition["adults"], children, definition["commute_count"], definition["car_ownership"]
+        ).values())
+
+        shape = (len(incomes), children.shape[1], len(rows), len(cols))
+        scores = np.empty(shape)
+        savings = np.empty(shape)
+
+        # メモリ使用量を抑えるため、年収の軸で分割して計算
+        cells_per_income = int(np.prod(shape[1:]))
+        chunk = max(1, SWEEP_CHUNK_CELLS // cells_per_income)
+        for start in range(0, len(incomes), chunk):
+            annual = incomes[start:start + chunk, np.newaxis, np.newaxis, np.newaxis]  # (I, 1, 1, 1)
+            monthly = monthly_income_yen(annual)
+            education = education_cost(monthly, annual, children, definition["childcare_needed"], has_childcare)
+            total_expense = rents + fixed_total + education
+            savings[start:start + chunk] = (monthly - total_expense) / monthly * 100
+            scores[start:start + chunk] = affordability_score(rents, monthly)
+
+        scores = np.round(scores, 1)
+        savings = np.round(savings, 1)
+        return {
+            "axes": ["annual_income", "children", "area_code", "room_type"],
+            "annual_income": definition["incomes"],
+            "children": definition["children"],
+            "area_codes": definition["area_codes"],
+            "area_names": [self.area_names[i] for i in rows],
+            "room_types": definition["room_types"],
+            "affordability_score": scores,
+            "savings_rate": savings,
+            "cells": int(scores.size),
+            "nbytes": int(scores.nbytes + savings.nbytes),
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return {
+            **self._sweep_stats,
+            "entries": len(self._sweep_cache),
+            "bytes": self._sweep_cache_bytes,
+            "max_bytes": SWEEP_CACHE_MAX_BYTES,
+        }
+
+
+# シングルトンインスタンス
+household_budget_model = HouseholdBudgetModel()
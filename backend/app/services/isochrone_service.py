@@ -0,0 +1,149 @@
+"""
+駅からの等時間圏（〜分以内で行ける区・町）
+commute_matrix_service の起点（区の中心と町）と駅 × 駅の所要時間表から求める
+- 時間は ISOCHRONE_BUCKET_MINUTES 分単位に切り上げ、(駅, 時間) ごとに結果をキャッシュする
+- shapely があれば、区の中心が圏内に入る区の境界を結合したポリゴンも返す
+"""
+import logging
+import math
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models_mongo.area import Area
+from app.services.commute_matrix import CommuteMatrixService, commute_matrix_service
+
+try:
+    from shapely.geometry import Polygon, mapping
+    from shapely.ops import unary_union
+except ImportError:  # shapely は任意（なければポリゴンは返さない）
+    Polygon = mapping = unary_union = None
+
+logger = logging.getLogger(__name__)
+
+# 時間の刻みと上限（分）
+ISOCHRONE_BUCKET_MINUTES = 5
+MAX_ISOCHRONE_MINUTES = 120
+
+# キャッシュする等時間圏の件数
+ISOCHRONE_CACHE_SIZE = 128
+
+
+def bucket_minutes(minutes: float) -> int:
+    """時間を刻みの単位に切り上げ"""
+    return int(math.ceil(minutes / ISOCHRONE_BUCKET_MINUTES) * ISOCHRONE_BUCKET_MINUTES)
+
+
+def merge_boundaries(boundaries: List[List[List[float]]]) -> Optional[Dict[str, Any]]:
+    """区の境界（[lng, lat] の並び）を結合してGeoJSONのジオメトリを返す"""
+    if unary_union is None:
+        return None
+    polygons = [Polygon(boundary).buffer(0) for boundary in boundaries if boundary and len(boundary) >= 3]
+    if not polygons:
+        return None
+    return mapping(unary_union(polygons))
+
+
+class IsochroneService:
+    """駅からの等時間圏の計算とキャッシュ"""
+
+    def __init__(self, commute: Optional[CommuteMatrixService] = None):
+        self.commute = commute or commute_matrix_service
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    async def get_isochrone(self, station: str, minutes: float, include_polygon: bool = False) -> Optional[Dict[str, Any]]:
+        """駅から minutes 分以内の区・町・駅（駅が見つからなければNone）"""
+        await self.commute.ensure_fresh()
+        origin = self.commute.network.resolve_station(station)
+        if origin is None:
+            return None
+
+        limit = bucket_minutes(min(minutes, MAX_ISOCHRONE_MINUTES))
+        key = (origin, limit, include_polygon, self.commute.version_token)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._stats["hits"] += 1
+            return cached
+
+        self._stats["misses"] += 1
+        result = self._compute(origin, limit)
+        if include_polygon:
+            result["polygon"] = await self._ward_polygon(
+                [ward["area_code"] for ward in result["wards"] if ward["center_reachable"]]
+            )
+            result["polygon_available"] = unary_union is not None
+
+        self._cache[key] = result
+        if len(self._cache) > ISOCHRONE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def _compute(self, origin: str, limit: int) -> Dict[str, Any]:
+        network = self.commute.network
+        minutes = self.commute.origin_minutes(origin)
+        reachable = np.flatnonzero(minutes <= limit)
+
+        wards: Dict[str, Dict[str, Any]] = {}
+        towns = []
+        for i in reachable[np.argsort(minutes[reachable], kind="stable")].tolist():
+            item = self.commute.origins[i]
+            value = round(float(minutes[i]), 1)
+            ward = wards.setdefault(item["area_code"], {
+                "area_code": item["area_code"],
+                "area_name": item["area_name"],
+                "minutes": value,
+                "center_reachable": False,
+                "reachable_towns": 0
+            })
+            if item["type"] == "ward":
+                ward["center_reachable"] = True
+            else:
+                ward["reachable_towns"] += 1
+                towns.append({
+                    "area_code": item["area_code"],
+                    "area_name": item["area_name"],
+                    "town_name": item["town_name"],
+                    "minutes": value
+                })
+
+        station_minutes = network.minutes_to(origin)
+        stations = np.flatnonzero(station_minutes <= limit)
+        stations = stations[np.argsort(station_minutes[stations], kind="stable")]
+
+        return {
+            "origin_station": origin,
+            "minutes": limit,
+            "wards": list(wards.values()),
+            "towns": towns,
+            "stations": [
+                {"station": network.stations[i], "minutes": round(float(station_minutes[i]), 1)}
+                for i in stations.tolist()
+            ],
+            "ward_count": len(wards),
+            "town_count": len(towns),
+            "station_count": int(len(stations))
+        }
+
+    async def _ward_polygon(self, area_codes: List[str]) -> Optional[Dict[str, Any]]:
+        if unary_union is None or not area_codes:
+            return None
+        cursor = Area.get_motor_collection().find(
+            {"code": {"$in": area_codes}},
+            {"_id": 0, "code": 1, "boundary": 1}
+        )
+        boundaries = [doc.get("boundary") async for doc in cursor]
+        try:
+            return merge_boundaries(boundaries)
+        except Exception as e:
+            logger.warning(f"Could not merge ward boundaries: {e}")
+            return None
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._cache), "max_entries": ISOCHRONE_CACHE_SIZE}
+
+
+# シングルトンインスタンス
+isochrone_service = IsochroneService()
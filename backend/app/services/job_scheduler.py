@@ -0,0 +1,345 @@
+"""
+プロセス内のジョブスケジューラ
+- 固定数のワーカーで処理対象（エリアコードなど）を1件ずつ実行し、同時実行数を一定に保つ
+- 同じキーのジョブが未完了なら新規に作らずそれを返す（MongoDBの一意インデックスで全プロセス共通に重複排除）
+- 失敗した対象は指数バックオフで再試行
+- ジョブ単位のキャンセル
+- ジョブの状態はMongoDBに保存し、ワーカー再起動時に未完了分を再開する
+  ジョブは担当（owner）と有効期限（lease）付きで1つのプロセスが取得し、実行中は期限を延長する
+  期限の切れたジョブ（停止・再起動したプロセスのもの）だけを他のプロセスが引き継ぐ
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models_mongo.refresh_job import RefreshJob
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+# 再試行の設定
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+JobHandler = Callable[[str], Awaitable[Any]]
+
+
+class JobScheduler:
+    """
+    ワーカープールによるジョブ実行
+    ハンドラは register() で種類ごとに登録し、処理対象1件を受け取って例外で失敗を通知する
+    """
+
+    def __init__(self, workers: Optional[int] = None, lease_seconds: Optional[float] = None):
+        self.worker_count = workers or settings.CONGESTION_REFRESH_WORKERS
+        self.lease_seconds = lease_seconds or settings.REFRESH_JOB_LEASE_SECONDS
+        # このプロセスの識別子（ジョブの担当者として記録）
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._lease_task: Optional[asyncio.Task] = None
+        self._jobs: Dict[str, RefreshJob] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._pending: Dict[str, int] = {}
+
+    def register(self, kind: str, handler: JobHandler):
+        """ジョブの種類とハンドラを登録"""
+        self._handlers[kind] = handler
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """ワーカーを起動し、担当の切れた未完了ジョブを引き継ぐ"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.worker_count)
+        ]
+        await self._resume_incomplete_jobs()
+        self._lease_task = asyncio.create_task(self._lease_loop())
+
+    async def stop(self):
+        """ワーカーを停止し、担当を手放す（実行中の対象は他のプロセスか次回起動時に再開される）"""
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+            self._lease_task = None
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        if self._jobs:
+            try:
+                await self._collection().update_many(
+                    {"owner": self.owner_id, "status": {"$in": ACTIVE_STATUSES}},
+                    {"$set": {"owner": None, "lease_expires_at": None}}
+                )
+            except Exception as e:
+                logger.warning(f"Failed to release job leases: {e}")
+        self._jobs.clear()
+        self._locks.clear()
+        self._pending.clear()
+
+    @staticmethod
+    def _collection():
+        return RefreshJob.get_motor_collection()
+
+    def _lease_deadline(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def _claim_next_job(self) -> Optional[RefreshJob]:
+        """担当のない（または期限の切れた）未完了ジョブを1件、このプロセスの担当として取得"""
+        doc = await self._collection().find_one_and_update(
+            {
+                "status": {"$in": ACTIVE_STATUSES},
+                "kind": {"$in": list(self._handlers)},
+                "$or": [{"owner": None}, {"lease_expires_at": {"$lt": datetime.utcnow()}}]
+            },
+            {"$set": {"owner": self.owner_id, "lease_expires_at": self._lease_deadline()}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        return RefreshJob.model_validate(doc) if doc else None
+
+    async def _resume_incomplete_jobs(self):
+        """担当の切れた未完了ジョブを引き継いで再開（起動時と担当の延長時に実行）"""
+        while True:
+            job = await self._claim_next_job()
+            if job is None:
+                return
+            remaining = [
+                item for item in job.items
+                if item not in job.completed_items and item not in job.failed_items
+            ]
+            logger.info(f"Resuming job {job.id} ({job.kind}) with {len(remaining)} remaining items")
+            self._enqueue(job, remaining)
+            if not remaining:
+                await self._finish(job)
+
+    async def _lease_loop(self):
+        """担当しているジョブの期限を延長し、期限の切れたジョブを引き継ぐ"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._renew_leases()
+                await self._resume_incomplete_jobs()
+            except Exception as e:
+                logger.error(f"Error renewing job leases: {e}")
+
+    async def _renew_leases(self):
+        if not self._jobs:
+            return
+        deadline = self._lease_deadline()
+        await self._collection().update_many(
+            {"owner": self.owner_id, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"lease_expires_at": deadline}}
+        )
+        for job in self._jobs.values():
+            job.lease_expires_at = deadline
+
+    async def submit(self, kind: str, items: Iterable[str], key: Optional[str] = None) -> Tuple[RefreshJob, bool]:
+        """
+        ジョブを登録して (ジョブ, 新規作成か) を返す
+        同じキーの未完了ジョブがあればそれを返す
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if not self.running:
+            raise RuntimeError("Job scheduler is not running")
+
+        key = key or kind
+        job = RefreshJob(
+            kind=kind,
+            key=key,
+            active_key=key,
+            owner=self.owner_id,
+            lease_expires_at=self._lease_deadline(),
+            items=list(dict.fromkeys(items))
+        )
+        try:
+            await job.insert()
+        except DuplicateKeyError:
+            # 同じキーの未完了ジョブ（他のプロセスのものを含む）があればそれを返す
+            existing = await RefreshJob.find_one(RefreshJob.active_key == key)
+            if existing is not None:
+                return self._jobs.get(str(existing.id), existing), False
+            raise
+
+        self._enqueue(job, job.items)
+        if not job.items:
+            await self._finish(job)
+        return job, True
+
+    def _enqueue(self, job: RefreshJob, items: List[str]):
+        job_id = str(job.id)
+        self._jobs[job_id] = job
+        self._locks.setdefault(job_id, asyncio.Lock())
+        self._pending[job_id] = len(items)
+        for item in items:
+            self._queue.put_nowait((job_id, item))
+
+    async def cancel(self, job_id: str) -> Optional[RefreshJob]:
+        """ジョブをキャンセル（実行中の対象は完了まで待ち、未着手の対象は実行しない）"""
+        job = await self.get_job(job_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return job
+
+        # 他のプロセスが実行中のジョブも、次の保存時にキャンセルを検知して止まる
+        finished_at = datetime.utcnow()
+        await self._collection().update_one(
+            {"_id": job.id, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"status": "cancelled", "active_key": None, "finished_at": finished_at}}
+        )
+        job.status = "cancelled"
+        job.active_key = None
+        job.finished_at = finished_at
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[RefreshJob]:
+        # このプロセスが実行中のジョブは手元の状態、それ以外はMongoDBの状態を返す
+        job = self._jobs.get(job_id)
+        if job is not None and job.status in ACTIVE_STATUSES:
+            return job
+        try:
+            return await RefreshJob.get(PydanticObjectId(job_id))
+        except Exception:
+            return None
+
+    async def list_jobs(self, limit: int = 20) -> List[RefreshJob]:
+        return await RefreshJob.find_all().sort(-RefreshJob.created_at).limit(limit).to_list()
+
+    async def _worker(self, index: int):
+        while True:
+            job_id, item = await self._queue.get()
+            try:
+                await self._run_item(job_id, item)
+            except Exception as e:
+                logger.error(f"Worker {index} failed on job {job_id} item {item}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_item(self, job_id: str, item: str):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        if job.status != "cancelled":
+            if job.status == "queued":
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                await self._save(job)
+
+            error = await self._run_with_retry(job, item)
+            if job.status != "cancelled":
+                if error is None:
+                    job.completed_items.append(item)
+                else:
+                    job.failed_items[item] = error
+                await self._save(job)
+
+        self._pending[job_id] -= 1
+        if self._pending[job_id] <= 0:
+            await self._finish(job)
+
+    async def _run_with_retry(self, job: RefreshJob, item: str) -> Optional[str]:
+        """ハンドラを実行し、失敗時は指数バックオフ（ジッター付き）で再試行。最終的なエラーを返す"""
+        handler = self._handlers[job.kind]
+        error = None
+        for attempt in range(MAX_RETRIES + 1):
+            if job.status == "cancelled":
+                return None
+            job.attempts[item] = attempt + 1
+            try:
+                await handler(item)
+                return None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if attempt == MAX_RETRIES:
+                    break
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(
+                    f"Job {job.id} item {item} failed (attempt {attempt + 1}): {error}; retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        return error
+
+    async def _finish(self, job: RefreshJob):
+        job_id = str(job.id)
+        if job.status in ACTIVE_STATUSES:
+            job.status = "failed" if job.failed_items and not job.completed_items else "succeeded"
+            job.active_key = None
+            job.finished_at = datetime.utcnow()
+            await self._save(job)
+        self._jobs.pop(job_id, None)
+        self._locks.pop(job_id, None)
+        self._pending.pop(job_id, None)
+
+    async def _save(self, job: RefreshJob):
+        """
+        担当しているジョブの状態を保存
+        キャンセルされた・他のプロセスに引き継がれたジョブは保存せず、以降の対象を実行しない
+        """
+        # 同じジョブを複数のワーカーが更新するため保存を直列化
+        lock = self._locks.setdefault(str(job.id), asyncio.Lock())
+        async with lock:
+            if job.status == "cancelled":
+                return
+            job.owner = self.owner_id
+            job.lease_expires_at = self._lease_deadline()
+            result = await self._collection().replace_one(
+                {"_id": job.id, "owner": self.owner_id, "status": {"$in": ACTIVE_STATUSES}},
+                job.model_dump(by_alias=True)
+            )
+            if result.matched_count == 0:
+                stored = await RefreshJob.get(job.id)
+                if stored is not None and stored.status == "cancelled":
+                    logger.info(f"Job {job.id} was cancelled; stopping")
+                else:
+                    logger.warning(f"Lost the lease on job {job.id}; another worker took it over")
+                # 残りの対象は実行しない（状態はMongoDBのものが正しい）
+                job.status = "cancelled"
+
+
+def format_job(job: RefreshJob) -> Dict[str, Any]:
+    """ジョブの状態と進捗をAPIレスポンス用に整形"""
+    total = len(job.items)
+    processed = len(job.completed_items) + len(job.failed_items)
+    return {
+        "job_id": str(job.id),
+        "kind": job.kind,
+        "key": job.key,
+        "status": job.status,
+        "progress": {
+            "total": total,
+            "completed": len(job.completed_items),
+            "failed": len(job.failed_items),
+            "remaining": max(0, total - processed),
+            "percent": round(processed / total * 100, 1) if total else 100.0
+        },
+        "errors": job.failed_items,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+# シングルトンインスタンス
+job_scheduler = JobScheduler()
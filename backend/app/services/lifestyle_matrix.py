@@ -0,0 +1,175 @@
+"""
+生活利便性シミュレーションの計算
+全エリアの施設数を行列で保持し、現在のエリアと全候補エリアの比較をNumPyでまとめて評価する
+（/simulation/lifestyle の1エリア分の評価と同じ式）
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.models_mongo.area import Area
+from app.services.data_version_service import data_version_service
+
+logger = logging.getLogger(__name__)
+
+# 行列の計算に使うフィールドグループ（data_version_serviceのグループ名）
+LIFESTYLE_GROUPS = ("basic", "park_data", "school_data", "medical_data")
+
+# 施設数の列（埋め込みデータ名, フィールド名）
+# children_parks・pediatric_clinics はモデルにないため、データがなければ0として扱う
+FACILITY_COLUMNS = {
+    "total_parks": ("park_data", "total_parks"),
+    "children_parks": ("park_data", "children_parks"),
+    "elementary_schools": ("school_data", "elementary_schools"),
+    "junior_high_schools": ("school_data", "junior_high_schools"),
+    "hospitals": ("medical_data", "hospitals"),
+    "clinics": ("medical_data", "clinics"),
+    "pediatric_clinics": ("medical_data", "pediatric_clinics"),
+}
+
+# 評価項目と、評価に必要な埋め込みデータ
+FACILITY_SOURCES = {
+    "parks": "park_data",
+    "schools": "school_data",
+    "hospitals": "medical_data",
+}
+
+
+def facility_count(area: Area, source: str, field: str) -> int:
+    """埋め込みデータの施設数（データやフィールドがなければ0）"""
+    data = getattr(area, source, None)
+    return getattr(data, field, None) or 0
+
+
+def park_score(total_parks, children_parks):
+    """公園評価（配列も可）"""
+    return np.minimum(100, np.asarray(total_parks) * 2) + np.minimum(20, np.asarray(children_parks) * 5)
+
+
+def school_score(elementary_schools, junior_high_schools, children_ages: Sequence[int]):
+    """学校評価（子供の年齢に応じた学校数、配列も可）"""
+    score = np.zeros_like(np.asarray(elementary_schools), dtype=float)
+    if any(age < 13 for age in children_ages):
+        score = score + np.minimum(100, np.asarray(elementary_schools) * 10)
+    if any(13 <= age < 16 for age in children_ages):
+        score = score + np.minimum(50, np.asarray(junior_high_schools) * 10)
+    return score
+
+
+def medical_score(hospitals, clinics, pediatric_clinics, has_children: bool):
+    """医療評価（子供がいる場合は小児科を加点、配列も可）"""
+    score = np.minimum(100, np.asarray(hospitals) * 20 + np.asarray(clinics) * 2)
+    if has_children:
+        score = score + np.minimum(30, np.asarray(pediatric_clinics) * 10)
+    return score
+
+
+def improvement_score(improvements, deteriorations):
+    """改善・悪化した項目数から総合改善スコア（0-100、配列も可）"""
+    return np.clip(50 + (np.asarray(improvements) - np.asarray(deteriorations)) * 10, 0, 100)
+
+
+class LifestyleMatrix:
+    """全エリアの施設数の行列を保持し、転居先候補をまとめて評価"""
+
+    def __init__(self):
+        self.area_ids: List[str] = []
+        self.area_codes: List[str] = []
+        self.area_names: List[str] = []
+        # 列は FACILITY_COLUMNS の順
+        self.counts: np.ndarray = np.zeros((0, len(FACILITY_COLUMNS)))
+        # 評価項目ごとの、埋め込みデータがあるかどうか
+        self.has_data: Dict[str, np.ndarray] = {}
+        self.version_token: Optional[str] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self):
+        """データバージョンが変わっていれば行列を再構築"""
+        token = self._target_token(await data_version_service.get_versions())
+        if self._loaded and token == self.version_token:
+            return
+
+        async with self._lock:
+            token = self._target_token(await data_version_service.get_versions())
+            if self._loaded and token == self.version_token:
+                return
+            self.build(await Area.find_all().to_list())
+            self.version_token = token
+            logger.info(f"Lifestyle matrix rebuilt ({len(self.area_codes)} areas)")
+
+    def _target_token(self, versions: Dict) -> str:
+        return "|".join(
+            versions.get(group, {}).get("fingerprint", "")
+            for group in LIFESTYLE_GROUPS
+        )
+
+    def build(self, areas: List[Area]):
+        areas = sorted(areas, key=lambda area: area.code)
+        self.area_ids = [str(area.id) for area in areas]
+        self.area_codes = [area.code for area in areas]
+        self.area_names = [area.name for area in areas]
+        self.counts = np.array([
+            [facility_count(area, source, field) for source, field in FACILITY_COLUMNS.values()]
+            for area in areas
+        ], dtype=float).reshape(len(areas), len(FACILITY_COLUMNS))
+        self.has_data = {
+            facility: np.array([getattr(area, source) is not None for area in areas], dtype=bool)
+            for facility, source in FACILITY_SOURCES.items()
+        }
+        self._loaded = True
+
+    def index_of(self, area_id: str) -> Optional[int]:
+        """エリアID（またはエリアコード）から行の位置を取得"""
+        if area_id in self.area_ids:
+            return self.area_ids.index(area_id)
+        if area_id in self.area_codes:
+            return self.area_codes.index(area_id)
+        return None
+
+    def evaluate(self, children_ages: Sequence[int]) -> Dict[str, np.ndarray]:
+        """全エリアの評価（データのないエリアは評価なし = NaN）"""
+        column = {name: self.counts[:, i] for i, name in enumerate(FACILITY_COLUMNS)}
+        scores = {
+            "parks": park_score(column["total_parks"], column["children_parks"]),
+            "schools": school_score(column["elementary_schools"], column["junior_high_schools"], children_ages),
+            "hospitals": medical_score(
+                column["hospitals"], column["clinics"], column["pediatric_clinics"], bool(children_ages)
+            ),
+        }
+        return {
+            facility: np.where(self.has_data[facility], score.astype(float), np.nan)
+            for facility, score in scores.items()
+        }
+
+    def compare(self, current_index: int, children_ages: Sequence[int],
+                important_facilities: Sequence[str]) -> Dict[str, Any]:
+        """
+        現在のエリアと全候補エリアを比較
+        評価のない項目は0として扱う（/simulation/lifestyle と同じ）
+        """
+        evaluation = self.evaluate(children_ages)
+        facilities = list(important_facilities)
+        # (項目, エリア) の評価と、現在のエリアとの差
+        values = np.array([
+            np.nan_to_num(evaluation[facility]) if facility in evaluation else np.zeros(len(self.area_codes))
+            for facility in facilities
+        ]).reshape(len(facilities), len(self.area_codes))
+        change = values - values[:, current_index:current_index + 1]
+
+        improvements = (change > 0).sum(axis=0)
+        deteriorations = (change < 0).sum(axis=0)
+        return {
+            "evaluation": evaluation,
+            "values": values,
+            "change": change,
+            "improvements": improvements,
+            "deteriorations": deteriorations,
+            "overall_improvement_score": improvement_score(improvements, deteriorations),
+        }
+
+
+# シングルトンインスタンス
+lifestyle_matrix = LifestyleMatrix()
@@ -0,0 +1,373 @@
+"""
+Google Maps / Places API 応答の永続キャッシュ
+- SQLiteファイルに応答を保存し、プロセス再起動やスクリプトの再実行をまたいで再利用する
+- エンドポイントごとのTTLと、期限切れ後も一定期間は古い応答を返して裏で再取得する
+  stale-while-revalidate に対応
+- キャッシュヒット数と、ヒットにより節約できた推定料金（円）を記録する
+  （stale のヒットは裏で再取得して課金されるため、節約額には含めない）
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 1ドルあたりの円換算レート（GOOGLE_PLACES_API_COST_SIMULATION.mdの試算と同じ）
+YEN_PER_USD = 150
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """エンドポイントごとのキャッシュポリシー"""
+    ttl: int                   # 新鮮とみなす秒数
+    stale_ttl: int             # TTL経過後も古い応答を返してよい秒数
+    usd_per_1000: float        # 1000リクエストあたりの料金（ドル）
+
+    @property
+    def yen_per_request(self) -> float:
+        return self.usd_per_1000 / 1000 * YEN_PER_USD
+
+
+# エンドポイント別のポリシー
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "nearbysearch": CachePolicy(ttl=7 * DAY, stale_ttl=30 * DAY, usd_per_1000=32.0),
+    "textsearch": CachePolicy(ttl=7 * DAY, stale_ttl=30 * DAY, usd_per_1000=17.0),
+    "details": CachePolicy(ttl=30 * DAY, stale_ttl=90 * DAY, usd_per_1000=17.0),
+    # 営業状態など短時間で変わるフィールドを含む Place Details（混雑度の推定に使う）
+    "details_live": CachePolicy(ttl=1 * HOUR, stale_ttl=2 * HOUR, usd_per_1000=17.0),
+    "geocode": CachePolicy(ttl=90 * DAY, stale_ttl=365 * DAY, usd_per_1000=5.0),
+}
+
+# 短時間で変わる Place Details のフィールド（含む場合は details_live のポリシーを使う）
+LIVE_DETAIL_FIELDS = {"business_status", "current_opening_hours", "opening_hours"}
+
+# キャッシュキーから除外するパラメータ
+IGNORED_PARAMS = {"key", "client", "signature"}
+
+# 座標の丸め桁数（小数点以下5桁 ≒ 1m）
+LOCATION_PRECISION = 5
+
+
+def _canonical_location(value: Any) -> Any:
+    if isinstance(value, str) and "," in value:
+        parts = value.split(",")
+        try:
+            return ",".join(f"{float(part):.{LOCATION_PRECISION}f}" for part in parts)
+        except ValueError:
+            return value
+    if isinstance(value, (tuple, list)) and len(value) == 2:
+        return ",".join(f"{float(part):.{LOCATION_PRECISION}f}" for part in value)
+    if isinstance(value, dict) and "lat" in value and "lng" in value:
+        return f"{float(value['lat']):.{LOCATION_PRECISION}f},{float(value['lng']):.{LOCATION_PRECISION}f}"
+    return value
+
+
+def canonicalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    同じ検索が同じキーになるようにパラメータを正規化
+    - APIキーやNone値を除外
+    - 座標を丸めて "lat,lng" 形式に統一
+    - 文字列をNFKC正規化・前後の空白を除去
+    - fieldsなどのリストは並び順に依存しないようソート
+    """
+    canonical = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS or value is None:
+            continue
+        if name == "location":
+            value = _canonical_location(value)
+        elif isinstance(value, str):
+            value = unicodedata.normalize("NFKC", value).strip()
+            if name == "fields":
+                value = ",".join(sorted(field.strip() for field in value.split(",") if field.strip()))
+        elif isinstance(value, (list, tuple, set)):
+            value = ",".join(sorted(str(item) for item in value))
+        canonical[name] = value
+    return canonical
+
+
+def make_cache_key(endpoint: str, params: Dict[str, Any]) -> Tuple[str, str]:
+    """(キャッシュキー, 正規化済みパラメータのJSON) を返す"""
+    params_json = json.dumps(canonicalize_params(params), sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha1(f"{endpoint}:{params_json}".encode("utf-8")).hexdigest()
+    return digest, params_json
+
+
+def cache_endpoint(endpoint: str, params: Dict[str, Any]) -> str:
+    """キャッシュポリシーを選ぶエンドポイント名（fields 未指定や営業状態を含む Details は details_live）"""
+    if endpoint != "details":
+        return endpoint
+    fields = canonicalize_params(params).get("fields")
+    if not fields or LIVE_DETAIL_FIELDS & set(fields.split(",")):
+        return "details_live"
+    return endpoint
+
+
+class PlacesCache:
+    """
+    SQLiteによる応答キャッシュ
+    非同期API（サーバー用）と同期API（スクリプト用）の両方を提供する
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.PLACES_CACHE_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # 実行中のバックグラウンド再取得（キャッシュキー -> タスク、GCされないよう参照を保持）
+        self._revalidations: Dict[str, asyncio.Task] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    cache_key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS stats (
+                    endpoint TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    stale_hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0,
+                    saved_yen REAL NOT NULL DEFAULT 0
+                );
+            """)
+        return self._conn
+
+    # ---- SQLiteアクセス（同期） ----
+
+    def _load(self, cache_key: str) -> Optional[Tuple[Dict, float]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, fetched_at FROM responses WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _store(self, cache_key: str, endpoint: str, params_json: str, response: Dict):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, endpoint, params, response, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key, endpoint, params_json, json.dumps(response, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+    def _count(self, endpoint: str, outcome: str):
+        policy = CACHE_POLICIES.get(endpoint)
+        # 節約になるのは新鮮なヒットのみ（stale のヒットは再取得の料金がかかる）
+        saved_yen = policy.yen_per_request if policy and outcome == "hits" else 0.0
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO stats (endpoint) VALUES (?)", (endpoint,)
+            )
+            self.conn.execute(
+                f"UPDATE stats SET {outcome} = {outcome} + 1, saved_yen = saved_yen + ? WHERE endpoint = ?",
+                (saved_yen, endpoint)
+            )
+            self.conn.commit()
+
+    def _lookup(self, endpoint: str, cache_key: str) -> Tuple[Optional[Dict], str]:
+        """キャッシュを参照し (応答, 状態) を返す。状態は fresh / stale / miss"""
+        cached = self._load(cache_key)
+        if cached is None:
+            return None, "miss"
+
+        response, fetched_at = cached
+        policy = CACHE_POLICIES.get(endpoint)
+        if policy is None:
+            return None, "miss"
+
+        age = time.time() - fetched_at
+        if age <= policy.ttl:
+            return response, "fresh"
+        if age <= policy.ttl + policy.stale_ttl:
+            return response, "stale"
+        return None, "miss"
+
+    @staticmethod
+    def _is_cacheable(response: Any) -> bool:
+        # エラー応答（OVER_QUERY_LIMITなど）は保存しない
+        if isinstance(response, dict):
+            return response.get("status", "OK") in ("OK", "ZERO_RESULTS")
+        return isinstance(response, list)
+
+    # ---- 非同期API ----
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        キャッシュから応答を取得し、なければfetch()で取得して保存
+        期限切れ（stale）の場合は古い応答をすぐに返し、バックグラウンドで再取得する
+        """
+        endpoint = cache_endpoint(endpoint, params)
+        cache_key, params_json = make_cache_key(endpoint, params)
+        response, state = await asyncio.to_thread(self._lookup, endpoint, cache_key)
+
+        if state == "fresh":
+            await asyncio.to_thread(self._count, endpoint, "hits")
+            return response
+
+        if state == "stale":
+            await asyncio.to_thread(self._count, endpoint, "stale_hits")
+            # 同じキーの再取得が実行中なら新たに再取得しない
+            if cache_key not in self._revalidations:
+                task = asyncio.create_task(self._revalidate(endpoint, cache_key, params_json, fetch))
+                self._revalidations[cache_key] = task
+                task.add_done_callback(lambda _: self._revalidations.pop(cache_key, None))
+            return response
+
+        await asyncio.to_thread(self._count, endpoint, "misses")
+        response = await fetch()
+        if self._is_cacheable(response):
+            await asyncio.to_thread(self._store, cache_key, endpoint, params_json, response)
+        return response
+
+    async def _revalidate(self, endpoint: str, cache_key: str, params_json: str,
+                          fetch: Callable[[], Awaitable[Any]]):
+        try:
+            response = await fetch()
+            if self._is_cacheable(response):
+                await asyncio.to_thread(self._store, cache_key, endpoint, params_json, response)
+        except Exception as e:
+            logger.warning(f"Error revalidating cached {endpoint} response: {e}")
+
+    # ---- 同期API（スクリプト用） ----
+
+    def get_or_fetch_sync(self, endpoint: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        """
+        同期版のget_or_fetch
+        スクリプトは短命でバックグラウンド再取得を待てないため、stale時はその場で再取得し、
+        再取得に失敗した場合のみ古い応答を返す
+        """
+        endpoint = cache_endpoint(endpoint, params)
+        cache_key, params_json = make_cache_key(endpoint, params)
+        response, state = self._lookup(endpoint, cache_key)
+
+        if state == "fresh":
+            self._count(endpoint, "hits")
+            return response
+
+        try:
+            fresh_response = fetch()
+        except Exception:
+            if state == "stale":
+                logger.warning(f"Serving stale {endpoint} response after fetch error")
+                self._count(endpoint, "stale_hits")
+                return response
+            raise
+
+        self._count(endpoint, "misses")
+        if self._is_cacheable(fresh_response):
+            self._store(cache_key, endpoint, params_json, fresh_response)
+        return fresh_response
+
+    # ---- 統計・管理 ----
+
+    def get_stats(self) -> Dict[str, Any]:
+        """エンドポイント別のヒット数・節約額とキャッシュ件数"""
+        with self._lock:
+            stats_rows = self.conn.execute(
+                "SELECT endpoint, hits, stale_hits, misses, saved_yen FROM stats ORDER BY endpoint"
+            ).fetchall()
+            entry_rows = self.conn.execute(
+                "SELECT endpoint, COUNT(*) FROM responses GROUP BY endpoint"
+            ).fetchall()
+
+        entries = dict(entry_rows)
+        endpoints = {}
+        for endpoint, hits, stale_hits, misses, saved_yen in stats_rows:
+            total = hits + stale_hits + misses
+            endpoints[endpoint] = {
+                "hits": hits,
+                "stale_hits": stale_hits,
+                "misses": misses,
+                "hit_rate": round((hits + stale_hits) / total, 3) if total else 0.0,
+                "saved_yen": round(saved_yen, 1),
+                "entries": entries.get(endpoint, 0)
+            }
+
+        return {
+            "endpoints": endpoints,
+            "total_saved_yen": round(sum(e["saved_yen"] for e in endpoints.values()), 1),
+            "total_entries": sum(entries.values())
+        }
+
+    def purge_expired(self) -> int:
+        """stale期間も過ぎた応答を削除"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for endpoint, policy in CACHE_POLICIES.items():
+                cursor = self.conn.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND fetched_at < ?",
+                    (endpoint, now - policy.ttl - policy.stale_ttl)
+                )
+                removed += cursor.rowcount
+            self.conn.commit()
+        return removed
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+
+class CachedGoogleMapsClient:
+    """
+    googlemaps.Clientをキャッシュ経由で呼び出すプロキシ（スクリプト用）
+    places_nearby / places / place / geocode をキャッシュし、それ以外はそのまま委譲する
+    """
+
+    def __init__(self, client: Any, cache: Optional[PlacesCache] = None):
+        self._client = client
+        self._cache = cache or places_cache
+
+    def places_nearby(self, **kwargs) -> Dict:
+        return self._cache.get_or_fetch_sync(
+            "nearbysearch", kwargs, lambda: self._client.places_nearby(**kwargs)
+        )
+
+    def places(self, query: str = None, **kwargs) -> Dict:
+        return self._cache.get_or_fetch_sync(
+            "textsearch", {"query": query, **kwargs}, lambda: self._client.places(query, **kwargs)
+        )
+
+    def place(self, place_id: str, **kwargs) -> Dict:
+        return self._cache.get_or_fetch_sync(
+            "details", {"place_id": place_id, **kwargs}, lambda: self._client.place(place_id, **kwargs)
+        )
+
+    def geocode(self, address: str = None, **kwargs) -> Any:
+        return self._cache.get_or_fetch_sync(
+            "geocode", {"address": address, **kwargs}, lambda: self._client.geocode(address, **kwargs)
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+# シングルトンインスタンス
+places_cache = PlacesCache()
@@ -0,0 +1,198 @@
+"""
+Google Places API 非同期クライアント
+httpx.AsyncClientのコネクションプールを使い、施設タイプ別の検索や施設詳細の取得を
+セマフォで同時実行数を制限しながら並行して行う
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.services.places_cache import PlacesCache, places_cache
+from app.services.rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Places API（旧API）のエンドポイント
+NEARBY_SEARCH_PATH = "/maps/api/place/nearbysearch/json"
+TEXT_SEARCH_PATH = "/maps/api/place/textsearch/json"
+DETAILS_PATH = "/maps/api/place/details/json"
+
+# キャッシュ上のエンドポイント名
+CACHE_ENDPOINTS = {
+    NEARBY_SEARCH_PATH: "nearbysearch",
+    TEXT_SEARCH_PATH: "textsearch",
+    DETAILS_PATH: "details",
+}
+
+# 正常応答として扱うステータス
+OK_STATUSES = {"OK", "ZERO_RESULTS"}
+
+
+class PlacesAPIError(Exception):
+    """Places APIがエラーステータスを返した場合の例外"""
+
+    def __init__(self, status: str, message: str = ""):
+        self.status = status
+        super().__init__(f"Places API error: {status} {message}".strip())
+
+
+class AsyncPlacesClient:
+    """
+    Google Places APIの非同期クライアント
+    - キャッシュにない場合のみ rate_limiter（google_places）のトークンを取得してから送信する
+    - base_url を差し替えることでローカルのスタブサーバーに対して動作確認できる
+    - transport にhttpx.MockTransportなどを渡すことも可能
+    - 応答は既定で永続キャッシュ（places_cache）を経由する
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[PlacesCache] = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url or settings.GOOGLE_PLACES_API_URL
+        self.max_concurrency = max_concurrency or settings.GOOGLE_PLACES_MAX_CONCURRENCY
+        self.timeout = timeout
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if cache is None and settings.PLACES_CACHE_ENABLED:
+            cache = places_cache
+        self.cache = cache
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers={"User-Agent": "TokyoWellbeingMap/1.0"},
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    async def close(self):
+        if self._client:
+            await self._client.aclose()
+
+    async def _request(self, path: str, params: Dict[str, Any]) -> Dict:
+        """キャッシュを参照し、なければAPIリクエストを実行"""
+        query = {key: value for key, value in params.items() if value is not None}
+        if self.cache is None:
+            return await self._fetch(path, query)
+        return await self.cache.get_or_fetch(
+            CACHE_ENDPOINTS[path], query, lambda: self._fetch(path, query)
+        )
+
+    async def _fetch(self, path: str, params: Dict[str, Any]) -> Dict:
+        """APIリクエストの実行（同時実行数はセマフォで制限）"""
+        query = dict(params)
+        query["key"] = self.api_key
+
+        await rate_limiter.acquire("google_places")
+        async with self._semaphore:
+            response = await self.client.get(path, params=query)
+        response.raise_for_status()
+        data = response.json()
+
+        status = data.get("status", "OK")
+        if status not in OK_STATUSES:
+            raise PlacesAPIError(status, data.get("error_message", ""))
+        return data
+
+    @staticmethod
+    def _format_location(location: Optional[Tuple[float, float]]) -> Optional[str]:
+        if location is None:
+            return None
+        lat, lng = location
+        return f"{lat},{lng}"
+
+    async def places_nearby(
+        self,
+        location: Tuple[float, float],
+        radius: int,
+        type: Optional[str] = None,
+        keyword: Optional[str] = None,
+        language: str = "ja"
+    ) -> Dict:
+        """Nearby Search（googlemaps.Client.places_nearby相当）"""
+        return await self._request(NEARBY_SEARCH_PATH, {
+            "location": self._format_location(location),
+            "radius": radius,
+            "type": type,
+            "keyword": keyword,
+            "language": language
+        })
+
+    async def places(
+        self,
+        query: str,
+        location: Optional[Tuple[float, float]] = None,
+        radius: Optional[int] = None,
+        type: Optional[str] = None,
+        language: str = "ja"
+    ) -> Dict:
+        """Text Search（googlemaps.Client.places相当）"""
+        return await self._request(TEXT_SEARCH_PATH, {
+            "query": query,
+            "location": self._format_location(location),
+            "radius": radius,
+            "type": type,
+            "language": language
+        })
+
+    async def place(self, place_id: str, fields: Optional[Sequence[str]] = None, language: str = "ja") -> Dict:
+        """Place Details（googlemaps.Client.place相当）"""
+        return await self._request(DETAILS_PATH, {
+            "place_id": place_id,
+            "fields": ",".join(fields) if fields else None,
+            "language": language
+        })
+
+    async def places_nearby_many(
+        self,
+        location: Tuple[float, float],
+        radius: int,
+        place_types: Iterable[str],
+        keywords: Optional[Dict[str, str]] = None,
+        language: str = "ja"
+    ) -> Dict[str, Any]:
+        """
+        複数の施設タイプを並行して検索
+        戻り値は {施設タイプ: 応答 or 例外}（一部の失敗で全体を失敗させない）
+        """
+        place_types = list(place_types)
+        keywords = keywords or {}
+        results = await asyncio.gather(
+            *[
+                self.places_nearby(location, radius, type=place_type,
+                                   keyword=keywords.get(place_type), language=language)
+                for place_type in place_types
+            ],
+            return_exceptions=True
+        )
+        return dict(zip(place_types, results))
+
+    async def place_details_many(
+        self,
+        place_ids: Iterable[str],
+        fields: Optional[Sequence[str]] = None,
+        language: str = "ja"
+    ) -> List[Any]:
+        """複数施設の詳細を並行して取得（入力順、失敗した要素は例外オブジェクト）"""
+        return await asyncio.gather(
+            *[self.place(place_id, fields=fields, language=language) for place_id in place_ids],
+            return_exceptions=True
+        )
@@ -0,0 +1,221 @@
+"""
+検索クエリの実行計画診断とインデックス推奨サービス
+/search/ の実トラフィックからクエリの形（述語の形状）を記録し、
+explain() でCOLLSCANを検出して複合インデックスを提案する
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import IndexModel
+
+from app.models_mongo.area import Area
+
+logger = logging.getLogger(__name__)
+
+# 範囲検索として扱う演算子
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+
+# 等価検索として扱う演算子
+EQUALITY_OPERATORS = {"$eq", "$in"}
+
+# 検索APIのフィルタ項目に対応する推奨インデックス（init_beanie時の作成オプション用）
+RECOMMENDED_AREA_INDEXES: List[List[Tuple[str, int]]] = [
+    [("housing_data.rent_2ldk", 1)],
+    [("childcare_data.waiting_children", 1), ("housing_data.rent_2ldk", 1)],
+    [("school_data.elementary_schools", 1)],
+    [("park_data.total_parks", 1)],
+]
+
+
+def _normalize_direction(direction: Any) -> Any:
+    """インデックスの方向（1.0 などの数値は int に、2dsphere・text・hashed などの文字列はそのまま）"""
+    if isinstance(direction, str):
+        return direction
+    return int(direction)
+
+
+class QueryAdvisor:
+    """
+    クエリ形状の記録・実行計画の診断・インデックス推奨
+    記録はプロセス内のメモリに保持する（ワーカーごと）
+    """
+
+    def __init__(self, max_shapes: int = 200):
+        self.max_shapes = max_shapes
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, query_filter: Dict, sort: Optional[str] = None):
+        """実行されたクエリの形状を記録"""
+        shape = self.shape_of(query_filter)
+        key = json.dumps({"filter": shape, "sort": sort}, sort_keys=True, ensure_ascii=False)
+
+        entry = self._shapes.get(key)
+        if entry is None:
+            if len(self._shapes) >= self.max_shapes:
+                # 最も実行回数の少ない形状を破棄
+                least_used = min(self._shapes, key=lambda k: self._shapes[k]["count"])
+                del self._shapes[least_used]
+            entry = self._shapes[key] = {
+                "shape": shape,
+                "sort": sort,
+                "count": 0,
+                "example_filter": query_filter,
+                "first_seen": datetime.utcnow()
+            }
+
+        entry["count"] += 1
+        entry["example_filter"] = query_filter
+        entry["last_seen"] = datetime.utcnow()
+
+    def shape_of(self, query_filter: Any) -> Any:
+        """フィルタの値を型名に置き換えた形状を取得"""
+        if isinstance(query_filter, dict):
+            return {key: self.shape_of(value) for key, value in query_filter.items()}
+        if isinstance(query_filter, list):
+            # $andなどの論理演算子の要素はそのまま、$inなどの値リストは1要素に畳む
+            if query_filter and all(isinstance(item, dict) for item in query_filter):
+                return [self.shape_of(item) for item in query_filter]
+            return ["<list>"]
+        if isinstance(query_filter, str) and query_filter.startswith("$"):
+            return query_filter  # $exprのフィールド参照
+        if isinstance(query_filter, bool):
+            return "<bool>"
+        if isinstance(query_filter, (int, float)):
+            return "<number>"
+        return f"<{type(query_filter).__name__}>"
+
+    def suggest_index(self, query_filter: Dict, sort: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        ESRルール（等価 → ソート → 範囲）に従って複合インデックスを提案
+        $exprで参照されるフィールドはインデックスを利用できないため対象外
+        """
+        equality_fields = []
+        range_fields = []
+
+        for path, condition in self._iter_predicates(query_filter):
+            if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+                operators = set(condition)
+                if operators & EQUALITY_OPERATORS:
+                    equality_fields.append(path)
+                elif operators & RANGE_OPERATORS:
+                    range_fields.append(path)
+            else:
+                equality_fields.append(path)
+
+        keys: List[Tuple[str, int]] = []
+        for path in equality_fields:
+            keys.append((path, 1))
+        if sort:
+            sort_field = sort.lstrip("-")
+            keys.append((sort_field, -1 if sort.startswith("-") else 1))
+        for path in range_fields:
+            keys.append((path, 1))
+
+        # 重複フィールドを除外（先に出現したものを優先）
+        unique_keys = []
+        seen = set()
+        for path, direction in keys:
+            if path not in seen:
+                seen.add(path)
+                unique_keys.append((path, direction))
+
+        return unique_keys
+
+    def _iter_predicates(self, query_filter: Dict):
+        for key, condition in query_filter.items():
+            if key == "$and":
+                for sub_query in condition:
+                    yield from self._iter_predicates(sub_query)
+            elif not key.startswith("$"):
+                yield key, condition
+
+    async def analyze(self) -> List[Dict[str, Any]]:
+        """記録済みの各クエリ形状についてexplain()を実行して診断結果を返す"""
+        collection = Area.get_motor_collection()
+        existing_indexes = await self._existing_index_keys()
+
+        report = []
+        for entry in sorted(self._shapes.values(), key=lambda e: e["count"], reverse=True):
+            cursor = collection.find(entry["example_filter"])
+            if entry["sort"]:
+                sort_field = entry["sort"].lstrip("-")
+                cursor = cursor.sort(sort_field, -1 if entry["sort"].startswith("-") else 1)
+
+            try:
+                plan = await cursor.explain()
+            except Exception as e:
+                logger.error(f"Error explaining query shape: {e}")
+                report.append({
+                    "shape": entry["shape"],
+                    "sort": entry["sort"],
+                    "count": entry["count"],
+                    "error": str(e)
+                })
+                continue
+
+            winning_plan = plan.get("queryPlanner", {}).get("winningPlan", {})
+            stages = self._collect_stages(winning_plan)
+            execution_stats = plan.get("executionStats", {})
+
+            suggested = self.suggest_index(entry["example_filter"], entry["sort"])
+            report.append({
+                "shape": entry["shape"],
+                "sort": entry["sort"],
+                "count": entry["count"],
+                "last_seen": entry["last_seen"].isoformat(),
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages,
+                "docs_examined": execution_stats.get("totalDocsExamined"),
+                "keys_examined": execution_stats.get("totalKeysExamined"),
+                "returned": execution_stats.get("nReturned"),
+                "suggested_index": suggested if suggested and tuple(suggested) not in existing_indexes else None
+            })
+
+        return report
+
+    def _collect_stages(self, plan: Any) -> List[str]:
+        """実行計画ツリーからステージ名を収集（クラシック/SBE両形式に対応）"""
+        stages = []
+        if isinstance(plan, dict):
+            if "stage" in plan:
+                stages.append(plan["stage"])
+            for key in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+                if key in plan:
+                    stages.extend(self._collect_stages(plan[key]))
+            for child in plan.get("inputStages", []):
+                stages.extend(self._collect_stages(child))
+        return stages
+
+    async def _existing_index_keys(self) -> set:
+        index_information = await Area.get_motor_collection().index_information()
+        return {
+            tuple((field, _normalize_direction(direction)) for field, direction in info["key"])
+            for info in index_information.values()
+        }
+
+    def recommended_indexes(self) -> List[List[Tuple[str, int]]]:
+        """静的な推奨インデックスと、記録済みのクエリ形状からの提案を合わせて返す"""
+        indexes = [list(keys) for keys in RECOMMENDED_AREA_INDEXES]
+        for entry in self._shapes.values():
+            suggested = self.suggest_index(entry["example_filter"], entry["sort"])
+            if suggested and suggested not in indexes:
+                indexes.append(suggested)
+        return indexes
+
+    async def create_recommended_indexes(self) -> List[str]:
+        """推奨インデックスを作成（既存と同一の定義は何もしない）"""
+        indexes = self.recommended_indexes()
+        if not indexes:
+            return []
+
+        names = await Area.get_motor_collection().create_indexes(
+            [IndexModel(keys) for keys in indexes]
+        )
+        logger.info(f"Created recommended indexes: {', '.join(names)}")
+        return names
+
+
+# シングルトンインスタンス
+query_advisor = QueryAdvisor()
@@ -0,0 +1,293 @@
+"""
+鉄道ネットワークによる所要時間の計算
+(駅, 路線) をノードとするグラフを作り、全ノード間の最短所要時間を
+Floyd–Warshall法（NumPyで行単位に一括更新）で事前計算する
+- 路線内の辺：路線ごとの駅を最小全域木で結び（環状線は角度順に一周）、距離と表定速度から所要時間を算出
+- 乗換の辺：同じ駅の路線間に乗換時間、近接する駅の間に徒歩 + 乗換時間
+計算後は駅 × 駅の所要時間表だけを保持し、問い合わせは表の参照のみで答える
+"""
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.data.rail_network_data import LOOP_LINES, RAIL_STATIONS
+
+logger = logging.getLogger(__name__)
+
+# 1度あたりの距離（km、23区の中心付近）
+KM_PER_DEG_LAT = 110.57
+KM_PER_DEG_LNG = 111.32 * math.cos(math.radians(35.68))
+
+# 線路の曲がりを考慮した距離の補正係数
+ROUTE_FACTOR = 1.25
+
+# 表定速度（km/h、停車時間を含む）
+DEFAULT_SPEED_KMH = 33.0
+LINE_SPEED_KMH = {
+    "JR東海道線": 55.0,
+    "JR宇都宮線": 50.0,
+    "JR高崎線": 50.0,
+    "JR東北本線": 50.0,
+    "JR湘南新宿ライン": 50.0,
+    "つくばエクスプレス": 55.0,
+    "北総線": 50.0,
+    "JR常磐線": 45.0,
+    "JR京葉線": 45.0,
+    "JR埼京線": 45.0,
+    "東京モノレール": 45.0,
+    "JR中央線": 45.0,
+    "りんかい線": 40.0,
+    "京急本線": 40.0,
+    "京急空港線": 40.0,
+    "日暮里・舎人ライナー": 27.0,
+    "ゆりかもめ": 25.0,
+    "東急世田谷線": 15.0,
+    "都電荒川線": 13.0,
+}
+
+# 駅間の停車・発車の時間（分）
+STOP_MINUTES = 0.5
+
+# 乗車前の平均待ち時間と、路線間の乗換時間（分）
+BOARDING_WAIT_MINUTES = 3.0
+TRANSFER_MINUTES = 5.0
+
+# 徒歩で乗り換えられる駅間の距離（km）と徒歩の速度（km/h）
+WALK_TRANSFER_KM = 0.5
+WALK_SPEED_KMH = 4.8
+
+# 駅までのアクセス（徒歩の上限を超えたらバス）
+WALK_ACCESS_MAX_KM = 1.2
+BUS_SPEED_KMH = 12.0
+BUS_WAIT_MINUTES = 5.0
+
+# 出発地点から候補とする最寄り駅の数
+ACCESS_CANDIDATES = 4
+
+
+def _to_km(lat, lng) -> Tuple[np.ndarray, np.ndarray]:
+    return np.asarray(lng) * KM_PER_DEG_LNG, np.asarray(lat) * KM_PER_DEG_LAT
+
+
+def access_minutes(distance_km):
+    """最寄り駅までのアクセス時間（徒歩、遠ければバス）"""
+    distance_km = np.asarray(distance_km) * ROUTE_FACTOR
+    walk = distance_km / WALK_SPEED_KMH * 60
+    bus = BUS_WAIT_MINUTES + distance_km / BUS_SPEED_KMH * 60
+    return np.where(distance_km <= WALK_ACCESS_MAX_KM, walk, np.minimum(walk, bus))
+
+
+def _line_edges(points: np.ndarray, loop: bool) -> List[Tuple[int, int]]:
+    """
+    路線上の駅（座標）を結ぶ辺
+    駅の順序のデータがないため、最小全域木で近い駅どうしを結ぶ（環状線は重心まわりの角度順）
+    """
+    n = len(points)
+    if n < 2:
+        return []
+    if loop:
+        center = points.mean(axis=0)
+        order = np.argsort(np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0]))
+        return [(int(order[i]), int(order[(i + 1) % n])) for i in range(n)]
+
+    # Prim法
+    distance = np.sqrt(((points[:, np.newaxis, :] - points[np.newaxis, :, :]) ** 2).sum(axis=-1))
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = distance[0].copy()
+    parent = np.zeros(n, dtype=int)
+    edges = []
+    for _ in range(n - 1):
+        candidates = np.where(in_tree, np.inf, best)
+        node = int(np.argmin(candidates))
+        edges.append((int(parent[node]), node))
+        in_tree[node] = True
+        closer = distance[node] < best
+        best = np.where(closer, distance[node], best)
+        parent = np.where(closer, node, parent)
+    return edges
+
+
+class RailNetwork:
+    """駅 × 駅の最短所要時間表"""
+
+    def __init__(self, stations: Optional[Dict[str, Tuple[float, float, List[str]]]] = None):
+        self._source = stations if stations is not None else RAIL_STATIONS
+        self.stations: List[str] = sorted(self._source)
+        self._station_index = {name: i for i, name in enumerate(self.stations)}
+        lat = np.array([self._source[name][0] for name in self.stations])
+        lng = np.array([self._source[name][1] for name in self.stations])
+        self.station_lat = lat
+        self.station_lng = lng
+        self._x, self._y = _to_km(lat, lng)
+
+        self._minutes: Optional[np.ndarray] = None
+        self.node_count = 0
+        self.edge_count = 0
+        self._lock = threading.Lock()
+
+    def _ensure_built(self) -> np.ndarray:
+        if self._minutes is None:
+            with self._lock:
+                if self._minutes is None:
+                    self._minutes = self._build()
+        return self._minutes
+
+    def _build(self) -> np.ndarray:
+        # ノードは駅名順に並べ、同じ駅のノードが連続するようにする
+        nodes: List[Tuple[int, str]] = [
+            (index, line)
+            for index, name in enumerate(self.stations)
+            for line in self._source[name][2]
+        ]
+        node_index = {node: i for i, node in enumerate(nodes)}
+        n = len(nodes)
+        graph = np.full((n, n), np.inf, dtype=np.float64)
+        np.fill_diagonal(graph, 0.0)
+
+        def connect(a: int, b: int, minutes: float):
+            if minutes < graph[a, b]:
+                graph[a, b] = graph[b, a] = minutes
+
+        # 路線内の辺
+        lines: Dict[str, List[int]] = {}
+        for station, line in nodes:
+            lines.setdefault(line, []).append(station)
+        for line, members in lines.items():
+            points = np.column_stack([self._x[members], self._y[members]])
+            speed = LINE_SPEED_KMH.get(line, DEFAULT_SPEED_KMH)
+            for i, j in _line_edges(points, line in LOOP_LINES):
+                distance = float(np.hypot(*(points[i] - points[j]))) * ROUTE_FACTOR
+                connect(
+                    node_index[(members[i], line)],
+                    node_index[(members[j], line)],
+                    distance / speed * 60 + STOP_MINUTES
+                )
+
+        # 同じ駅の路線間の乗換
+        station_of_node = np.array([station for station, _ in nodes])
+        same_station = station_of_node[:, np.newaxis] == station_of_node[np.newaxis, :]
+        graph = np.where(same_station & ~np.eye(n, dtype=bool), np.minimum(graph, TRANSFER_MINUTES), graph)
+
+        # 近接する駅間の徒歩乗換
+        dx = self._x[station_of_node][:, np.newaxis] - self._x[station_of_node][np.newaxis, :]
+        dy = self._y[station_of_node][:, np.newaxis] - self._y[station_of_node][np.newaxis, :]
+        distance = np.hypot(dx, dy)
+        walkable = ~same_station & (distance <= WALK_TRANSFER_KM)
+        walk_minutes = distance * ROUTE_FACTOR / WALK_SPEED_KMH * 60 + TRANSFER_MINUTES
+        graph = np.where(walkable, np.minimum(graph, walk_minutes), graph)
+
+        self.node_count = n
+        self.edge_count = int((np.isfinite(graph).sum() - n) // 2)
+
+        # Floyd–Warshall法（経由ノードkごとに全ペアを一括更新）
+        for k in range(n):
+            np.minimum(graph, graph[:, k, np.newaxis] + graph[np.newaxis, k, :], out=graph)
+
+        # ノード間 -> 駅間（同じ駅のノードの最小値）
+        starts = np.flatnonzero(np.r_[True, station_of_node[1:] != station_of_node[:-1]])
+        minutes = np.minimum.reduceat(np.minimum.reduceat(graph, starts, axis=0), starts, axis=1)
+        minutes = minutes + BOARDING_WAIT_MINUTES
+        np.fill_diagonal(minutes, 0.0)
+
+        unreachable = int((~np.isfinite(minutes)).sum())
+        logger.info(
+            f"Rail network built: {len(self.stations)} stations, {n} nodes, {self.edge_count} edges"
+            f" ({unreachable} unreachable pairs)"
+        )
+        minutes = minutes.astype(np.float32)
+        minutes.setflags(write=False)
+        return minutes
+
+    def resolve_station(self, name: str) -> Optional[str]:
+        """駅名を正規化して登録済みの駅名を返す（「〜駅」の表記も可）"""
+        if not name:
+            return None
+        name = name.strip()
+        if name in self._station_index:
+            return name
+        if name.endswith("駅") and name[:-1] in self._station_index:
+            return name[:-1]
+        return None
+
+    def station_minutes(self, origin: str, destination: str) -> Optional[float]:
+        """駅間の最短所要時間（分）"""
+        origin = self.resolve_station(origin)
+        destination = self.resolve_station(destination)
+        if origin is None or destination is None:
+            return None
+        value = self._ensure_built()[self._station_index[origin], self._station_index[destination]]
+        return float(value) if np.isfinite(value) else None
+
+    def minutes_to(self, destination: str) -> Optional[np.ndarray]:
+        """全駅から目的駅までの所要時間（駅の並びは self.stations）"""
+        destination = self.resolve_station(destination)
+        if destination is None:
+            return None
+        return self._ensure_built()[:, self._station_index[destination]]
+
+    def minutes_to_many(self, destinations: List[str]) -> np.ndarray:
+        """全駅から複数の目的駅までの所要時間 (駅, 目的駅)（目的駅は解決済みの駅名）"""
+        columns = [self._station_index[name] for name in destinations]
+        return self._ensure_built()[:, columns]
+
+    def station_position(self, name: str) -> Optional[int]:
+        """駅名から駅の並び（self.stations）の位置を取得"""
+        name = self.resolve_station(name)
+        return None if name is None else self._station_index[name]
+
+    def nearest_station_indices(self, lat, lng, k: int = ACCESS_CANDIDATES) -> Tuple[np.ndarray, np.ndarray]:
+        """複数の地点それぞれから近い k 駅の位置と距離（km）を一括で取得 (地点, k)"""
+        x, y = _to_km(np.atleast_1d(lat), np.atleast_1d(lng))
+        distance = np.hypot(self._x[np.newaxis, :] - x[:, np.newaxis], self._y[np.newaxis, :] - y[:, np.newaxis])
+        k = min(k, len(self.stations))
+        order = np.argsort(distance, axis=1)[:, :k]
+        return order, np.take_along_axis(distance, order, axis=1)
+
+    def nearest_stations(self, lat: float, lng: float, k: int = ACCESS_CANDIDATES) -> List[Tuple[str, float]]:
+        """地点から近い駅と距離（km）"""
+        x, y = _to_km(lat, lng)
+        distance = np.hypot(self._x - x, self._y - y)
+        order = np.argsort(distance)[:k]
+        return [(self.stations[i], float(distance[i])) for i in order]
+
+    def point_to_station(self, lat: float, lng: float, destination: str,
+                         k: int = ACCESS_CANDIDATES) -> Optional[Dict]:
+        """
+        地点から目的駅までの所要時間
+        最寄りの k 駅それぞれについて アクセス時間 + 乗車時間 を計算し、最短のものを返す
+        """
+        to_destination = self.minutes_to(destination)
+        if to_destination is None:
+            return None
+
+        candidates = self.nearest_stations(lat, lng, k)
+        indices = np.array([self._station_index[name] for name, _ in candidates])
+        access = access_minutes([distance for _, distance in candidates])
+        total = access + to_destination[indices]
+        best = int(np.argmin(total))
+        if not np.isfinite(total[best]):
+            return None
+
+        return {
+            "origin_station": candidates[best][0],
+            "destination_station": self.resolve_station(destination),
+            "access_minutes": round(float(access[best]), 1),
+            "ride_minutes": round(float(to_destination[indices[best]]), 1),
+            "total_minutes": round(float(total[best]), 1)
+        }
+
+    def get_stats(self) -> Dict:
+        self._ensure_built()
+        return {
+            "stations": len(self.stations),
+            "nodes": self.node_count,
+            "edges": self.edge_count
+        }
+
+
+# シングルトンインスタンス
+rail_network = RailNetwork()
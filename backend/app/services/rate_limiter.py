@@ -0,0 +1,363 @@
+"""
+外部API呼び出しのレート制限
+- 上流（Google Places / 東京都オープンデータCKAN）ごとのトークンバケット
+- 1日あたりのリクエスト数の上限（課金予算）
+  使用量はMongoDBのカウンタ（$inc）で共有し、gunicornの全ワーカー・再起動をまたいで適用する
+- 優先度クラス：対話的なリクエスト（interactive）をバッチ処理（batch）より先に通す
+非同期クライアントは acquire()、requestsを使う同期スクリプトは acquire_sync() を使う
+（どちらも同じ優先度付き待ち行列に並ぶ）
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models_mongo.api_quota_usage import ApiQuotaUsage
+
+logger = logging.getLogger(__name__)
+
+JST = timezone(timedelta(hours=9))
+
+# 優先度クラス（値が小さいほど優先）
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITY_RANKS = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 1}
+
+# 現在の処理の優先度（バックグラウンド処理では batch_priority() で切り替える）
+current_priority: ContextVar[str] = ContextVar("current_priority", default=PRIORITY_INTERACTIVE)
+
+
+class QuotaExceededError(Exception):
+    """1日あたりの上限に達した場合の例外"""
+
+    def __init__(self, upstream: str, quota: int):
+        self.upstream = upstream
+        self.quota = quota
+        super().__init__(f"Daily quota exceeded for {upstream} ({quota} requests)")
+
+
+@dataclass(frozen=True)
+class UpstreamLimit:
+    """上流ごとの制限"""
+    rate: float                         # 1秒あたりに補充されるトークン数
+    burst: int                          # バケットの容量
+    daily_quota: Optional[int] = None   # 1日あたりの上限（Noneは無制限）
+    batch_quota_ratio: float = 1.0      # バッチ処理が使える上限の割合（残りは対話的なリクエスト用）
+
+
+def _default_limits() -> Dict[str, UpstreamLimit]:
+    return {
+        "google_places": UpstreamLimit(
+            rate=settings.GOOGLE_PLACES_RATE_PER_SECOND,
+            burst=settings.GOOGLE_PLACES_MAX_CONCURRENCY,
+            daily_quota=settings.GOOGLE_PLACES_DAILY_QUOTA,
+            batch_quota_ratio=0.8
+        ),
+        "tokyo_opendata": UpstreamLimit(
+            rate=settings.TOKYO_OPENDATA_RATE_PER_SECOND,
+            burst=5
+        ),
+    }
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, cost: float = 1.0) -> float:
+        """トークンを取得できれば0、できなければ取得可能になるまでの秒数を返す"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= cost:
+                self._tokens -= cost
+                return 0.0
+            return (cost - self._tokens) / self.rate
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class MemoryQuotaStore:
+    """プロセス内の日次使用量（MongoDBが使えない場合の代替）"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._usage: Dict[tuple, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, upstream: str, day: str) -> Dict[str, int]:
+        # 前日以前のカウンタは不要なので、日付が変わったら捨てる
+        for key in [key for key in self._usage if key[0] == upstream and key[1] != day]:
+            del self._usage[key]
+        return self._usage.setdefault((upstream, day), {"used": 0, "rejected": 0})
+
+    async def reserve(self, upstream: str, day: str, cost: int, allowed: Optional[int]) -> bool:
+        with self._lock:
+            entry = self._entry(upstream, day)
+            if allowed is not None and entry["used"] + cost > allowed:
+                entry["rejected"] += 1
+                return False
+            entry["used"] += cost
+            return True
+
+    async def release(self, upstream: str, day: str, cost: int):
+        with self._lock:
+            entry = self._entry(upstream, day)
+            entry["used"] = max(0, entry["used"] - cost)
+
+    async def usage(self, upstream: str, day: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._entry(upstream, day))
+
+
+class MongoQuotaStore:
+    """MongoDBによる日次使用量（全ワーカーで共有）"""
+
+    name = "mongo"
+
+    @property
+    def collection(self):
+        return ApiQuotaUsage.get_motor_collection()
+
+    async def reserve(self, upstream: str, day: str, cost: int, allowed: Optional[int]) -> bool:
+        """上限を超えない場合だけ使用量を加算（条件付きの upsert で1回の操作にする）"""
+        query = {"upstream": upstream, "day": day}
+        if allowed is not None:
+            if cost > allowed:
+                return False
+            query["used"] = {"$lte": allowed - cost}
+        update = {"$inc": {"used": cost}, "$set": {"updated_at": datetime.utcnow()}}
+        try:
+            await self.collection.find_one_and_update(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            # カウンタが既にある（同時に作成された、または上限に達して条件に合わない）場合は更新だけ試す
+            if await self.collection.find_one_and_update(query, update) is not None:
+                return True
+        await self.collection.update_one({"upstream": upstream, "day": day}, {"$inc": {"rejected": 1}})
+        return False
+
+    async def release(self, upstream: str, day: str, cost: int):
+        await self.collection.update_one(
+            {"upstream": upstream, "day": day, "used": {"$gte": cost}},
+            {"$inc": {"used": -cost}}
+        )
+
+    async def usage(self, upstream: str, day: str) -> Dict[str, int]:
+        doc = await self.collection.find_one({"upstream": upstream, "day": day})
+        return {"used": doc.get("used", 0), "rejected": doc.get("rejected", 0)} if doc else {"used": 0, "rejected": 0}
+
+
+class UpstreamLimiter:
+    """1つの上流に対するトークンバケット・日次上限・優先度付き待ち行列"""
+
+    def __init__(self, name: str, limit: UpstreamLimit, quota_store: Optional[Any] = None):
+        self.name = name
+        self.limit = limit
+        self.bucket = TokenBucket(limit.rate, limit.burst)
+        self.quota_store = quota_store or MongoQuotaStore()
+        self._fallback_store = MemoryQuotaStore()
+        self._lock = threading.Lock()
+        self._waited = 0
+        # 待機者 [優先度, 到着順, 起こす関数]（非同期・同期の待機者が同じ待ち行列に並ぶ）
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def _today() -> str:
+        # Googleの日次上限は太平洋時間で切り替わるが、運用上わかりやすい日本時間で区切る
+        return datetime.now(JST).strftime("%Y-%m-%d")
+
+    def _allowed(self, priority: str) -> Optional[int]:
+        quota = self.limit.daily_quota
+        if quota is None or priority != PRIORITY_BATCH:
+            return quota
+        return int(quota * self.limit.batch_quota_ratio)
+
+    async def _call_store(self, method: str, *args):
+        """共有カウンタを呼び出し、使えない場合（未初期化・障害）はプロセス内のカウンタを使う"""
+        try:
+            return await getattr(self.quota_store, method)(*args)
+        except Exception as e:
+            logger.warning(f"Quota store unavailable for {self.name}, using in-process counter: {e}")
+            return await getattr(self._fallback_store, method)(*args)
+
+    async def _reserve_quota(self, priority: str, cost: int):
+        """日次上限の枠を確保（超過時はQuotaExceededError）"""
+        if self.limit.daily_quota is None:
+            return
+        allowed = self._allowed(priority)
+        if not await self._call_store("reserve", self.name, self._today(), cost, allowed):
+            raise QuotaExceededError(self.name, allowed)
+
+    async def _release_quota(self, cost: int):
+        if self.limit.daily_quota is None:
+            return
+        await self._call_store("release", self.name, self._today(), cost)
+
+    # ---- 優先度付き待ち行列 ----
+
+    def _enqueue(self, priority: str, wake: Callable[[], Any]) -> list:
+        waiter = [PRIORITY_RANKS.get(priority, 1), next(self._sequence), wake]
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def _is_head(self, waiter: list) -> bool:
+        with self._lock:
+            return bool(self._waiters) and self._waiters[0] is waiter
+
+    def _dequeue(self, waiter: list):
+        """待ち行列から外し、次の先頭の待機者を起こす"""
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            head = self._waiters[0] if self._waiters else None
+        if head is not None:
+            head[2]()
+
+    async def acquire(self, priority: Optional[str] = None, cost: int = 1):
+        """
+        トークンを取得するまで待機（非同期）
+        待ち行列は優先度順、同じ優先度では到着順に処理する
+        """
+        priority = priority or current_priority.get()
+        await self._reserve_quota(priority, cost)
+
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = self._enqueue(priority, lambda: loop.call_soon_threadsafe(event.set))
+        waited = False
+        try:
+            while True:
+                if self._is_head(waiter):
+                    delay = self.bucket.try_take(cost)
+                    if delay == 0:
+                        break
+                    waited = True
+                    await asyncio.sleep(delay)
+                else:
+                    # 先頭になるまで待機（先頭の待機者がトークンを取得したら起こされる）
+                    waited = True
+                    event.clear()
+                    if not self._is_head(waiter):
+                        await event.wait()
+        except BaseException:
+            self._dequeue(waiter)
+            await self._release_quota(cost)
+            raise
+
+        if waited:
+            self._waited += 1
+        self._dequeue(waiter)
+
+    def acquire_sync(self, priority: Optional[str] = None, cost: int = 1):
+        """
+        トークンを取得するまで待機（同期・スクリプト用、イベントループ内からは呼ばない）
+        日次上限は共有カウンタ（非同期）で管理するため、上限のある上流では使えない
+        """
+        if self.limit.daily_quota is not None:
+            raise RuntimeError(f"{self.name} has a daily quota; use acquire() instead")
+        priority = priority or current_priority.get()
+
+        event = threading.Event()
+        waiter = self._enqueue(priority, event.set)
+        waited = False
+        try:
+            while True:
+                if self._is_head(waiter):
+                    delay = self.bucket.try_take(cost)
+                    if delay == 0:
+                        break
+                    waited = True
+                    time.sleep(delay)
+                else:
+                    waited = True
+                    event.clear()
+                    if not self._is_head(waiter):
+                        event.wait()
+        finally:
+            self._dequeue(waiter)
+
+        if waited:
+            self._waited += 1
+
+    async def get_stats(self) -> Dict[str, Any]:
+        quota = self.limit.daily_quota
+        day = self._today()
+        usage = await self._call_store("usage", self.name, day) if quota is not None else {"used": 0, "rejected": 0}
+        return {
+            "rate_per_second": self.limit.rate,
+            "burst": self.limit.burst,
+            "available_tokens": round(self.bucket.tokens, 2),
+            "queued": len(self._waiters),
+            "waited": self._waited,
+            "day": day,
+            "used_today": usage["used"],
+            "daily_quota": quota,
+            "remaining_today": None if quota is None else max(0, quota - usage["used"]),
+            "rejected_today": usage["rejected"]
+        }
+
+
+class RateLimiter:
+    """上流ごとのUpstreamLimiterをまとめる共有コンポーネント"""
+
+    def __init__(self, limits: Optional[Dict[str, UpstreamLimit]] = None, quota_store: Optional[Any] = None):
+        quota_store = quota_store or MongoQuotaStore()
+        self._limiters = {
+            name: UpstreamLimiter(name, limit, quota_store)
+            for name, limit in (limits or _default_limits()).items()
+        }
+
+    def get(self, upstream: str) -> UpstreamLimiter:
+        return self._limiters[upstream]
+
+    async def acquire(self, upstream: str, priority: Optional[str] = None, cost: int = 1):
+        await self._limiters[upstream].acquire(priority, cost)
+
+    def acquire_sync(self, upstream: str, priority: Optional[str] = None, cost: int = 1):
+        self._limiters[upstream].acquire_sync(priority, cost)
+
+    async def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: await limiter.get_stats() for name, limiter in self._limiters.items()}
+
+
+@contextmanager
+def batch_priority():
+    """このブロック内（と作成されるタスク）の外部API呼び出しをバッチ優先度にする"""
+    token = current_priority.set(PRIORITY_BATCH)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+# シングルトンインスタンス
+rate_limiter = RateLimiter()
@@ -0,0 +1,253 @@
+"""
+シミュレーション結果のキャッシュ
+家計・生活利便性シミュレーションはリクエストとエリアデータのバージョンだけで結果が決まるため、
+正規化したリクエスト + データバージョンをキーに結果を再利用する
+- バックエンドは memory（プロセス内のLRU）と mongo（全ワーカーで共有）を設定で切り替える
+- どちらも有効期限（TTL）と件数の上限を持ち、ヒット率などの統計を記録する
+- バックエンドの障害時はキャッシュなしで計算する
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.models_mongo.simulation_cache import SimulationCacheEntry
+from app.services.data_version_service import data_version_service
+
+logger = logging.getLogger(__name__)
+
+# 順序に意味のないリストのフィールド（並べ替えてからキーにする）
+UNORDERED_FIELDS = {"commute_destinations", "children_ages", "important_facilities"}
+
+# mongoバックエンドで件数の上限を確認する間隔（書き込み回数）
+MONGO_TRIM_EVERY = 50
+
+
+def _canonical_value(value: Any) -> Any:
+    # 文字列はそのまま使う（計算側は正規化しないため、表記の違う値は別の結果になりうる）
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        # 600 と 600.0 は同じ計算になる
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {key: _canonical_value(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(item) for item in value]
+    return value
+
+
+def canonicalize_request(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    計算結果が同じになるリクエストが同じキーになるように正規化
+    - 整数値の小数（600.0）を整数に揃える
+    - 値がNoneのキーを除く（通勤先の省略された項目は既定値で計算される）
+    - 通勤先・子供の年齢などの順序に意味のないリストを並べ替え
+    """
+    canonical = {}
+    for name, value in body.items():
+        value = _canonical_value(value)
+        if name in UNORDERED_FIELDS and isinstance(value, list):
+            value = sorted(value, key=lambda item: json.dumps(item, sort_keys=True, ensure_ascii=False))
+        canonical[name] = value
+    return canonical
+
+
+def make_cache_key(namespace: str, body: Dict[str, Any], version_token: str) -> str:
+    payload = json.dumps(
+        {"namespace": namespace, "request": canonicalize_request(body), "version": version_token},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """プロセス内のLRUキャッシュ（ワーカー間では共有しない）"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, namespace: str, value: Dict[str, Any], ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self) -> int:
+        removed = len(self._entries)
+        self._entries.clear()
+        return removed
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class MongoCacheBackend:
+    """MongoDBのコレクションによるキャッシュ（gunicornの全ワーカーで共有）"""
+
+    name = "mongo"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._writes = 0
+
+    @property
+    def collection(self):
+        return SimulationCacheEntry.get_motor_collection()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        # TTLインデックスの削除は遅れることがあるため、期限も条件に含める
+        doc = await self.collection.find_one_and_update(
+            {"key": key, "expires_at": {"$gt": now}},
+            {"$set": {"accessed_at": now}},
+            projection={"_id": 0, "value": 1}
+        )
+        return doc["value"] if doc else None
+
+    async def set(self, key: str, namespace: str, value: Dict[str, Any], ttl: float):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"key": key},
+            {
+                "$set": {
+                    "namespace": namespace,
+                    "value": value,
+                    "expires_at": now + timedelta(seconds=ttl),
+                    "accessed_at": now
+                },
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+        self._writes += 1
+        if self._writes % MONGO_TRIM_EVERY == 0:
+            await self._trim()
+
+    async def _trim(self):
+        """件数の上限を超えた分を最終アクセスの古い順に削除"""
+        excess = await self.collection.estimated_document_count() - self.max_entries
+        if excess <= 0:
+            return
+        cursor = self.collection.find({}, {"_id": 1}).sort("accessed_at", 1).limit(excess)
+        ids = [doc["_id"] async for doc in cursor]
+        if ids:
+            result = await self.collection.delete_many({"_id": {"$in": ids}})
+            self.evictions += result.deleted_count
+
+    async def clear(self) -> int:
+        result = await self.collection.delete_many({})
+        return result.deleted_count
+
+    async def size(self) -> int:
+        return await self.collection.estimated_document_count()
+
+
+def create_backend(name: str, max_entries: int):
+    if name == "mongo":
+        return MongoCacheBackend(max_entries)
+    if name == "memory":
+        return MemoryCacheBackend(max_entries)
+    return None
+
+
+class SimulationCache:
+    """正規化したリクエストとデータバージョンをキーにしたシミュレーション結果のキャッシュ"""
+
+    def __init__(self, backend: Optional[str] = None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl or settings.SIMULATION_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.SIMULATION_CACHE_MAX_ENTRIES
+        self.backend = create_backend(backend or settings.SIMULATION_CACHE_BACKEND, self.max_entries)
+        # namespace -> 統計（プロセスごと）
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, outcome: str):
+        stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "errors": 0})
+        stats[outcome] += 1
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        body: Dict[str, Any],
+        groups: Sequence[str],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        キャッシュがあれば返し、なければ compute() の結果を保存して返す
+        groups は結果が依存するフィールドグループ（data_version_serviceのグループ名）
+        """
+        if self.backend is None:
+            return await compute()
+
+        versions = await data_version_service.get_versions()
+        version_token = "|".join(versions.get(group, {}).get("fingerprint", "") for group in groups)
+        key = make_cache_key(namespace, body, version_token)
+
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Simulation cache lookup failed: {e}")
+            self._count(namespace, "errors")
+            cached = None
+        if cached is not None:
+            self._count(namespace, "hits")
+            return cached
+
+        self._count(namespace, "misses")
+        value = jsonable_encoder(await compute())
+        try:
+            await self.backend.set(key, namespace, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Simulation cache store failed: {e}")
+            self._count(namespace, "errors")
+        return value
+
+    async def clear(self) -> int:
+        if self.backend is None:
+            return 0
+        removed = await self.backend.clear()
+        logger.info(f"Simulation cache cleared ({removed} entries)")
+        return removed
+
+    async def get_stats(self) -> Dict[str, Any]:
+        hits = sum(stats["hits"] for stats in self._stats.values())
+        misses = sum(stats["misses"] for stats in self._stats.values())
+        return {
+            "backend": self.backend.name if self.backend else "disabled",
+            "entries": await self.backend.size() if self.backend else 0,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "evictions": self.backend.evictions if self.backend else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "namespaces": self._stats
+        }
+
+
+# シングルトンインスタンス
+simulation_cache = SimulationCache()
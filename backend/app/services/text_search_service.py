@@ -0,0 +1,258 @@
+"""
+町名・子育て支援制度の全文検索サービス
+bigram転置インデックスをメモリ上に構築し、BM25でスコアリングする
+"""
+import asyncio
+import logging
+import math
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from beanie.odm.operators.find.comparison import In
+
+from app.models_mongo.area import Area
+from app.services.data_version_service import data_version_service
+
+logger = logging.getLogger(__name__)
+
+# インデックス対象のフィールドグループ（data_version_serviceのグループ名）
+INDEXED_GROUPS = ("basic", "town_list", "childcare_supports")
+
+# 子育て支援制度のインデックス対象フィールド
+CHILDCARE_SUPPORT_FIELDS = ("name", "summary", "monetary_support")
+
+
+def normalize_text(text: str) -> str:
+    """
+    検索用に文字列を正規化（全角英数→半角、大文字→小文字）
+    文字ごとに変換し、元の文字列とオフセットが一致するようにする
+    """
+    normalized = []
+    for char in text:
+        converted = unicodedata.normalize("NFKC", char).lower()
+        normalized.append(converted if len(converted) == 1 else char)
+    return "".join(normalized)
+
+
+def extract_bigrams(text: str) -> List[Tuple[str, int]]:
+    """正規化済み文字列からbigramと開始位置を抽出"""
+    return [
+        (text[i:i + 2], i)
+        for i in range(len(text) - 1)
+        if not text[i].isspace() and not text[i + 1].isspace()
+    ]
+
+
+@dataclass
+class IndexedDocument:
+    """インデックス済みドキュメント（町名1件または支援制度1件）"""
+    doc_id: int
+    area_code: str
+    area_name: str
+    kind: str
+    title: str
+    fields: Dict[str, str]
+    normalized_fields: Dict[str, str] = field(default_factory=dict)
+    length: int = 0
+
+
+class TextSearchService:
+    """
+    bigram転置インデックスによる全文検索
+    data_version_serviceのフィンガープリントを比較し、変化したエリアのみ再インデックスする
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._documents: Dict[int, IndexedDocument] = {}
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._area_documents: Dict[str, List[int]] = {}
+        self._area_fingerprints: Dict[str, str] = {}
+        self._total_length = 0
+        self._next_id = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def document_count(self) -> int:
+        return len(self._documents)
+
+    async def ensure_fresh(self):
+        """データバージョンを確認し、変化したエリアのみ再インデックス"""
+        versions = await data_version_service.get_versions()
+        target = self._target_fingerprints(versions)
+        if target == self._area_fingerprints:
+            return
+
+        async with self._lock:
+            target = self._target_fingerprints(await data_version_service.get_versions())
+            changed_codes = [
+                code for code, fingerprint in target.items()
+                if self._area_fingerprints.get(code) != fingerprint
+            ]
+            removed_codes = [code for code in self._area_fingerprints if code not in target]
+
+            for code in removed_codes:
+                self._remove_area(code)
+                self._area_fingerprints.pop(code, None)
+
+            if changed_codes:
+                areas = await Area.find(In(Area.code, changed_codes)).to_list()
+                for area in areas:
+                    self.index_area(area)
+                    self._area_fingerprints[area.code] = target[area.code]
+                logger.info(f"Text index updated for {len(areas)} areas ({self.document_count} documents)")
+
+    def _target_fingerprints(self, versions: Dict) -> Dict[str, str]:
+        """インデックス対象グループを合成したエリア別フィンガープリント"""
+        codes = set()
+        for group in INDEXED_GROUPS:
+            codes.update(versions.get(group, {}).get("area_fingerprints", {}).keys())
+
+        return {
+            code: "|".join(
+                versions.get(group, {}).get("area_fingerprints", {}).get(code, "")
+                for group in INDEXED_GROUPS
+            )
+            for code in codes
+        }
+
+    def index_area(self, area: Area):
+        """エリア単位でドキュメントを（再）登録"""
+        self._remove_area(area.code)
+
+        doc_ids = []
+        for town_name in area.town_list or []:
+            doc_ids.append(self._add_document(
+                area, "town", town_name, {"town_name": town_name}
+            ))
+
+        for support in area.childcare_supports or []:
+            fields = {
+                field_name: getattr(support, field_name)
+                for field_name in CHILDCARE_SUPPORT_FIELDS
+                if getattr(support, field_name)
+            }
+            doc_ids.append(self._add_document(
+                area, "childcare_support", support.name, fields
+            ))
+
+        self._area_documents[area.code] = doc_ids
+
+    def _add_document(self, area: Area, kind: str, title: str, fields: Dict[str, str]) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+
+        document = IndexedDocument(
+            doc_id=doc_id,
+            area_code=area.code,
+            area_name=area.name,
+            kind=kind,
+            title=title,
+            fields=fields
+        )
+
+        term_counts = Counter()
+        for field_name, text in fields.items():
+            normalized = normalize_text(text)
+            document.normalized_fields[field_name] = normalized
+            term_counts.update(term for term, _ in extract_bigrams(normalized))
+
+        document.length = sum(term_counts.values())
+        for term, count in term_counts.items():
+            self._postings[term][doc_id] = count
+
+        self._documents[doc_id] = document
+        self._total_length += document.length
+        return doc_id
+
+    def _remove_area(self, area_code: str):
+        for doc_id in self._area_documents.pop(area_code, []):
+            document = self._documents.pop(doc_id)
+            self._total_length -= document.length
+            for text in document.normalized_fields.values():
+                for term, _ in extract_bigrams(text):
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        continue
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        kind: Optional[str] = None,
+        area_code: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        """
+        BM25で検索し、(ヒット件数, 上位結果)を返す
+        各結果にはフィールド別のハイライト位置（start, end）を含む
+        """
+        await self.ensure_fresh()
+
+        query_terms = Counter(term for term, _ in extract_bigrams(normalize_text(query)))
+        if not query_terms or not self._documents:
+            return 0, []
+
+        total_docs = len(self._documents)
+        average_length = self._total_length / total_docs if total_docs else 0
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, query_count in query_terms.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, term_count in postings.items():
+                document = self._documents[doc_id]
+                if kind and document.kind != kind:
+                    continue
+                if area_code and document.area_code != area_code:
+                    continue
+
+                length_norm = 1 - self.b + self.b * document.length / average_length if average_length else 1
+                scores[doc_id] += query_count * idf * term_count * (self.k1 + 1) / (term_count + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+        results = []
+        for doc_id, score in ranked[:limit]:
+            document = self._documents[doc_id]
+            results.append({
+                "area_code": document.area_code,
+                "area_name": document.area_name,
+                "kind": document.kind,
+                "title": document.title,
+                "score": round(score, 4),
+                "fields": document.fields,
+                "highlights": self._highlight(document, set(query_terms))
+            })
+
+        return len(ranked), results
+
+    def _highlight(self, document: IndexedDocument, query_terms: set) -> Dict[str, List[Dict[str, int]]]:
+        """一致したbigramの位置を連結してハイライト範囲を生成"""
+        highlights = {}
+        for field_name, text in document.normalized_fields.items():
+            spans: List[List[int]] = []
+            for term, position in extract_bigrams(text):
+                if term not in query_terms:
+                    continue
+                if spans and position <= spans[-1][1]:
+                    spans[-1][1] = max(spans[-1][1], position + 2)
+                else:
+                    spans.append([position, position + 2])
+
+            if spans:
+                highlights[field_name] = [{"start": start, "end": end} for start, end in spans]
+
+        return highlights
+
+
+# シングルトンインスタンス
+text_search_service = TextSearchService()
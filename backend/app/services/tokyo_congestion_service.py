@@ -4,8 +4,14 @@
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
+from types import MappingProxyType
 import math
 
+import numpy as np
+
+from app.services.congestion_model import CongestionProfileModel
+from app.utils.timezones import tokyo_now
+
 logger = logging.getLogger(__name__)
 
 
@@ -223,41 +229,112 @@ class TokyoCongestionService:
                 "品川インターシティ": 1200  # オフィス・商業複合施設
             }
         }
+        
+        # 週末に特に混雑する繁華街・観光地（渋谷、新宿、港区、台東区、墨田区）
+        self.weekend_hotspot_areas = {"13113", "13104", "13103", "13106", "13107"}
+        # 週末の買い物客で混雑する商業エリア（足立区：北千住）
+        self.weekend_shopping_areas = {"13121"}
+        
+        # 時間帯別混雑度のプロファイルモデル
+        self.congestion_model = CongestionProfileModel()
+        
+        # 全区の混雑度テーブル（静的データのみから算出されるため起動時に一度だけ構築）
+        self._congestion_table = self._build_congestion_table()
     
-    def calculate_area_congestion(self, area_code: str, area_name: str) -> Dict:
+    def _build_congestion_table(self) -> MappingProxyType:
         """
-        エリアの混雑度を総合的に算出
+        23区 × 時間帯 × 平日/週末の混雑度、混雑要因、ピーク/閑散時間帯、施設別混雑度を事前計算
+        時間帯別混雑度は (区数 × 2 × 24) のテンソルとして一括生成する
         """
-        try:
-            # 基本スコアの計算
+        area_codes = list(self.daytime_population_ratio)
+        base_scores = [self._calculate_base_score(area_code) for area_code in area_codes]
+        tensor = self.congestion_model.evaluate_named(
+            base_scores,
+            [self._classify_weekday(area_code) for area_code in area_codes],
+            [self._classify_weekend(area_code) for area_code in area_codes]
+        )
+        tensor.setflags(write=False)
+        
+        # ヒートマップや予測など時間帯別の配列をそのまま使う処理向けに保持
+        self.area_codes = tuple(area_codes)
+        self.congestion_tensor = tensor
+        
+        table = {}
+        for index, area_code in enumerate(area_codes):
+            table[area_code] = MappingProxyType(
+                self._compute_area_congestion(area_code, base_scores[index], tensor[index])
+            )
+        return MappingProxyType(table)
+    
+    def _compute_area_congestion(self, area_code: str, base_score: Optional[float] = None,
+                                 hourly: Optional[np.ndarray] = None) -> Dict:
+        """
+        エリアの混雑度を静的データから算出
+        hourlyには (平日/週末 × 時間スロット) の混雑度配列を渡せる
+        """
+        # 基本スコアの計算
+        if base_score is None:
             base_score = self._calculate_base_score(area_code)
-            
-            # 時間帯別混雑度の生成
-            weekday_congestion = self._generate_hourly_congestion(area_code, is_weekday=True)
-            weekend_congestion = self._generate_hourly_congestion(area_code, is_weekday=False)
-            
+        if hourly is None:
+            hourly = self._evaluate_hourly_congestion(area_code, base_score)
+        
+        return {
+            'congestion_score': base_score,
+            # 時間帯別混雑度
+            'weekday_congestion': self.congestion_model.to_hourly_dict(hourly[0]),
+            'weekend_congestion': self.congestion_model.to_hourly_dict(hourly[1]),
             # 混雑要因の特定
-            congestion_factors = self._identify_congestion_factors(area_code, area_name)
-            
+            'congestion_factors': self._identify_congestion_factors(area_code),
             # 施設タイプ別混雑度
-            facility_congestion = self._calculate_facility_congestion(area_code)
+            'facility_congestion': self._calculate_facility_congestion(area_code, base_score=base_score),
+            'peak_times': self._get_peak_times(area_code),
+            'quiet_times': self._get_quiet_times(area_code),
+            'data_source': 'tokyo_opendata'
+        }
+    
+    def calculate_area_congestion(self, area_code: str, area_name: str) -> Dict:
+        """
+        エリアの混雑度を総合的に算出（事前計算済みテーブルから取得）
+        """
+        try:
+            entry = self._congestion_table.get(area_code)
+            if entry is None:
+                # テーブル外のエリアはその場で算出
+                entry = self._compute_area_congestion(area_code)
             
+            # 呼び出し側で変更されてもテーブルに影響しないようコピーを返す
             return {
-                'congestion_score': base_score,
-                'weekday_congestion': weekday_congestion,
-                'weekend_congestion': weekend_congestion,
-                'congestion_factors': congestion_factors,
-                'facility_congestion': facility_congestion,
-                'peak_times': self._get_peak_times(area_code),
-                'quiet_times': self._get_quiet_times(area_code),
-                'last_updated': datetime.now(),
-                'data_source': 'tokyo_opendata'
+                'congestion_score': entry['congestion_score'],
+                'weekday_congestion': dict(entry['weekday_congestion']),
+                'weekend_congestion': dict(entry['weekend_congestion']),
+                'congestion_factors': list(entry['congestion_factors']),
+                'facility_congestion': {
+                    facility_type: dict(values)
+                    for facility_type, values in entry['facility_congestion'].items()
+                },
+                'peak_times': list(entry['peak_times']),
+                'quiet_times': list(entry['quiet_times']),
+                'last_updated': tokyo_now(),
+                'data_source': entry['data_source']
             }
             
         except Exception as e:
             logger.error(f"Error calculating congestion for {area_name}: {e}")
             return self._get_default_congestion_data()
     
+    def get_current_congestion(self, area_code: str, now: Optional[datetime] = None) -> int:
+        """
+        現在時刻（日本時間の平日/週末と時間帯）の混雑度を取得
+        now はタイムゾーンなしの場合UTCとみなす
+        """
+        now = tokyo_now(now)
+        entry = self._congestion_table.get(area_code)
+        if entry is None:
+            entry = self._compute_area_congestion(area_code)
+        
+        hourly = entry['weekend_congestion'] if now.weekday() >= 5 else entry['weekday_congestion']
+        return hourly.get(str(now.hour), 50)
+    
     def _calculate_base_score(self, area_code: str) -> float:
         """
         基本混雑度スコアを算出（0-100）
@@ -307,85 +384,50 @@ class TokyoCongestionService:
         
         return round(total_score, 1)
     
-    def _generate_hourly_congestion(self, area_code: str, is_weekday: bool) -> Dict[str, int]:
+    def _classify_weekday(self, area_code: str) -> str:
         """
-        時間帯別混雑度を生成
+        平日の時間帯別プロファイルの分類（昼夜間人口比による）
         """
-        base_score = self._calculate_base_score(area_code)
-        hourly_congestion = {}
-        
-        # 昼夜間人口比を考慮
         daytime_ratio = self.daytime_population_ratio.get(area_code, 100)
-        is_business_area = daytime_ratio > 150
-        is_residential_area = daytime_ratio < 100
-        
-        for hour in range(7, 23):
-            if is_weekday:
-                if is_business_area:
-                    # ビジネス街の平日パターン
-                    if hour in [8, 9]:  # 通勤ラッシュ
-                        congestion = min(100, base_score * 1.5)
-                    elif hour in [12, 13]:  # ランチタイム
-                        congestion = min(100, base_score * 1.3)
-                    elif hour in [18, 19]:  # 帰宅ラッシュ
-                        congestion = min(100, base_score * 1.4)
-                    elif hour >= 20:  # 夜間
-                        congestion = max(20, base_score * 0.5)
-                    else:
-                        congestion = base_score
-                elif is_residential_area:
-                    # 住宅街の平日パターン
-                    if hour in [7, 8]:  # 朝の通勤時間
-                        congestion = min(100, base_score * 1.2)
-                    elif hour in [18, 19, 20]:  # 帰宅後
-                        congestion = min(100, base_score * 1.1)
-                    elif 10 <= hour <= 16:  # 日中
-                        congestion = max(20, base_score * 0.7)
-                    else:
-                        congestion = base_score * 0.9
-                else:
-                    # 商業・繁華街の平日パターン
-                    if hour in [8, 9]:
-                        congestion = min(100, base_score * 1.3)
-                    elif hour in [12, 13]:
-                        congestion = min(100, base_score * 1.2)
-                    elif hour in [17, 18, 19]:
-                        congestion = min(100, base_score * 1.4)
-                    elif hour >= 20:
-                        congestion = min(100, base_score * 1.1)
-                    else:
-                        congestion = base_score
-            else:
-                # 週末のパターン
-                if area_code in ["13113", "13104", "13103", "13106", "13107"]:  # 渋谷、新宿、港区、台東区、墨田区
-                    # 繁華街・観光地の週末は特に混雑
-                    if 11 <= hour <= 20:
-                        congestion = min(100, base_score * 1.4)
-                    elif 10 <= hour <= 21:
-                        congestion = min(100, base_score * 1.2)
-                    else:
-                        congestion = base_score * 0.8
-                elif area_code == "13121":  # 足立区（北千住）
-                    # 商業エリアの週末
-                    if 11 <= hour <= 19:
-                        congestion = min(100, base_score * 1.2)
-                    else:
-                        congestion = base_score * 0.8
-                elif is_business_area:
-                    # ビジネス街の週末は空いている
-                    congestion = max(20, base_score * 0.4)
-                else:
-                    # その他の週末
-                    if 11 <= hour <= 18:
-                        congestion = base_score * 0.9
-                    else:
-                        congestion = base_score * 0.7
-            
-            hourly_congestion[str(hour)] = int(congestion)
-        
-        return hourly_congestion
+        if daytime_ratio > 150:
+            return "business"
+        if daytime_ratio < 100:
+            return "residential"
+        return "commercial"
+    
+    def _classify_weekend(self, area_code: str) -> str:
+        """
+        週末の時間帯別プロファイルの分類
+        """
+        if area_code in self.weekend_hotspot_areas:
+            return "hotspot"
+        if area_code in self.weekend_shopping_areas:
+            return "shopping"
+        if self.daytime_population_ratio.get(area_code, 100) > 150:
+            return "business"
+        return "other"
+    
+    def _evaluate_hourly_congestion(self, area_code: str, base_score: float) -> np.ndarray:
+        """
+        1エリア分の (平日/週末 × 時間スロット) の混雑度配列を生成
+        """
+        return self.congestion_model.evaluate_named(
+            [base_score],
+            [self._classify_weekday(area_code)],
+            [self._classify_weekend(area_code)]
+        )[0]
     
-    def _identify_congestion_factors(self, area_code: str, area_name: str) -> List[str]:
+    def _generate_hourly_congestion(self, area_code: str, is_weekday: bool,
+                                    base_score: Optional[float] = None) -> Dict[str, int]:
+        """
+        時間帯別混雑度を生成
+        """
+        if base_score is None:
+            base_score = self._calculate_base_score(area_code)
+        hourly = self._evaluate_hourly_congestion(area_code, base_score)
+        return self.congestion_model.to_hourly_dict(hourly[0 if is_weekday else 1])
+    
+    def _identify_congestion_factors(self, area_code: str) -> List[str]:
         """
         混雑要因を特定
         """
@@ -453,11 +495,12 @@ class TokyoCongestionService:
         
         return factors[:4]  # 最大4つまで
     
-    def _calculate_facility_congestion(self, area_code: str) -> Dict:
+    def _calculate_facility_congestion(self, area_code: str, base_score: Optional[float] = None) -> Dict:
         """
         施設タイプ別混雑度を算出
         """
-        base_score = self._calculate_base_score(area_code)
+        if base_score is None:
+            base_score = self._calculate_base_score(area_code)
         
         # エリア特性に基づいた施設別混雑度
         if area_code in self.station_passengers:
@@ -533,7 +576,7 @@ class TokyoCongestionService:
             'facility_congestion': {},
             'peak_times': ["平日 8:00-9:00", "平日 18:00-19:00"],
             'quiet_times': ["週末早朝", "平日 10:00-16:00"],
-            'last_updated': datetime.now(),
+            'last_updated': tokyo_now(),
             'data_source': 'default'
         }
 
@@ -6,6 +6,7 @@ import asyncio
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.services.rate_limiter import rate_limiter
 
 
 class TokyoOpenDataClient:
@@ -53,6 +54,7 @@ class TokyoOpenDataClient:
             return self._cache[cache_key]
         
         url = urljoin(self.base_url, endpoint)
+        await rate_limiter.acquire("tokyo_opendata")
         try:
             response = await self.client.get(url, params=params)
             response.raise_for_status()
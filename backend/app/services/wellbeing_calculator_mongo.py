@@ -11,11 +11,12 @@ class WellbeingWeights:
     parks: float = 0.15
     medical: float = 0.10
     culture: float = 0.10
+    commute: float = 0.0  # 通勤先を指定した場合のみ使用
     
     def normalize(self):
         """重みを正規化（合計1.0に）"""
         total = sum([self.rent, self.safety, self.education, 
-                    self.parks, self.medical, self.culture])
+                    self.parks, self.medical, self.culture, self.commute])
         if total > 0:
             self.rent /= total
             self.safety /= total
@@ -23,6 +24,7 @@ class WellbeingWeights:
             self.parks /= total
             self.medical /= total
             self.culture /= total
+            self.commute /= total
 
 
 class WellbeingCalculator:
@@ -37,7 +39,8 @@ class WellbeingCalculator:
             'parks': 100,  # 公園数100を最大値
             'hospitals': 20,  # 病院数20を最大値
             'libraries': 10,  # 図書館数10を最大値
-            'waiting_children': 300  # 待機児童300人を最大値
+            'waiting_children': 300,  # 待機児童300人を最大値
+            'commute_minutes': 90.0  # 通勤時間90分を最大値
         }
         
         # 繁華街・歓楽街のある区（治安スコアに追加ペナルティ）
@@ -55,8 +58,9 @@ class WellbeingCalculator:
     
     def calculate_score(self, area: Any, weights: WellbeingWeights, 
                        target_rent: Optional[float] = None,
-                       family_size: int = 4) -> Dict[str, Any]:
-        """エリアのウェルビーイングスコアを計算"""
+                       family_size: int = 4,
+                       commute_minutes: Optional[float] = None) -> Dict[str, Any]:
+        """エリアのウェルビーイングスコアを計算（commute_minutes は通勤先への重み付き通勤時間）"""
         
         # 重みを正規化
         weights.normalize()
@@ -70,6 +74,8 @@ class WellbeingCalculator:
             'medical': self._calculate_medical_score(area),
             'culture': self._calculate_culture_score(area)
         }
+        if commute_minutes is not None:
+            scores['commute'] = self._calculate_commute_score(commute_minutes)
         
         # 総合スコアを計算
         total_score = (
@@ -78,7 +84,8 @@ class WellbeingCalculator:
             scores['education'] * weights.education +
             scores['parks'] * weights.parks +
             scores['medical'] * weights.medical +
-            scores['culture'] * weights.culture
+            scores['culture'] * weights.culture +
+            scores.get('commute', 50.0) * weights.commute
         )
         
         return {
@@ -90,7 +97,8 @@ class WellbeingCalculator:
                 'education': weights.education,
                 'parks': weights.parks,
                 'medical': weights.medical,
-                'culture': weights.culture
+                'culture': weights.culture,
+                'commute': weights.commute
             }
         }
     
@@ -216,14 +224,23 @@ class WellbeingCalculator:
         score = min(100, 100 * libraries / self.max_values['libraries'])
         return round(score, 2)
     
+    def _calculate_commute_score(self, commute_minutes: float) -> float:
+        """通勤スコアを計算（通勤時間が短いほど高スコア）"""
+        score = max(0, 100 * (1 - commute_minutes / self.max_values['commute_minutes']))
+        return round(score, 2)
+    
     def rank_areas(self, areas: List[Any], weights: WellbeingWeights,
-                   target_rent: Optional[float] = None) -> List[Tuple[Any, Dict]]:
-        """エリアをウェルビーイングスコアでランキング"""
+                   target_rent: Optional[float] = None,
+                   commute_minutes: Optional[Dict[str, float]] = None) -> List[Tuple[Any, Dict]]:
+        """エリアをウェルビーイングスコアでランキング（commute_minutes は area_code -> 通勤時間）"""
         
         # 各エリアのスコアを計算
         area_scores = []
         for area in areas:
-            score_data = self.calculate_score(area, weights, target_rent)
+            score_data = self.calculate_score(
+                area, weights, target_rent,
+                commute_minutes=(commute_minutes or {}).get(getattr(area, 'code', None))
+            )
             area_scores.append((area, score_data))
         
         # スコアで降順ソート
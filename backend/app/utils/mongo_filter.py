@@ -0,0 +1,124 @@
+"""
+MongoDBクエリフィルタのPython評価
+検索APIが生成するフィルタ（$and, 比較演算子, $in, $expr + $add）をメモリ上のドキュメントに適用する
+"""
+from typing import Any, Dict, Iterator, Tuple
+
+
+def get_path(document: Any, path: str) -> Any:
+    """ドット区切りのパスで値を取得（存在しない場合はNone）"""
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def iter_field_paths(query: Dict[str, Any]) -> Iterator[str]:
+    """フィルタが参照するフィールドパスを列挙"""
+    for key, condition in query.items():
+        if key in ("$and", "$or", "$nor"):
+            for sub_query in condition:
+                yield from iter_field_paths(sub_query)
+        elif key == "$expr":
+            yield from _iter_expr_paths(condition)
+        elif not key.startswith("$"):
+            yield key
+
+
+def _iter_expr_paths(expr: Any) -> Iterator[str]:
+    if isinstance(expr, str) and expr.startswith("$"):
+        yield expr[1:]
+    elif isinstance(expr, dict):
+        for operand in expr.values():
+            yield from _iter_expr_paths(operand)
+    elif isinstance(expr, list):
+        for operand in expr:
+            yield from _iter_expr_paths(operand)
+
+
+def matches_filter(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """ドキュメントがフィルタ条件を満たすか判定"""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches_filter(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$nor":
+            if any(matches_filter(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$expr":
+            if not _evaluate_expr(document, condition):
+                return False
+        else:
+            value = get_path(document, key)
+            if _is_operator_dict(condition):
+                if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                    return False
+            elif value != condition:
+                return False
+    return True
+
+
+def _is_operator_dict(condition: Any) -> bool:
+    return isinstance(condition, dict) and bool(condition) and all(k.startswith("$") for k in condition)
+
+
+def _ordered(value: Any, operand: Any) -> Tuple[Any, Any]:
+    # bool/数値以外の型や欠損値は比較対象外
+    if value is None or operand is None:
+        raise TypeError
+    return value, operand
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    try:
+        if op == "$eq":
+            return value == operand
+        if op == "$ne":
+            return value != operand
+        if op == "$in":
+            return value in operand
+        if op == "$nin":
+            return value not in operand
+        if op == "$exists":
+            return (value is not None) == bool(operand)
+        if op == "$gt":
+            left, right = _ordered(value, operand)
+            return left > right
+        if op == "$gte":
+            left, right = _ordered(value, operand)
+            return left >= right
+        if op == "$lt":
+            left, right = _ordered(value, operand)
+            return left < right
+        if op == "$lte":
+            left, right = _ordered(value, operand)
+            return left <= right
+    except TypeError:
+        return False
+
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _evaluate_expr(document: Dict[str, Any], expr: Any) -> Any:
+    if isinstance(expr, str) and expr.startswith("$"):
+        return get_path(document, expr[1:])
+
+    if isinstance(expr, dict) and len(expr) == 1:
+        op, operands = next(iter(expr.items()))
+        values = [_evaluate_expr(document, operand) for operand in operands]
+
+        if op == "$add":
+            if any(v is None for v in values):
+                return None
+            return sum(values)
+        if op in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte"):
+            return _compare(values[0], op, values[1])
+
+        raise ValueError(f"Unsupported expression operator: {op}")
+
+    return expr
@@ -0,0 +1,27 @@
+"""
+日時のタイムゾーン
+保存・比較はタイムゾーン付きのUTC、曜日・時間帯の判定は日本時間で行う
+（MongoDBから読み込んだ日時はタイムゾーンなしのUTC）
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+TOKYO_TZ = ZoneInfo("Asia/Tokyo")
+
+
+def utc_now() -> datetime:
+    """現在時刻（タイムゾーン付きのUTC）"""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    """タイムゾーン付きのUTCに変換（タイムゾーンなしはUTCとみなす）"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def tokyo_now(now: Optional[datetime] = None) -> datetime:
+    """日本時間の日時（省略時は現在時刻、タイムゾーンなしはUTCとみなす）"""
+    return as_utc(now or utc_now()).astimezone(TOKYO_TZ)
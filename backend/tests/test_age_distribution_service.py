@@ -0,0 +1,151 @@
+"""
+age_distribution_service のテスト（MongoDBなし）
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services import age_distribution_service as module
+from app.services.age_distribution_service import AgeDistributionListing
+
+AREAS = {
+    1: SimpleNamespace(id=1, code="13113", name="渋谷区"),
+    2: SimpleNamespace(id=2, code="13101", name="千代田区"),
+    3: SimpleNamespace(id=3, code="13104", name="新宿区"),
+}
+
+
+def _age_dist(doc_id, area_id, youth_rate, aging_rate, median_age):
+    return {
+        "_id": doc_id,
+        "area_id": area_id,
+        "age_0_14": 10000 + doc_id,
+        "age_15_64": 60000,
+        "age_65_plus": 20000,
+        "median_age": median_age,
+        "aging_rate": aging_rate,
+        "youth_rate": youth_rate,
+        "total_population": 90000 + doc_id,
+        "year": 2024,
+        "updated_at": datetime(2024, 4, 1),
+    }
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length=None):
+        return self.rows
+
+
+class FakeCollection:
+    def __init__(self, model):
+        self.model = model
+
+    def aggregate(self, pipeline):
+        docs = self.model.docs
+        if not docs:
+            return FakeCursor([])
+        return FakeCursor([{
+            "count": len(docs),
+            "last_id": max(doc["_id"] for doc in docs),
+            "updated_at": max(doc["updated_at"] for doc in docs),
+        }])
+
+
+class FakeAgeDistribution:
+    docs = []
+    loads = 0
+
+    @classmethod
+    def get_motor_collection(cls):
+        return FakeCollection(cls)
+
+    @classmethod
+    def find_all(cls, fetch_links=False):
+        cls.loads += 1
+        # fetch_links=True なら $lookup で解決済みのエリア、解決できなければ Link のまま
+        return FakeCursor([
+            SimpleNamespace(
+                **{key: value for key, value in doc.items() if key not in ("_id", "area_id")},
+                area=AREAS.get(doc["area_id"], SimpleNamespace(id=doc["area_id"])) if fetch_links
+                else SimpleNamespace(id=doc["area_id"])
+            )
+            for doc in cls.docs
+        ])
+
+
+class FakeDataVersionService:
+    fingerprint = "basic-1"
+
+    async def get_versions(self):
+        return {"basic": {"fingerprint": self.fingerprint}}
+
+
+async def _legacy_listing():
+    """変更前の実装（年齢分布ごとに Area.find_one）"""
+    results = []
+    for age_dist in await FakeAgeDistribution.find_all().to_list():
+        area = AREAS.get(age_dist.area.id)
+        if area:
+            area_id = int(area.code[2:]) if area.code.startswith("13") else 0
+            results.append({
+                "area_id": area_id,
+                "area_name": area.name,
+                "age_0_14": age_dist.age_0_14,
+                "age_15_64": age_dist.age_15_64,
+                "age_65_plus": age_dist.age_65_plus,
+                "median_age": age_dist.median_age,
+                "aging_rate": age_dist.aging_rate,
+                "youth_rate": age_dist.youth_rate,
+                "total_population": age_dist.total_population,
+                "year": age_dist.year
+            })
+    return results
+
+
+def _setup(monkeypatch):
+    FakeAgeDistribution.docs = [
+        _age_dist(1, 1, 11.2, 18.5, 42.0),
+        _age_dist(2, 2, 12.0, 17.9, 41.5),
+        _age_dist(3, 3, 9.5, 19.2, 43.1),
+        _age_dist(4, 99, 10.0, 20.0, 44.0),  # リンク先のエリアが削除済み
+    ]
+    FakeAgeDistribution.loads = 0
+    monkeypatch.setattr(module, "AgeDistribution", FakeAgeDistribution)
+    monkeypatch.setattr(module, "data_version_service", FakeDataVersionService())
+    return AgeDistributionListing(probe_ttl_seconds=0)
+
+
+def test_lookup_listing_matches_legacy_output(monkeypatch):
+    listing = _setup(monkeypatch)
+    legacy = asyncio.run(_legacy_listing())
+    current = asyncio.run(listing.get_all())
+
+    assert current == sorted(legacy, key=lambda row: row["area_id"])
+    assert [row["area_id"] for row in current] == [101, 104, 113]
+    assert asyncio.run(listing.get_by_area_ids([113, 999, 101])) == [current[2], current[0]]
+
+
+def test_listing_reloads_when_age_distributions_change(monkeypatch):
+    listing = _setup(monkeypatch)
+    asyncio.run(listing.get_all())
+    asyncio.run(listing.get_all())
+    assert FakeAgeDistribution.loads == 1
+
+    # 入れ替え（同じ件数で新しいID）
+    FakeAgeDistribution.docs = [dict(doc, _id=doc["_id"] + 10) for doc in FakeAgeDistribution.docs]
+    asyncio.run(listing.get_all())
+    assert FakeAgeDistribution.loads == 2
+
+    # 既存ドキュメントの保存
+    FakeAgeDistribution.docs[0] = dict(FakeAgeDistribution.docs[0], youth_rate=15.0, updated_at=datetime(2024, 5, 1))
+    rows = asyncio.run(listing.get_all())
+    assert FakeAgeDistribution.loads == 3
+    assert rows[2]["youth_rate"] == 15.0
+
+    # 区名の変更
+    module.data_version_service.fingerprint = "basic-2"
+    asyncio.run(listing.get_all())
+    assert FakeAgeDistribution.loads == 4
@@ -0,0 +1,27 @@
+"""
+congestion_forecast_service のテスト（MongoDBなし）
+"""
+from datetime import datetime, timezone
+
+from app.services.congestion_forecast_service import congestion_forecast_service
+from app.services.tokyo_congestion_service import tokyo_congestion_service
+
+
+def test_current_matches_observed_hour_in_tokyo():
+    area_code = congestion_forecast_service.area_codes[0]
+    index = congestion_forecast_service._area_index[area_code]
+
+    # 2024-04-06（土）0:00 UTC は 2024-04-06（土）9:00 JST
+    now = datetime(2024, 4, 6, 0, 0)
+    assert congestion_forecast_service.get_current(area_code, now) == \
+        int(congestion_forecast_service._table[index, 5, 9])
+    assert congestion_forecast_service.get_current(area_code, now.replace(tzinfo=timezone.utc)) == \
+        congestion_forecast_service.get_current(area_code, now)
+
+    # 未学習の予測表は静的モデルと同じ時間帯を選ぶ
+    assert congestion_forecast_service.get_current(area_code, now) == \
+        tokyo_congestion_service.get_current_congestion(area_code, now)
+
+    forecast = congestion_forecast_service.get_forecast(area_code, hours=2, now=now)
+    assert forecast["points"][0]["time"] == "2024-04-06T09:00:00+09:00"
+    assert forecast["points"][0]["congestion"] == congestion_forecast_service.get_current(area_code, now)
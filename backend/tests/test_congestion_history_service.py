@@ -0,0 +1,150 @@
+"""
+congestion_history_service のテスト（MongoDBなし）
+"""
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services import congestion_history_service as module
+from app.services.congestion_history_service import CongestionHistoryService
+from app.services.tokyo_congestion_service import tokyo_congestion_service
+from app.utils.timezones import TOKYO_TZ
+
+
+class FakeObservation:
+    fail = False
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    @classmethod
+    async def insert_many(cls, observations):
+        if cls.fail:
+            raise ConnectionError("mongo down")
+
+
+def _service(monkeypatch, max_buffer):
+    monkeypatch.setattr(module, "CongestionObservation", FakeObservation)
+    monkeypatch.setattr(module, "ObservationMeta", lambda **meta: meta)
+    return CongestionHistoryService(flush_interval=1, rollup_interval=1, max_buffer=max_buffer)
+
+
+def test_record_stores_aware_utc(monkeypatch):
+    service = _service(monkeypatch, max_buffer=10)
+
+    # タイムゾーンなしはUTC、日本時間は同じ時刻のUTCとして1時間1件の判定を行う
+    assert service.record("13101", 50, 60, "tokyo_opendata", datetime(2024, 4, 1, 0, 30))
+    assert not service.record("13101", 55, 60, "tokyo_opendata", datetime(2024, 4, 1, 9, 45, tzinfo=TOKYO_TZ))
+    assert service._buffer[0].timestamp == datetime(2024, 4, 1, 0, 30, tzinfo=timezone.utc)
+
+    # データソースが異なれば同じ時間帯でも記録する
+    assert service.record("13101", 40, 60, "google_places_api", datetime(2024, 4, 1, 0, 50))
+
+
+def test_failed_flush_keeps_at_most_max_buffer(monkeypatch):
+    service = _service(monkeypatch, max_buffer=3)
+    FakeObservation.fail = True
+    try:
+        for hour in range(5):
+            service.record("13101", hour, 50, "tokyo_opendata", datetime(2024, 4, 1, hour))
+        assert asyncio.run(service.flush_observations()) == 0
+    finally:
+        FakeObservation.fail = False
+
+    # 古いものから破棄し、新しい観測値を残す
+    assert [obs.congestion for obs in service._buffer] == [2.0, 3.0, 4.0]
+    assert service.dropped == 2
+
+
+def test_current_congestion_uses_tokyo_hour():
+    entry = tokyo_congestion_service._congestion_table["13101"]
+
+    # 2024-04-05（金）15:00 UTC は 2024-04-06（土）0:00 JST
+    value = tokyo_congestion_service.get_current_congestion("13101", datetime(2024, 4, 5, 15, 0))
+    assert value == entry["weekend_congestion"].get("0", 50)
+
+    aware = datetime(2024, 4, 1, 0, 0, tzinfo=timezone.utc)
+    assert tokyo_congestion_service.get_current_congestion("13101", aware) == \
+        entry["weekday_congestion"].get("9", 50)
+
+
+
+class FakeField:
+    """クエリ式（==, -field）を受け付けるだけのフィールド"""
+
+    def __eq__(self, other):
+        return True
+
+    def __neg__(self):
+        return self
+
+
+class FakeRollupQuery:
+    def __init__(self, latest):
+        self.latest = latest
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, count):
+        return self
+
+    async def to_list(self):
+        return [SimpleNamespace(bucket_start=self.latest)] if self.latest else []
+
+
+class FakeCollection:
+    """集計パイプラインを記録し、結果は空"""
+
+    def __init__(self, pipelines):
+        self.pipelines = pipelines
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class FakeRollup:
+    resolution = FakeField()
+    bucket_start = FakeField()
+    latest = None
+    pipelines = []
+
+    @classmethod
+    def find(cls, *args):
+        return FakeRollupQuery(cls.latest)
+
+    @classmethod
+    def get_motor_collection(cls):
+        return FakeCollection(cls.pipelines)
+
+
+def test_late_observations_are_rolled_up(monkeypatch):
+    service = _service(monkeypatch, max_buffer=10)
+    monkeypatch.setattr(module, "CongestionRollup", FakeRollup)
+    monkeypatch.setattr(FakeObservation, "get_motor_collection", FakeRollup.get_motor_collection, raising=False)
+    FakeRollup.latest = datetime(2024, 4, 10, 5, 0)
+    FakeRollup.pipelines = []
+
+    # 2024-04-03（水）23:30 UTC = 2024-04-04（木）8:30 JST の観測値が障害で遅れて書き出された
+    service.record("13101", 50, 60, "tokyo_opendata", datetime(2024, 4, 3, 23, 30))
+    assert asyncio.run(service.flush_observations()) == 1
+    asyncio.run(service.downsample())
+
+    starts = [pipeline[0]["$match"] for pipeline in FakeRollup.pipelines]
+    assert starts[0]["timestamp"]["$gte"] == datetime(2024, 4, 3, 23, 0, tzinfo=timezone.utc)
+    # 日・週は日本時間で区切る（4/4 0:00 JST、4/1（月）0:00 JST）
+    assert starts[1]["bucket_start"]["$gte"] == datetime(2024, 4, 3, 15, 0, tzinfo=timezone.utc)
+    assert starts[2]["bucket_start"]["$gte"] == datetime(2024, 3, 31, 15, 0, tzinfo=timezone.utc)
+
+    # 次回の集計は最新の集計バケットから
+    FakeRollup.pipelines = []
+    asyncio.run(service.downsample())
+    assert FakeRollup.pipelines[0][0]["$match"]["timestamp"]["$gte"] == \
+        datetime(2024, 4, 10, 5, 0, tzinfo=timezone.utc)
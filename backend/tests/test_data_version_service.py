@@ -0,0 +1,90 @@
+"""
+data_version_service のテスト（MongoDBなし）
+"""
+import asyncio
+from datetime import datetime
+
+from app.services import data_version_service as module
+from app.services.data_version_service import AREA_FIELD_GROUPS, DataVersionService
+
+
+class FakeArea:
+    def __init__(self, code, updated_at=datetime(2024, 4, 1), **fields):
+        self.code = code
+        self.updated_at = updated_at
+        self.fields = fields
+
+    def model_dump(self, mode="json"):
+        return {"code": self.code, **self.fields}
+
+
+class FakeQuery:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self):
+        return self.docs
+
+
+class FakeDataVersion:
+    docs = []
+
+    @classmethod
+    def find_all(cls):
+        return FakeQuery(cls.docs)
+
+
+def _areas(rent=100000):
+    return [
+        FakeArea("13101", name="千代田区", housing_data={"rent_1ldk": rent}, park_data={"total_parks": 10}),
+        FakeArea("13102", name="中央区", housing_data={"rent_1ldk": 120000}, park_data={"total_parks": 8}),
+    ]
+
+
+def test_fingerprint_changes_only_for_modified_group():
+    service = DataVersionService()
+    before = service.fingerprint_areas(_areas())
+    after = service.fingerprint_areas(_areas(rent=110000))
+
+    changed = [group for group in AREA_FIELD_GROUPS if before[group]["fingerprint"] != after[group]["fingerprint"]]
+    assert changed == ["housing_data"]
+    # エリア単位でも変わったエリアだけが変わる
+    assert before["housing_data"]["area_fingerprints"]["13102"] == after["housing_data"]["area_fingerprints"]["13102"]
+    assert before["housing_data"]["area_fingerprints"]["13101"] != after["housing_data"]["area_fingerprints"]["13101"]
+
+
+def test_get_versions_resyncs_when_areas_are_written_without_sync(monkeypatch):
+    service = DataVersionService(cache_ttl_seconds=0)
+    probes = iter([(2, datetime(2024, 4, 1)), (2, datetime(2024, 4, 1)), (2, datetime(2024, 5, 1))])
+    synced = []
+
+    async def fake_probe():
+        return next(probes)
+
+    async def fake_sync(areas=None):
+        synced.append(True)
+        service._versions = {group: {"fingerprint": str(len(synced))} for group in AREA_FIELD_GROUPS}
+        service._area_probe = (2, datetime(2024, 4, 1)) if len(synced) == 1 else (2, datetime(2024, 5, 1))
+        return []
+
+    FakeDataVersion.docs = [
+        type("Doc", (), {"group": group, "fingerprint": "1", "area_fingerprints": {}})()
+        for group in AREA_FIELD_GROUPS
+    ]
+    monkeypatch.setattr(module, "DataVersion", FakeDataVersion)
+    monkeypatch.setattr(service, "_probe", fake_probe)
+    monkeypatch.setattr(service, "sync", fake_sync)
+
+    async def run():
+        # 起動直後は一度記録し直す
+        await service.get_versions()
+        assert len(synced) == 1
+        # 件数・最終更新日時が変わらなければ記録済みのフィンガープリントを使う
+        await service.get_versions()
+        assert len(synced) == 1
+        # sync() を呼ばないスクリプトがエリアを書き換えた場合も検知する
+        versions = await service.get_versions()
+        assert len(synced) == 2
+        assert versions["housing_data"]["fingerprint"] == "2"
+
+    asyncio.run(run())
@@ -0,0 +1,139 @@
+"""
+household_budget のテスト（MongoDBなし）
+"""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.api_mongo.v1.endpoints import simulation
+from app.services import household_budget as module
+from app.services.household_budget import HouseholdBudgetModel, RENT_FIELDS, ROOM_TYPES
+
+
+def _area(code, rents, childcare=True):
+    housing = SimpleNamespace(**{field: rents.get(room_type) for room_type, field in RENT_FIELDS.items()})
+    return SimpleNamespace(
+        code=code,
+        name=f"区{code}",
+        housing_data=housing,
+        childcare_data=object() if childcare else None,
+        center_lat=35.68,
+        center_lng=139.76
+    )
+
+
+AREAS = [
+    _area("13101", {"1K": 11.5, "2LDK": 30.2, "3LDK": 45.0}),
+    _area("13102", {"1K": 10.0, "1LDK": 18.0}, childcare=False),
+    _area("13113", {"1R": 8.0, "2LDK": 25.5}),
+]
+
+
+def _model():
+    model = HouseholdBudgetModel()
+    model.build(AREAS)
+    model.version_token = "v1"
+    return model
+
+
+class FakeAreaModel:
+    @staticmethod
+    async def get(area_id):
+        return next((area for area in AREAS if area.code == area_id), None)
+
+
+@pytest.mark.parametrize("params", [
+    {"adults": 2, "children": 0, "annual_income": 450},
+    {"adults": 2, "children": 2, "annual_income": 900, "car_ownership": True, "childcare_needed": True},
+    {"adults": 1, "children": 1, "annual_income": 300, "childcare_needed": True},
+])
+def test_matrix_matches_single_area_simulation(monkeypatch, params):
+    monkeypatch.setattr(simulation, "Area", FakeAreaModel)
+    model = _model()
+    matrix = model.simulate(
+        params["adults"],
+        params["children"],
+        params["annual_income"],
+        car_ownership=params.get("car_ownership", False),
+        childcare_needed=params.get("childcare_needed", False)
+    )
+
+    for i, code in enumerate(model.area_codes):
+        for j, room_type in enumerate(ROOM_TYPES):
+            single = asyncio.run(simulation._simulate_household_budget(
+                simulation.HouseholdSimulationRequest(area_id=code, room_type=room_type, **params)
+            ))
+            assert single.monthly_breakdown["家賃"] == matrix["rent"][i, j]
+            assert single.annual_total == pytest.approx(matrix["total_expense"][i, j] * 12)
+            assert single.disposable_income == pytest.approx(matrix["disposable_income"][i, j])
+            assert single.savings_rate == round(float(matrix["savings_rate"][i, j]), 1)
+            assert single.affordability_score == round(float(matrix["affordability_score"][i, j]), 1)
+
+
+def test_sweep_caches_arrays_and_renders_lists():
+    model = _model()
+    first = asyncio.run(model.sweep([500, 800], [0, 1]))
+    second = asyncio.run(model.sweep([800, 500, 500], [1, 0]))
+
+    assert first == second
+    assert model.get_cache_stats()["hits"] == 1
+    assert isinstance(first["affordability_score"], list)
+    cached = next(iter(model._sweep_cache.values()))
+    assert cached["affordability_score"].shape == (2, 2, 3, 6)
+    assert model.get_cache_stats()["bytes"] == cached["nbytes"]
+
+
+def test_sweep_rejects_large_grid_and_bounds_cache_bytes(monkeypatch):
+    model = _model()
+    with pytest.raises(ValueError):
+        asyncio.run(model.sweep(range(100, 100 + module.MAX_SWEEP_CELLS), [0]))
+
+    # 大きいグリッドはスレッドで計算し、キャッシュはバイト数の上限まで
+    monkeypatch.setattr(module, "SWEEP_THREAD_CELLS", 0)
+    monkeypatch.setattr(module, "SWEEP_CACHE_MAX_BYTES", 2 * (2 * 2 * 3 * 6) * 8 * 2)
+    for income in (500, 600, 700):
+        asyncio.run(model.sweep([income, income + 50], [0, 1]))
+
+    stats = model.get_cache_stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= module.SWEEP_CACHE_MAX_BYTES
+
+
+def test_sweep_matches_matrix_simulation():
+    model = _model()
+    sweep = asyncio.run(model.sweep([450, 900], [0, 2], childcare_needed=True))
+
+    for a, income in enumerate(sweep["annual_income"]):
+        for c, children in enumerate(sweep["children"]):
+            matrix = model.simulate(2, children, income, childcare_needed=True)
+            np.testing.assert_allclose(sweep["affordability_score"][a][c], matrix["affordability_score"].round(1))
+            np.testing.assert_allclose(sweep["savings_rate"][a][c], matrix["savings_rate"].round(1))
+
+
+async def _no_refresh():
+    return None
+
+
+def test_sweep_endpoint_rejects_large_grid_before_building_axis(monkeypatch):
+    model = _model()
+    monkeypatch.setattr(model, "ensure_fresh", _no_refresh)
+    monkeypatch.setattr(simulation, "household_budget_model", model)
+
+    # 刻みが細かすぎる条件はリクエストの検証で拒否
+    with pytest.raises(ValidationError):
+        simulation.HouseholdSweepRequest(annual_income_min=300, annual_income_max=1500, annual_income_step=1e-5)
+
+    # 年収の軸を作る前にセル数の上限で拒否
+    def fail_arange(*args, **kwargs):
+        raise AssertionError("income axis must not be built")
+
+    monkeypatch.setattr(simulation.np, "arange", fail_arange)
+    request = simulation.HouseholdSweepRequest(annual_income_min=1, annual_income_max=1_000_000, annual_income_step=1)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(simulation.sweep_household_budget(request))
+    assert excinfo.value.status_code == 400
+    assert "too large" in excinfo.value.detail
@@ -0,0 +1,79 @@
+"""
+lifestyle_matrix のテスト（MongoDBなし）
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.api_mongo.v1.endpoints import simulation
+from app.services.lifestyle_matrix import LifestyleMatrix
+
+
+def _area(area_id, code, park=None, school=None, medical=None, waiting=None):
+    return SimpleNamespace(
+        id=area_id,
+        code=code,
+        name=f"区{code}",
+        park_data=SimpleNamespace(**park) if park is not None else None,
+        school_data=SimpleNamespace(**school) if school is not None else None,
+        medical_data=SimpleNamespace(**medical) if medical is not None else None,
+        childcare_data=SimpleNamespace(waiting_children=waiting)
+    )
+
+
+AREAS = [
+    _area("a1", "13101", {"total_parks": 30}, {"elementary_schools": 8, "junior_high_schools": 3},
+          {"hospitals": 2, "clinics": 40}, waiting=0),
+    _area("a2", "13102", {"total_parks": 60}, {"elementary_schools": 12, "junior_high_schools": 6},
+          {"hospitals": 1, "clinics": 25}, waiting=12),
+    _area("a3", "13104", None, {"elementary_schools": 4, "junior_high_schools": None},
+          {"hospitals": 6, "clinics": 80}),
+    _area("a4", "13113", {"total_parks": 45}, None, None, waiting=3),
+]
+
+
+class FakeAreaModel:
+    @staticmethod
+    async def get(area_id):
+        return next((area for area in AREAS if area.id == area_id), None)
+
+
+async def _no_refresh():
+    return None
+
+
+@pytest.mark.parametrize("params", [
+    {"children_ages": [], "important_facilities": ["parks", "schools", "hospitals"]},
+    {"children_ages": [4, 14], "important_facilities": ["hospitals", "schools"]},
+    {"children_ages": [10], "important_facilities": ["parks", "shopping"]},
+])
+def test_batch_matches_single_target_simulation(monkeypatch, params):
+    matrix = LifestyleMatrix()
+    matrix.build(AREAS)
+    monkeypatch.setattr(matrix, "ensure_fresh", _no_refresh)
+    monkeypatch.setattr(simulation, "lifestyle_matrix", matrix)
+    monkeypatch.setattr(simulation, "Area", FakeAreaModel)
+
+    for current in AREAS:
+        batch = asyncio.run(simulation._simulate_lifestyle_change_batch(
+            simulation.LifestyleBatchRequest(current_area_id=current.id, **params)
+        ))
+        assert batch["total_candidates"] == len(AREAS) - 1
+        assert {candidate["id"] for candidate in batch["candidates"]} == \
+            {area.id for area in AREAS if area.id != current.id}
+
+        for candidate in batch["candidates"]:
+            single = asyncio.run(simulation._simulate_lifestyle_change(
+                simulation.LifestyleSimulationRequest(
+                    current_area_id=current.id, target_area_id=candidate["id"], **params
+                )
+            ))
+            assert batch["current_area"]["evaluation"] == single.current_area["evaluation"]
+            assert candidate["evaluation"] == single.target_area["evaluation"]
+            assert candidate["comparison"] == single.comparison
+            assert candidate["overall_improvement_score"] == single.overall_improvement_score
+
+        # 総合改善スコアの高い順
+        scores = [candidate["overall_improvement_score"] for candidate in batch["candidates"]]
+        assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,94 @@
+"""
+rate_limiter のテスト（日次上限は MemoryQuotaStore で確認）
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.services.rate_limiter import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    MemoryQuotaStore,
+    QuotaExceededError,
+    UpstreamLimit,
+    UpstreamLimiter,
+)
+
+
+def _limiter(rate=20.0, burst=1, daily_quota=None, batch_quota_ratio=1.0, store=None):
+    return UpstreamLimiter(
+        "test",
+        UpstreamLimit(rate=rate, burst=burst, daily_quota=daily_quota, batch_quota_ratio=batch_quota_ratio),
+        store or MemoryQuotaStore()
+    )
+
+
+def test_interactive_requests_overtake_queued_batch_requests():
+    limiter = _limiter()
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    async def run():
+        # 最初のトークンを使い切り、以降は待ち行列に並ぶ
+        await limiter.acquire(PRIORITY_BATCH)
+        batch = [asyncio.create_task(request(f"batch-{i}", PRIORITY_BATCH)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*batch, interactive)
+
+    asyncio.run(run())
+    # 先頭のバッチ（既にトークン待ち）の次に対話的なリクエストが通る
+    assert order.index("interactive") <= 1
+    assert [name for name in order if name.startswith("batch")] == ["batch-0", "batch-1", "batch-2"]
+
+
+def test_sync_waiters_share_the_priority_queue():
+    limiter = _limiter()
+    order = []
+
+    async def run():
+        await limiter.acquire(PRIORITY_BATCH)
+        thread = threading.Thread(target=lambda: (limiter.acquire_sync(PRIORITY_BATCH), order.append("sync-batch")))
+        thread.start()
+        while not limiter._waiters:
+            await asyncio.sleep(0.001)
+        await limiter.acquire(PRIORITY_INTERACTIVE)
+        order.append("interactive")
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(run())
+    assert set(order) == {"sync-batch", "interactive"}
+    assert not limiter._waiters
+
+
+def test_daily_quota_is_shared_between_limiters_and_reserves_interactive_share():
+    store = MemoryQuotaStore()
+    # 同じカウンタを使う2つのワーカーを想定
+    workers = [_limiter(rate=1000, burst=100, daily_quota=10, batch_quota_ratio=0.8, store=store) for _ in range(2)]
+
+    async def run():
+        for i in range(8):
+            await workers[i % 2].acquire(PRIORITY_BATCH)
+        # バッチは上限の8割まで
+        with pytest.raises(QuotaExceededError):
+            await workers[0].acquire(PRIORITY_BATCH)
+        # 残りは対話的なリクエスト用
+        await workers[1].acquire(PRIORITY_INTERACTIVE)
+        await workers[0].acquire(PRIORITY_INTERACTIVE)
+        with pytest.raises(QuotaExceededError):
+            await workers[1].acquire(PRIORITY_INTERACTIVE)
+        return await workers[0].get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["used_today"] == 10
+    assert stats["remaining_today"] == 0
+    assert stats["rejected_today"] == 2
+
+
+def test_acquire_sync_refuses_quota_limited_upstreams():
+    with pytest.raises(RuntimeError):
+        _limiter(daily_quota=10).acquire_sync()
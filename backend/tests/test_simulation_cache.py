@@ -0,0 +1,95 @@
+"""
+simulation_cache のテスト（MongoDBなし）
+"""
+import asyncio
+
+from app.api_mongo.v1.endpoints.simulation import HouseholdSimulationRequest, LifestyleSimulationRequest
+from app.services import simulation_cache as module
+from app.services.simulation_cache import SimulationCache, canonicalize_request, make_cache_key
+
+
+def _household(**overrides):
+    params = {
+        "area_id": "a1",
+        "annual_income": 600,
+        "commute_destinations": [
+            {"station": "新宿", "days_per_week": 5},
+            {"station": "東京", "days_per_week": 3},
+        ],
+    }
+    params.update(overrides)
+    return HouseholdSimulationRequest(**params).model_dump()
+
+
+def test_equivalent_requests_share_a_key():
+    base = make_cache_key("household", _household(), "v1")
+
+    # 整数値の小数・通勤先の順序・値がNoneのキー
+    assert make_cache_key("household", _household(annual_income=600.0), "v1") == base
+    assert make_cache_key("household", _household(commute_destinations=[
+        {"station": "東京", "days_per_week": 3, "line": None},
+        {"station": "新宿", "days_per_week": 5},
+    ]), "v1") == base
+
+    lifestyle = dict(current_area_id="a1", target_area_id="a2")
+    assert canonicalize_request(LifestyleSimulationRequest(
+        children_ages=[3, 10], important_facilities=["parks", "schools"], **lifestyle
+    ).model_dump()) == canonicalize_request(LifestyleSimulationRequest(
+        children_ages=[10, 3], important_facilities=["schools", "parks"], **lifestyle
+    ).model_dump())
+
+
+def test_different_requests_versions_and_namespaces_differ():
+    base = make_cache_key("household", _household(), "v1")
+
+    assert make_cache_key("household", _household(annual_income=600.004), "v1") != base
+    # 計算側で正規化しない文字列は別のキー（全角の間取りは既定の家賃、空白つきのIDは404になる）
+    assert make_cache_key("household", _household(room_type="２ＬＤＫ"), "v1") != \
+        make_cache_key("household", _household(room_type="2LDK"), "v1")
+    assert make_cache_key("household", _household(area_id=" ａ1 "), "v1") != base
+    assert make_cache_key("household", _household(commute_destinations=[
+        {"station": "新宿 ", "days_per_week": 5},
+        {"station": "東京", "days_per_week": 3},
+    ]), "v1") != base
+    assert make_cache_key("household", _household(room_type="1LDK"), "v1") != base
+    assert make_cache_key("household", _household(car_ownership=True), "v1") != base
+    assert make_cache_key("household", _household(commute_destinations=[
+        {"station": "新宿", "days_per_week": 3},
+        {"station": "東京", "days_per_week": 5},
+    ]), "v1") != base
+    assert make_cache_key("household", _household(), "v2") != base
+    assert make_cache_key("household_map", _household(), "v1") != base
+
+
+class FakeDataVersionService:
+    def __init__(self):
+        self.fingerprints = {"basic": "b1", "housing_data": "h1"}
+
+    async def get_versions(self):
+        return {group: {"fingerprint": value} for group, value in self.fingerprints.items()}
+
+
+def test_get_or_compute_reuses_until_dependent_group_changes(monkeypatch):
+    versions = FakeDataVersionService()
+    monkeypatch.setattr(module, "data_version_service", versions)
+    cache = SimulationCache(backend="memory", ttl=60, max_entries=10)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    async def run(body):
+        return await cache.get_or_compute("household", body, ("basic", "housing_data"), compute)
+
+    assert asyncio.run(run(_household())) == {"value": 1}
+    assert asyncio.run(run(_household(annual_income=600.0))) == {"value": 1}
+
+    # 依存しないグループの変更ではキャッシュを使い、依存するグループが変わると再計算
+    versions.fingerprints["park_data"] = "p2"
+    assert asyncio.run(run(_household())) == {"value": 1}
+    versions.fingerprints["housing_data"] = "h2"
+    assert asyncio.run(run(_household())) == {"value": 2}
+
+    stats = asyncio.run(cache.get_stats())
+    assert (stats["hits"], stats["misses"]) == (2, 2)